@@ -0,0 +1,60 @@
+from typing import Optional
+from fastapi import Header, HTTPException, Request
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.core.events import EventHub
+from app.services.auth_service import AuthService
+from app.services.export_service import ExportService
+from app.services.family_service import FamilyService
+from app.services.import_service import ImportService
+from app.services.profile_service import ProfileService
+from app.services.search_service import SearchService
+import secrets
+
+
+def get_services(request: Request) -> ServiceContainer:
+    """Get the application-scoped service container"""
+    return request.app.state.services
+
+
+def get_auth_service(request: Request) -> AuthService:
+    """Get the shared AuthService"""
+    return request.app.state.services.auth_service
+
+
+def get_family_service(request: Request) -> FamilyService:
+    """Get the shared FamilyService"""
+    return request.app.state.services.family_service
+
+
+def get_event_hub(request: Request) -> EventHub:
+    """Get the shared EventHub"""
+    return request.app.state.services.event_hub
+
+
+def get_profile_service(request: Request) -> ProfileService:
+    """Get the shared ProfileService"""
+    return request.app.state.services.profile_service
+
+
+def get_search_service(request: Request) -> SearchService:
+    """Get the shared SearchService"""
+    return request.app.state.services.search_service
+
+
+def get_import_service(request: Request) -> ImportService:
+    """Get the shared ImportService"""
+    return request.app.state.services.import_service
+
+
+def get_export_service(request: Request) -> ExportService:
+    """Get the shared ExportService"""
+    return request.app.state.services.export_service
+
+
+def require_admin(x_admin_key: Optional[str] = Header(default=None)) -> None:
+    """Allow the request only with the configured X-Admin-Key header"""
+    if not settings.ADMIN_API_KEY or not x_admin_key or not secrets.compare_digest(
+        x_admin_key.encode(), settings.ADMIN_API_KEY.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Admin access required")
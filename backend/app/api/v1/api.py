@@ -1,8 +1,10 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, family, profile
+from app.api.v1.endpoints import admin, auth, family, profile, search
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(family.router, prefix="/family", tags=["family"])
 api_router.include_router(profile.router, prefix="/profile", tags=["profile"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.services.export_service import ExportService
+from app.services.import_service import ImportService, iter_lines
+from app.api.deps import get_export_service, get_import_service, require_admin
+from app.core.config import settings
+import orjson
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """StreamingResponse for generators that consume the request body while responding"""
+
+    async def __call__(self, scope, receive, send) -> None:
+        # StreamingResponse would also read receive() to watch for disconnects,
+        # racing request.stream() for the body messages
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/users/import")
+async def import_users(
+    request: Request,
+    chunk_size: int = Query(default=settings.IMPORT_CHUNK_SIZE, ge=1, le=10000),
+    import_service: ImportService = Depends(get_import_service)
+):
+    """Bulk import users from an NDJSON body of RegisterRequest rows"""
+    results = import_service.import_users(
+        iter_lines(request.stream(), settings.IMPORT_MAX_LINE_BYTES),
+        chunk_size,
+        settings.IMPORT_MAX_LINE_BYTES
+    )
+
+    async def stream():
+        async for result in results:
+            yield orjson.dumps(result) + b"\n"
+
+    return RequestStreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/users/export")
+async def export_users(
+    export_format: str = Query(default="ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    after: Optional[str] = Query(default=None, description="Resume after this user _id"),
+    since: Optional[datetime] = Query(default=None, description="Only users with updated_at >= since"),
+    batch_size: int = Query(default=settings.EXPORT_BATCH_SIZE, ge=1, le=10000),
+    export_service: ExportService = Depends(get_export_service)
+):
+    """Stream users with profile_data and family membership as NDJSON or CSV"""
+    if after and not ObjectId.is_valid(after):
+        raise HTTPException(status_code=400, detail="Invalid after checkpoint")
+    
+    options = {"after": after, "since": since, "batch_size": batch_size}
+    if export_format == "csv":
+        content, media_type = export_service.export_csv(**options), "text/csv"
+    else:
+        content, media_type = export_service.export_ndjson(**options), "application/x-ndjson"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'}
+    )
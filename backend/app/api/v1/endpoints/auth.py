@@ -4,35 +4,53 @@ from app.schemas.auth import (
     RegisterRequest, LoginRequest, Token
 )
 from app.services.auth_service import AuthService
-from app.core.security import verify_token
+from app.services.sms_service import SMSUnavailableError
+from app.api.deps import get_auth_service
+from app.core.config import settings
+from app.core.rate_limit import rate_limit
+from app.core.security import get_current_user_id
 from typing import Optional
 
 router = APIRouter()
 
 
-def get_current_user_id(token: str = Depends(verify_token)) -> Optional[str]:
-    """Get current user ID from token"""
-    if not token:
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-    return token.get("user_id")
-
-
-@router.post("/send-otp", response_model=OTPResponse)
-async def send_otp(request: OTPRequest):
+@router.post(
+    "/send-otp",
+    response_model=OTPResponse,
+    dependencies=[Depends(rate_limit(
+        "send_otp",
+        per_number=settings.SEND_OTP_RATE_LIMIT_PER_NUMBER,
+        per_ip=settings.SEND_OTP_RATE_LIMIT_PER_IP
+    ))]
+)
+async def send_otp(
+    request: OTPRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """Send OTP to mobile number"""
     try:
-        auth_service = AuthService()
         result = await auth_service.send_otp(request.mobile_number)
         return OTPResponse(**result)
+    except SMSUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/verify-otp")
-async def verify_otp(request: OTPVerifyRequest):
+@router.post(
+    "/verify-otp",
+    dependencies=[Depends(rate_limit(
+        "verify_otp",
+        per_number=settings.VERIFY_OTP_RATE_LIMIT_PER_NUMBER,
+        per_ip=settings.VERIFY_OTP_RATE_LIMIT_PER_IP
+    ))]
+)
+async def verify_otp(
+    request: OTPVerifyRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """Verify OTP"""
     try:
-        auth_service = AuthService()
         is_valid = await auth_service.verify_otp(request.mobile_number, request.otp)
         
         if not is_valid:
@@ -46,14 +64,14 @@ async def verify_otp(request: OTPVerifyRequest):
 
 
 @router.post("/register", response_model=Token)
-async def register(request: RegisterRequest):
+async def register(
+    request: RegisterRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """Register new user"""
     try:
-        auth_service = AuthService()
-        
         # Check if user already exists
-        existing_user = await auth_service.get_user_by_mobile(request.mobile_number)
-        if existing_user:
+        if await auth_service.user_exists_by_mobile(request.mobile_number):
             raise HTTPException(status_code=400, detail="User already exists")
         
         # Create user
@@ -70,13 +88,14 @@ async def register(request: RegisterRequest):
 
 
 @router.post("/login", response_model=Token)
-async def login(request: LoginRequest):
+async def login(
+    request: LoginRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """Login user"""
     try:
-        auth_service = AuthService()
-        
         # Get user
-        user = await auth_service.get_user_by_mobile(request.mobile_number)
+        user = await auth_service.get_auth_summary_by_mobile(request.mobile_number)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -91,10 +110,12 @@ async def login(request: LoginRequest):
 
 
 @router.get("/me")
-async def get_current_user(user_id: str = Depends(get_current_user_id)):
+async def get_current_user(
+    user_id: str = Depends(get_current_user_id),
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """Get current user details"""
     try:
-        auth_service = AuthService()
         user = await auth_service.get_user_by_id(user_id)
         
         if not user:
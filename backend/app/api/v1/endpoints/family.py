@@ -1,41 +1,41 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from app.schemas.family import (
     FamilyCreateRequest, FamilyJoinRequest, FamilyResponse,
-    FamilyJoinRequestResponse, FamilyJoinRequestAction
+    FamilyJoinRequestPage, FamilyJoinRequestAction,
+    family_response
 )
 from app.services.family_service import FamilyService
-from app.core.security import verify_token
-from typing import List
+from app.api.deps import get_event_hub, get_family_service
+from app.core.config import settings
+from app.core.events import EventHub, sse_stream
+from app.core.security import get_current_user_id
+from typing import Literal, Optional
 
 router = APIRouter()
 
 
-def get_current_user_id(token: str = Depends(verify_token)) -> str:
-    """Get current user ID from token"""
-    if not token:
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-    return token.get("user_id")
+async def expanded_family_response(family, expand: Optional[str], user_id: str, family_service: FamilyService) -> dict:
+    """family_response, plus member summaries when expand=members (members only)"""
+    body = family_response(family)
+    if expand == "members":
+        if user_id not in family.members:
+            raise HTTPException(status_code=403, detail="Not authorized to view members")
+        body["member_details"] = await family_service.get_member_summaries(family)
+    return body
 
 
 @router.post("/create", response_model=FamilyResponse)
 async def create_family(
     request: FamilyCreateRequest,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    family_service: FamilyService = Depends(get_family_service)
 ):
     """Create new family"""
     try:
-        family_service = FamilyService()
         family = await family_service.create_family(user_id)
         
-        return FamilyResponse(
-            id=family.id,
-            family_id=family.family_id,
-            created_by=family.created_by,
-            members=family.members,
-            created_at=family.created_at.isoformat(),
-            updated_at=family.updated_at.isoformat(),
-            is_active=family.is_active
-        )
+        return ORJSONResponse(family_response(family))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -43,22 +43,14 @@ async def create_family(
 @router.post("/join", response_model=FamilyResponse)
 async def join_family(
     request: FamilyJoinRequest,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    family_service: FamilyService = Depends(get_family_service)
 ):
     """Join existing family"""
     try:
-        family_service = FamilyService()
         family = await family_service.join_family(request.family_id, user_id)
         
-        return FamilyResponse(
-            id=family.id,
-            family_id=family.family_id,
-            created_by=family.created_by,
-            members=family.members,
-            created_at=family.created_at.isoformat(),
-            updated_at=family.updated_at.isoformat(),
-            is_active=family.is_active
-        )
+        return ORJSONResponse(family_response(family))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -66,24 +58,19 @@ async def join_family(
 
 
 @router.get("/my-family", response_model=FamilyResponse)
-async def get_my_family(user_id: str = Depends(get_current_user_id)):
+async def get_my_family(
+    expand: Optional[Literal["members"]] = None,
+    user_id: str = Depends(get_current_user_id),
+    family_service: FamilyService = Depends(get_family_service)
+):
     """Get current user's family"""
     try:
-        family_service = FamilyService()
         family = await family_service.get_family_by_user_id(user_id)
         
         if not family:
             raise HTTPException(status_code=404, detail="No family found")
         
-        return FamilyResponse(
-            id=family.id,
-            family_id=family.family_id,
-            created_by=family.created_by,
-            members=family.members,
-            created_at=family.created_at.isoformat(),
-            updated_at=family.updated_at.isoformat(),
-            is_active=family.is_active
-        )
+        return ORJSONResponse(await expanded_family_response(family, expand, user_id, family_service))
     except HTTPException:
         raise
     except Exception as e:
@@ -91,24 +78,20 @@ async def get_my_family(user_id: str = Depends(get_current_user_id)):
 
 
 @router.get("/{family_id}", response_model=FamilyResponse)
-async def get_family(family_id: str, user_id: str = Depends(get_current_user_id)):
+async def get_family(
+    family_id: str,
+    expand: Optional[Literal["members"]] = None,
+    user_id: str = Depends(get_current_user_id),
+    family_service: FamilyService = Depends(get_family_service)
+):
     """Get family by ID"""
     try:
-        family_service = FamilyService()
         family = await family_service.get_family_by_id(family_id)
         
         if not family:
             raise HTTPException(status_code=404, detail="Family not found")
         
-        return FamilyResponse(
-            id=family.id,
-            family_id=family.family_id,
-            created_by=family.created_by,
-            members=family.members,
-            created_at=family.created_at.isoformat(),
-            updated_at=family.updated_at.isoformat(),
-            is_active=family.is_active
-        )
+        return ORJSONResponse(await expanded_family_response(family, expand, user_id, family_service))
     except HTTPException:
         raise
     except Exception as e:
@@ -116,10 +99,12 @@ async def get_family(family_id: str, user_id: str = Depends(get_current_user_id)
 
 
 @router.post("/leave")
-async def leave_family(user_id: str = Depends(get_current_user_id)):
+async def leave_family(
+    user_id: str = Depends(get_current_user_id),
+    family_service: FamilyService = Depends(get_family_service)
+):
     """Leave current family"""
     try:
-        family_service = FamilyService()
         family = await family_service.get_family_by_user_id(user_id)
         
         if not family:
@@ -137,54 +122,69 @@ async def leave_family(user_id: str = Depends(get_current_user_id)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{family_id}/requests", response_model=List[FamilyJoinRequestResponse])
+@router.get("/{family_id}/requests", response_model=FamilyJoinRequestPage)
 async def get_join_requests(
     family_id: str,
-    user_id: str = Depends(get_current_user_id)
+    limit: int = Query(default=settings.JOIN_REQUESTS_PAGE_SIZE, ge=1, le=settings.JOIN_REQUESTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(get_current_user_id),
+    family_service: FamilyService = Depends(get_family_service)
 ):
-    """Get family join requests"""
+    """Get one page of pending family join requests, oldest first"""
     try:
-        family_service = FamilyService()
-        
         # Check if user is part of the family
         family = await family_service.get_family_by_user_id(user_id)
         if not family or family.family_id != family_id:
             raise HTTPException(status_code=403, detail="Not authorized to view requests")
         
-        requests = await family_service.get_join_requests(family_id)
+        requests, next_cursor = await family_service.get_join_requests(family_id, limit, cursor)
         
-        return [
-            FamilyJoinRequestResponse(
-                id=req.id,
-                family_id=req.family_id,
-                requester_id=req.requester_id,
-                requester_name=req.requester_name,
-                status=req.status,
-                requested_at=req.requested_at.isoformat(),
-                processed_at=req.processed_at.isoformat() if req.processed_at else None
-            )
-            for req in requests
-        ]
+        return ORJSONResponse({"requests": requests, "next_cursor": next_cursor})
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{family_id}/requests/stream")
+async def stream_join_requests(
+    family_id: str,
+    user_id: str = Depends(get_current_user_id),
+    family_service: FamilyService = Depends(get_family_service),
+    event_hub: EventHub = Depends(get_event_hub)
+):
+    """Server-Sent Events stream of join requests created, approved or rejected in a family"""
+    family = await family_service.get_family_by_user_id(user_id)
+    if not family or family.family_id != family_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view requests")
+    
+    return StreamingResponse(
+        sse_stream(event_hub, family_id, settings.JOIN_REQUEST_EVENTS_KEEPALIVE_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/requests/{request_id}/process")
 async def process_join_request(
     request_id: str,
     action: FamilyJoinRequestAction,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    family_service: FamilyService = Depends(get_family_service)
 ):
     """Process join request (approve/reject)"""
     try:
-        family_service = FamilyService()
         success = await family_service.process_join_request(request_id, action.action)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to process request")
         
         return {"message": f"Request {action.action}ed successfully"}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,39 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.schemas.profile import ProfileUpdateRequest, ProfileResponse
-from app.services.profile_service import ProfileService
-from app.core.security import verify_token
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import ORJSONResponse
+from app.schemas.profile import ProfilePatch, ProfileUpdateRequest, ProfileResponse, profile_data_response
+from app.services.profile_service import (
+    ProfileService, ProfileVersionMismatch, parse_profile_etag, profile_etag
+)
+from app.api.deps import get_profile_service
+from app.core.security import get_current_user_id
 from typing import Optional
 
 router = APIRouter()
 
 
-def get_current_user_id(token: str = Depends(verify_token)) -> str:
-    """Get current user ID from token"""
-    if not token:
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-    return token.get("user_id")
-
-
 @router.post("/create", response_model=ProfileResponse)
 async def create_profile(
     request: ProfileUpdateRequest,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    profile_service: ProfileService = Depends(get_profile_service)
 ):
     """Create or update user profile"""
     try:
-        profile_service = ProfileService()
-        success = await profile_service.update_profile(user_id, request.profile_data)
+        completion_percentage = await profile_service.update_profile(user_id, request.profile_data)
         
-        if not success:
+        if completion_percentage is None:
             raise HTTPException(status_code=500, detail="Failed to create profile")
         
-        completion_percentage = await profile_service.get_profile_completion_percentage(user_id)
-        
-        return ProfileResponse(
-            user_id=user_id,
-            profile_data=request.profile_data,
-            completion_percentage=completion_percentage
-        )
+        return ORJSONResponse({
+            "user_id": user_id,
+            "profile_data": request.profile_data.model_dump(),
+            "completion_percentage": completion_percentage
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -43,23 +38,21 @@ async def create_profile(
 @router.put("/update", response_model=ProfileResponse)
 async def update_profile(
     request: ProfileUpdateRequest,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    profile_service: ProfileService = Depends(get_profile_service)
 ):
     """Update user profile"""
     try:
-        profile_service = ProfileService()
-        success = await profile_service.update_profile(user_id, request.profile_data)
+        completion_percentage = await profile_service.update_profile(user_id, request.profile_data)
         
-        if not success:
+        if completion_percentage is None:
             raise HTTPException(status_code=500, detail="Failed to update profile")
         
-        completion_percentage = await profile_service.get_profile_completion_percentage(user_id)
-        
-        return ProfileResponse(
-            user_id=user_id,
-            profile_data=request.profile_data,
-            completion_percentage=completion_percentage
-        )
+        return ORJSONResponse({
+            "user_id": user_id,
+            "profile_data": request.profile_data.model_dump(),
+            "completion_percentage": completion_percentage
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -67,27 +60,57 @@ async def update_profile(
 
 
 @router.get("/", response_model=ProfileResponse)
-async def get_profile(user_id: str = Depends(get_current_user_id)):
+async def get_profile(
+    user_id: str = Depends(get_current_user_id),
+    profile_service: ProfileService = Depends(get_profile_service)
+):
     """Get user profile"""
     try:
-        profile_service = ProfileService()
-        profile_data = await profile_service.get_profile(user_id)
-        completion_percentage = await profile_service.get_profile_completion_percentage(user_id)
+        profile_data, completion_percentage, version = await profile_service.get_profile_with_completion(user_id)
         
-        return ProfileResponse(
-            user_id=user_id,
-            profile_data=profile_data,
-            completion_percentage=completion_percentage
+        return ORJSONResponse({
+            "user_id": user_id,
+            "profile_data": profile_data_response(profile_data),
+            "completion_percentage": completion_percentage
+        }, headers={"ETag": profile_etag(version)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/", response_model=ProfileResponse)
+async def patch_profile(
+    patch: ProfilePatch,
+    if_match: Optional[str] = Header(default=None),
+    user_id: str = Depends(get_current_user_id),
+    profile_service: ProfileService = Depends(get_profile_service)
+):
+    """Update only the profile fields present in the body (null removes a field)"""
+    try:
+        profile_data, completion_percentage, version = await profile_service.patch_profile(
+            user_id, patch, parse_profile_etag(if_match)
         )
+        
+        return ORJSONResponse({
+            "user_id": user_id,
+            "profile_data": profile_data_response(profile_data),
+            "completion_percentage": completion_percentage
+        }, headers={"ETag": profile_etag(version)})
+    except ProfileVersionMismatch as e:
+        headers = {"ETag": profile_etag(e.current_version)} if e.current_version is not None else None
+        raise HTTPException(status_code=412, detail=str(e), headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/")
-async def delete_profile(user_id: str = Depends(get_current_user_id)):
+async def delete_profile(
+    user_id: str = Depends(get_current_user_id),
+    profile_service: ProfileService = Depends(get_profile_service)
+):
     """Delete user profile"""
     try:
-        profile_service = ProfileService()
         success = await profile_service.delete_profile(user_id)
         
         if not success:
@@ -101,10 +124,12 @@ async def delete_profile(user_id: str = Depends(get_current_user_id)):
 
 
 @router.get("/completion")
-async def get_profile_completion(user_id: str = Depends(get_current_user_id)):
+async def get_profile_completion(
+    user_id: str = Depends(get_current_user_id),
+    profile_service: ProfileService = Depends(get_profile_service)
+):
     """Get profile completion percentage"""
     try:
-        profile_service = ProfileService()
         completion_percentage = await profile_service.get_profile_completion_percentage(user_id)
         
         return {
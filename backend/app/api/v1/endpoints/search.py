@@ -0,0 +1,29 @@
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
+from app.schemas.search import SearchFilters, SearchResponse
+from app.services.search_service import SearchService
+from app.api.deps import get_search_service
+from app.core.security import get_current_user_id
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResponse)
+async def search_profiles(
+    filters: SearchFilters = Depends(),
+    user_id: str = Depends(get_current_user_id),
+    search_service: SearchService = Depends(get_search_service)
+):
+    """Search partner profiles by profile_data attributes"""
+    if filters.cursor and not ObjectId.is_valid(filters.cursor):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    try:
+        results, next_cursor = await search_service.search(filters, user_id)
+        
+        return ORJSONResponse({"results": results, "next_cursor": next_cursor})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 import os
 
 
@@ -13,21 +13,84 @@ class Settings(BaseSettings):
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "drshaadi"
+    ENSURE_INDEXES_ON_STARTUP: bool = True
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGODB_CONNECT_TIMEOUT_MS: int = 20000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGODB_SOCKET_TIMEOUT_MS: Optional[int] = None
+    MONGODB_USE_TRANSACTIONS: bool = False  # multi-document transactions need a replica set
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    JWT_BACKEND: str = "jose"  # "jose" or "pyjwt"
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_SIZE: int = 10000
+    ADMIN_API_KEY: Optional[str] = None  # admin endpoints are disabled when unset
+    CRYPTO_EXECUTOR_WORKERS: Optional[int] = None  # defaults to min(4, CPUs)
     
     # OTP Settings
     OTP_EXPIRE_MINUTES: int = 5
     OTP_LENGTH: int = 4
     MAX_OTP_ATTEMPTS: int = 3
     
+    # Rate Limits ("<count>/<second|minute|hour|day>", empty to disable)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per process) or "mongo" (shared)
+    RATE_LIMIT_MEMORY_KEYS: int = 100000
+    SEND_OTP_RATE_LIMIT_PER_NUMBER: str = "3/minute"
+    SEND_OTP_RATE_LIMIT_PER_IP: str = "30/minute"
+    VERIFY_OTP_RATE_LIMIT_PER_NUMBER: str = "10/minute"
+    VERIFY_OTP_RATE_LIMIT_PER_IP: str = "60/minute"
+    # Proxies trusted to set X-Forwarded-For (comma separated IPs, "*" for any); per-IP
+    # limits key on the client address uvicorn takes from it for requests they forward
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    
+    # Bulk Import / Export
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_LINE_BYTES: int = 65536
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Proximity Search
+    PINCODE_TABLE_PATH: Optional[str] = None  # .npy from `manage.py build-pincode-table`, defaults to the bundled sample
+    PINCODE_ALLOW_SAMPLE_TABLE: bool = False  # start outside DEBUG on the bundled city-centre sample (tests, benchmarks)
+    SEARCH_MAX_RADIUS_KM: float = 500
+    SEARCH_MAX_PINCODES_IN: int = 500  # larger radii query the geo_point 2dsphere index instead
+    
+    # Candidate Index (per process, in-memory; ~40MB per million profiles)
+    CANDIDATE_INDEX_ENABLED: bool = False
+    CANDIDATE_INDEX_REFRESH_SECONDS: float = 30
+    CANDIDATE_INDEX_REBUILD_SECONDS: float = 3600  # full reload to drop deleted users, 0 = never
+    
+    # Family Join Requests
+    JOIN_REQUESTS_PAGE_SIZE: int = 50
+    JOIN_REQUESTS_MAX_PAGE_SIZE: int = 200
+    JOIN_REQUEST_EVENTS_SOURCE: Literal["local", "change_stream"] = "local"  # change_stream needs a replica set; every worker sees every write
+    JOIN_REQUEST_EVENTS_QUEUE_SIZE: int = 100  # per subscriber; a reader further behind is disconnected
+    JOIN_REQUEST_EVENTS_KEEPALIVE_SECONDS: float = 15
+    
+    # Family Cache (per process; the TTL bounds staleness across workers)
+    FAMILY_CACHE_SIZE: int = 10000
+    FAMILY_CACHE_TTL_SECONDS: float = 60
+    
     # SMS Settings (Twilio)
     TWILIO_ACCOUNT_SID: Optional[str] = None
     TWILIO_AUTH_TOKEN: Optional[str] = None
     TWILIO_PHONE_NUMBER: Optional[str] = None
+    SMS_PROVIDER: str = "fake"  # "fake" or "twilio"
+    SMS_WORKERS: int = 4
+    SMS_QUEUE_SIZE: int = 10000
+    SMS_PROVIDER_CONCURRENCY: int = 10
+    SMS_RATE_PER_SECOND: float = 0  # 0 = unlimited
+    SMS_MAX_RETRIES: int = 3
+    SMS_RETRY_BASE_SECONDS: float = 0.5
+    SMS_DEAD_LETTER_SIZE: int = 1000
+    SMS_FAKE_LATENCY_MS: float = 0
+    SMS_FAKE_FAILURE_RATE: float = 0
     
     # CORS
     BACKEND_CORS_ORIGINS: list = [
@@ -39,8 +102,27 @@ class Settings(BaseSettings):
         "http://127.0.0.1:8000",
     ]
     
+    # Metrics
+    METRICS_ENABLED: bool = True
+    LOOP_LAG_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    LOOP_LAG_WARN_SECONDS: float = 0.1
+    
+    # Server
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_CONCURRENCY: Optional[int] = None  # defaults to one worker per CPU
+    GRACEFUL_TIMEOUT_SECONDS: int = 30
+    WORKER_TIMEOUT_SECONDS: int = 60
+    KEEPALIVE_SECONDS: int = 5
+    BACKLOG: int = 2048
+    WORKER_MAX_REQUESTS: int = 0
+    WORKER_MAX_REQUESTS_JITTER: int = 0
+    LOG_LEVEL: str = "info"
+    ACCESS_LOG: bool = True
+    
     # Development
-    DEBUG: bool = True
+    DEBUG: bool = False
     
     class Config:
         env_file = ".env"
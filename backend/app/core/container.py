@@ -0,0 +1,55 @@
+from app.core.config import settings
+from app.core.events import EventHub
+from app.core.rate_limit import create_rate_limiter
+from app.services.auth_service import AuthService
+from app.services.candidate_index import CandidateIndex
+from app.services.export_service import ExportService
+from app.services.family_service import FamilyService, JoinRequestChangeFeed
+from app.services.import_service import ImportService
+from app.services.pincode_index import get_pincode_index
+from app.services.profile_service import ProfileService
+from app.services.search_service import SearchService
+from app.services.sms_service import create_sms_dispatcher
+
+
+class ServiceContainer:
+    """Application-scoped services built once per process in the lifespan"""
+
+    def __init__(self, database):
+        self.database = database
+        self.rate_limiter = create_rate_limiter(database)
+        self.sms_dispatcher = create_sms_dispatcher()
+        self.auth_service = AuthService(database, self.sms_dispatcher)
+        self.event_hub = EventHub(settings.JOIN_REQUEST_EVENTS_QUEUE_SIZE)
+        self.family_service = FamilyService(database, self.event_hub)
+        self.join_request_feed = (
+            JoinRequestChangeFeed(database, self.event_hub)
+            if settings.JOIN_REQUEST_EVENTS_SOURCE == "change_stream" else None
+        )
+        self.pincode_index = get_pincode_index()
+        self.profile_service = ProfileService(database, self.pincode_index)
+        self.candidate_index = CandidateIndex(database) if settings.CANDIDATE_INDEX_ENABLED else None
+        self.search_service = SearchService(database, self.candidate_index, self.pincode_index)
+        self.import_service = ImportService(database)
+        self.export_service = ExportService(database)
+
+    async def start(self) -> None:
+        """Start background workers"""
+        await self.sms_dispatcher.start()
+        if self.candidate_index is not None:
+            self.candidate_index.start(
+                settings.CANDIDATE_INDEX_REFRESH_SECONDS,
+                settings.CANDIDATE_INDEX_REBUILD_SECONDS
+            )
+        if self.join_request_feed is not None:
+            self.join_request_feed.start()
+
+    async def stop(self) -> None:
+        """Drain and stop background workers"""
+        # Ends open event streams so the server is not left waiting on them
+        self.event_hub.close()
+        if self.join_request_feed is not None:
+            await self.join_request_feed.stop()
+        await self.sms_dispatcher.stop(settings.GRACEFUL_TIMEOUT_SECONDS / 2)
+        if self.candidate_index is not None:
+            await self.candidate_index.stop()
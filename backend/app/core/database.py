@@ -1,5 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.core.metrics import mongo_event_listeners
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,16 +15,34 @@ class Database:
 db = Database()
 
 
+def create_mongo_client() -> AsyncIOMotorClient:
+    """Create a Motor client with the configured pool and timeouts"""
+    return AsyncIOMotorClient(
+        settings.MONGODB_URL,
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        connectTimeoutMS=settings.MONGODB_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=settings.MONGODB_SOCKET_TIMEOUT_MS,
+        event_listeners=mongo_event_listeners() if settings.METRICS_ENABLED else None,
+    )
+
+
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        db.client = create_mongo_client()
         db.database = db.client[settings.DATABASE_NAME]
         
         # Test the connection
         await db.client.admin.command('ping')
         logger.info("Connected to MongoDB successfully")
         
+        if settings.ENSURE_INDEXES_ON_STARTUP:
+            await ensure_indexes(db.database)
+        
     except Exception as e:
         logger.error(f"Could not connect to MongoDB: {e}")
         raise
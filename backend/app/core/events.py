@@ -0,0 +1,148 @@
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Set
+from app.core.metrics import EVENT_SUBSCRIBERS, EVENT_SUBSCRIPTIONS_DROPPED
+import asyncio
+import logging
+import orjson
+import weakref
+
+logger = logging.getLogger(__name__)
+
+SSE_KEEPALIVE = b": keepalive\n\n"
+
+# Every hub in the process, so server shutdown can end open streams before it
+# waits for in-flight responses
+_hubs: "weakref.WeakSet[EventHub]" = weakref.WeakSet()
+
+
+class Subscription:
+    """One subscriber's bounded backlog of events on a topic"""
+
+    # Thousands of idle subscribers are expected, so keep each one small: no
+    # asyncio.Queue, and a waiter future only while a reader is blocked
+    __slots__ = ("topic", "closed", "_events", "_waiter")
+
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        self.closed = False
+        self._events: Deque[dict] = deque(maxlen=queue_size)
+        self._waiter: Optional[asyncio.Future] = None
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def put(self, event: dict) -> bool:
+        """Queue an event, returning False (and closing) if the reader has fallen behind"""
+        if len(self._events) == self._events.maxlen:
+            self.close()
+            return False
+        self._events.append(event)
+        self._wake()
+        return True
+
+    def close(self) -> None:
+        """End the subscription; a blocked get() returns None"""
+        self.closed = True
+        self._events.clear()
+        self._wake()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, or None on timeout or once closed"""
+        if not self._events and not self.closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._waiter = None
+        return self._events.popleft() if self._events else None
+
+
+class EventHub:
+    """In-process pub/sub fanning events out to every subscriber of a topic"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+        self.closed = False
+        self._topics: Dict[str, Set[Subscription]] = {}
+        _hubs.add(self)
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        """Live subscriptions on one topic, or on all of them"""
+        if topic is not None:
+            return len(self._topics.get(topic, ()))
+        return sum(len(subscriptions) for subscriptions in self._topics.values())
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Start receiving events published to a topic"""
+        subscription = Subscription(topic, self.queue_size)
+        if self.closed:
+            # Shutting down: the stream ends straight away
+            subscription.close()
+            return subscription
+        self._topics.setdefault(topic, set()).add(subscription)
+        EVENT_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering to a subscription"""
+        subscriptions = self._topics.get(subscription.topic)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._topics[subscription.topic]
+        EVENT_SUBSCRIBERS.dec()
+
+    def publish(self, topic: str, event: dict) -> int:
+        """Deliver an event to a topic's subscribers without blocking; returns how many got it"""
+        self.published += 1
+        delivered = 0
+        for subscription in list(self._topics.get(topic, ())):
+            if subscription.put(event):
+                delivered += 1
+            else:
+                # A slow reader is cut off rather than buffered without bound; the
+                # client reconnects and re-reads the list endpoint
+                self.unsubscribe(subscription)
+                self.dropped += 1
+                EVENT_SUBSCRIPTIONS_DROPPED.inc()
+        return delivered
+
+    def close(self) -> None:
+        """End every subscription and refuse new ones, so open streams finish during shutdown"""
+        self.closed = True
+        for subscriptions in list(self._topics.values()):
+            for subscription in list(subscriptions):
+                subscription.close()
+                self.unsubscribe(subscription)
+
+
+def close_event_streams() -> None:
+    """Close every hub in the process; called by the server before it drains connections"""
+    for hub in list(_hubs):
+        hub.close()
+
+
+def format_sse(event: dict) -> bytes:
+    """Server-Sent Events frame with the event's type as the SSE event name"""
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+async def sse_stream(hub: EventHub, topic: str, keepalive_seconds: float) -> AsyncIterator[bytes]:
+    """SSE frames for a topic until the subscription closes or the client goes away"""
+    subscription = hub.subscribe(topic)
+    try:
+        # Sent straight away so the client sees the stream is open
+        yield SSE_KEEPALIVE
+        while True:
+            event = await subscription.get(keepalive_seconds)
+            if subscription.closed:
+                return
+            yield format_sse(event) if event is not None else SSE_KEEPALIVE
+    finally:
+        hub.unsubscribe(subscription)
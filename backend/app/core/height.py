@@ -0,0 +1,51 @@
+from typing import Optional
+import re
+
+CM_PER_INCH = 2.54
+
+# Heights outside this range are treated as typos rather than stored
+MIN_HEIGHT_CM = 90
+MAX_HEIGHT_CM = 250
+
+_QUOTES = str.maketrans({"’": "'", "‘": "'", "′": "'", "`": "'", "”": '"', "“": '"', "″": '"'})
+
+_CENTIMETRES = re.compile(r"(\d{2,3}(?:\.\d+)?)\s*(?:cm|cms|centimet(?:er|re)s?)?")
+_METRES = re.compile(r"(\d(?:\.\d+)?)\s*(?:m|mtrs?|met(?:er|re)s?)")
+_FEET_INCHES = re.compile(
+    r"(\d)\s*(?:'|ft\.?|feet|foot)\s*(?:(\d{1,2}(?:\.\d+)?)\s*(?:\"|''|in\.?|inch|inches)?)?"
+)
+# "5.6", "5-6" and "5.6 ft" conventionally mean 5 feet 6 inches
+_DOTTED_FEET = re.compile(r"(\d)\s*[.\-]\s*(\d{1,2})\s*(?:ft\.?|feet)?")
+_INCHES = re.compile(r"(\d{2}(?:\.\d+)?)\s*(?:\"|''|in\.?|inch|inches)")
+
+
+def parse_height_cm(value: Optional[str]) -> Optional[int]:
+    """Parse a free-form height ("5'6\"", "5 ft 6 in", "5.6", "168 cm", "1.68 m") to whole centimetres
+
+    Returns None for empty or unrecognised input so profile writes never fail on it.
+    """
+    if value is None:
+        return None
+    text = " ".join(str(value).translate(_QUOTES).lower().split())
+    if not text:
+        return None
+
+    centimetres = None
+    if match := _FEET_INCHES.fullmatch(text):
+        inches = float(match.group(2) or 0)
+        if inches < 12:
+            centimetres = (int(match.group(1)) * 12 + inches) * CM_PER_INCH
+    elif match := _DOTTED_FEET.fullmatch(text):
+        inches = int(match.group(2))
+        if inches < 12:
+            centimetres = (int(match.group(1)) * 12 + inches) * CM_PER_INCH
+    elif match := _INCHES.fullmatch(text):
+        centimetres = float(match.group(1)) * CM_PER_INCH
+    elif match := _METRES.fullmatch(text):
+        centimetres = float(match.group(1)) * 100
+    elif match := _CENTIMETRES.fullmatch(text):
+        centimetres = float(match.group(1))
+
+    if centimetres is None or not MIN_HEIGHT_CM <= centimetres <= MAX_HEIGHT_CM:
+        return None
+    return round(centimetres)
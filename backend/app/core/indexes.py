@@ -0,0 +1,276 @@
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, GEOSPHERE, IndexModel
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Declarative index spec: collection name -> indexes the services rely on.
+INDEX_SPECS: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("mobile_number", ASCENDING)], name="mobile_number_unique", unique=True),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_id"),
+        # Partner search: equality filters first, _id last for keyset pagination
+        IndexModel(
+            [("profile_data.address.pincode", ASCENDING), ("_id", ASCENDING)],
+            name="search_pincode"
+        ),
+        IndexModel(
+            [
+                ("profile_data.address.location", ASCENDING),
+                ("profile_data.marital.marital_status", ASCENDING),
+                ("_id", ASCENDING)
+            ],
+            name="search_location_marital_status"
+        ),
+        IndexModel(
+            [
+                ("profile_data.caste.caste", ASCENDING),
+                ("profile_data.marital.marital_status", ASCENDING),
+                ("_id", ASCENDING)
+            ],
+            name="search_caste_marital_status"
+        ),
+        IndexModel(
+            [
+                ("profile_data.marital.marital_status", ASCENDING),
+                ("profile_data.marital.diet", ASCENDING),
+                ("_id", ASCENDING)
+            ],
+            name="search_marital_status_diet"
+        ),
+        IndexModel([("height_cm", ASCENDING), ("_id", ASCENDING)], name="search_height_cm"),
+        IndexModel([("geo_point", GEOSPHERE)], name="geo_point_2dsphere"),
+    ],
+    "families": [
+        IndexModel([("family_id", ASCENDING)], name="family_id_unique", unique=True),
+    ],
+    "otps": [
+        IndexModel([("mobile_number", ASCENDING)], name="mobile_number_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "rate_limits": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "family_join_requests": [
+        # Pending requests per family, keyset-paginated on (requested_at, _id)
+        IndexModel(
+            [("family_id", ASCENDING), ("status", ASCENDING), ("requested_at", ASCENDING), ("_id", ASCENDING)],
+            name="family_id_status_requested_at_id"
+        ),
+    ],
+}
+
+
+class QueryShape(NamedTuple):
+    collection: str
+    filter: Dict[str, Any]
+    description: str
+    sort: Optional[List[Tuple[str, int]]] = None
+    limit: int = 0
+    # Range and geo filters cannot also return _id order; their SORT is a top-k bounded by limit
+    expected_sort: bool = False
+
+
+# An index scan examining more keys than this per returned document is not selective enough
+MAX_KEYS_EXAMINED_PER_RETURNED = 10
+
+
+def query_shapes() -> List[QueryShape]:
+    """Every filter/sort shape issued by the services, built by the services' own query code"""
+    # The services import app.core.database, which imports this module
+    from app.schemas.search import SearchFilters
+    from app.services.auth_service import AuthService
+    from app.services.export_service import ExportService
+    from app.services.family_service import JOIN_REQUEST_SORT, encode_join_request_cursor, join_requests_query
+    from app.services.search_service import Proximity, SearchService
+
+    since = datetime(2024, 1, 1)
+    user_id = str(ObjectId())
+    page = SearchFilters().limit + 1
+
+    def export(description: str, **kwargs) -> QueryShape:
+        query, sort = ExportService.build_query(**kwargs)
+        return QueryShape("users", query, f"ExportService.iter_users ({description})", sort)
+
+    def search(
+        description: str,
+        particular: bool = False,
+        proximity: Optional[Proximity] = None,
+        expected_sort: bool = False,
+        **filters
+    ) -> QueryShape:
+        # Searcher of caste "Brahmin", open to other castes unless particular
+        query = SearchService.build_query(SearchFilters(**filters), user_id, "Brahmin", proximity, particular)
+        return QueryShape("users", query, f"SearchService.search ({description})", [("_id", -1)], page, expected_sort)
+
+    indexed = search("candidate index fetch")
+    indexed.filter["_id"]["$in"] = [ObjectId() for _ in range(page)]
+
+    return [
+        QueryShape(
+            "users",
+            AuthService._mobile_number_filter("9876543210"),
+            "AuthService.get_user_by_mobile (with legacy forms)"
+        ),
+        QueryShape("otps", {"mobile_number": "9876543210"}, "AuthService.send_otp"),
+        QueryShape(
+            "otps",
+            {
+                "mobile_number": "9876543210",
+                "is_verified": False,
+                "expires_at": {"$gt": since},
+                "attempts": {"$lt": 3}
+            },
+            "AuthService.verify_otp"
+        ),
+        export("full, resumed", after=user_id),
+        export("incremental", since=since),
+        export("incremental, resumed", after=user_id, since=since),
+        QueryShape("users", {"updated_at": {"$gte": since}}, "CandidateIndex.refresh"),
+        search("pincode", pincode="560001"),
+        search("location, marital_status", location="Bengaluru", marital_status="never_married"),
+        search(
+            "caste, marital_status, particular searcher",
+            particular=True,
+            caste="Brahmin",
+            marital_status="never_married"
+        ),
+        search("marital_status, diet", marital_status="never_married", diet="veg"),
+        search("height range", expected_sort=True, min_height_cm=160, max_height_cm=175),
+        search("next page", location="Bengaluru", marital_status="never_married", cursor=str(ObjectId())),
+        search(
+            "small radius",
+            proximity=Proximity(["560001", "560002", "560003"], (12.9716, 77.5946), 10),
+            radius_km=10
+        ),
+        search(
+            "large radius",
+            proximity=Proximity(
+                [f"{560001 + offset}" for offset in range(settings.SEARCH_MAX_PINCODES_IN + 1)],
+                (12.9716, 77.5946),
+                100
+            ),
+            expected_sort=True,
+            radius_km=100
+        ),
+        indexed,
+        QueryShape("families", {"family_id": "ABC1234"}, "FamilyService.get_family_by_id"),
+        QueryShape(
+            "family_join_requests",
+            join_requests_query("ABC1234"),
+            "FamilyService.get_join_requests",
+            JOIN_REQUEST_SORT,
+            page
+        ),
+        QueryShape(
+            "family_join_requests",
+            join_requests_query("ABC1234", encode_join_request_cursor(since, str(ObjectId()))),
+            "FamilyService.get_join_requests (next page)",
+            JOIN_REQUEST_SORT,
+            page
+        ),
+    ]
+
+
+class IndexVerificationError(RuntimeError):
+    """Raised when the live indexes do not match INDEX_SPECS"""
+
+
+async def ensure_indexes(database) -> None:
+    """Create the indexes in INDEX_SPECS and verify they match the spec"""
+    for collection_name, indexes in INDEX_SPECS.items():
+        created = await database[collection_name].create_indexes(indexes)
+        logger.info(f"Ensured indexes on {collection_name}: {', '.join(created)}")
+
+    problems = await verify_indexes(database)
+    if problems:
+        raise IndexVerificationError("; ".join(problems))
+
+
+async def verify_indexes(database) -> List[str]:
+    """Compare live indexes against INDEX_SPECS and describe any mismatch"""
+    problems = []
+
+    for collection_name, indexes in INDEX_SPECS.items():
+        live = await database[collection_name].index_information()
+
+        for index in indexes:
+            spec = index.document
+            name = spec["name"]
+            info = live.get(name)
+
+            if info is None:
+                problems.append(f"{collection_name}.{name} is missing")
+                continue
+
+            if list(info["key"]) != list(spec["key"].items()):
+                problems.append(f"{collection_name}.{name} has keys {list(info['key'])}")
+
+            for option in ("unique", "expireAfterSeconds"):
+                if spec.get(option) != info.get(option):
+                    problems.append(
+                        f"{collection_name}.{name} has {option}={info.get(option)!r}, "
+                        f"expected {spec.get(option)!r}"
+                    )
+
+    return problems
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name in an explain() plan tree"""
+    stages = []
+
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+
+    return stages
+
+
+def _plan_problems(shape: QueryShape, explain: dict) -> List[str]:
+    """Collection scans, unexpected in-memory sorts and unselective index scans in an explain()"""
+    stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+    stats = explain.get("executionStats", {})
+    problems = []
+
+    if "COLLSCAN" in stages:
+        problems.append("COLLSCAN")
+    if "SORT" in stages and not shape.expected_sort:
+        problems.append("in-memory SORT")
+
+    keys_examined = stats.get("totalKeysExamined", 0)
+    returned = stats.get("nReturned", 0)
+    if keys_examined > MAX_KEYS_EXAMINED_PER_RETURNED * max(returned, 1):
+        problems.append(f"{keys_examined} keys examined for {returned} documents")
+
+    if not problems:
+        logger.info(f"{shape.description}: {' <- '.join(stages)}")
+    return problems
+
+
+async def audit_query_plans(database) -> List[str]:
+    """Explain every query shape and report collection scans, sorts and unselective index scans"""
+    offenders = []
+
+    for shape in query_shapes():
+        find = {"find": shape.collection, "filter": shape.filter}
+        if shape.sort:
+            find["sort"] = dict(shape.sort)
+        if shape.limit:
+            find["limit"] = shape.limit
+
+        explain = await database.command({"explain": find, "verbosity": "executionStats"})
+        problems = _plan_problems(shape, explain)
+        if problems:
+            offenders.append(f"{shape.description} on {shape.collection}: {', '.join(problems)} {shape.filter}")
+
+    return offenders
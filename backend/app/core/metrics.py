@@ -0,0 +1,246 @@
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from pymongo import monitoring
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS = Counter(
+    "http_requests",
+    "HTTP responses by route template and status",
+    ["method", "route", "status"]
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum"
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection and command",
+    ["collection", "command"],
+    buckets=LATENCY_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures",
+    "Failed MongoDB commands by collection and command",
+    ["collection", "command"]
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the Motor pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+SMS_SENT = Counter(
+    "sms_messages",
+    "SMS dispatch outcomes by provider",
+    ["provider", "outcome"]
+)
+SMS_SEND_LATENCY = Histogram(
+    "sms_send_duration_seconds",
+    "SMS provider call latency",
+    ["provider"],
+    buckets=LATENCY_BUCKETS
+)
+SMS_QUEUE_DEPTH = Gauge(
+    "sms_queue_depth",
+    "Messages waiting in the SMS dispatch queue",
+    multiprocess_mode="livesum"
+)
+RATE_LIMITED = Counter(
+    "rate_limit_rejections",
+    "Requests rejected with 429 by limit",
+    ["limit"]
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the loop monitor was due to wake and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+EVENT_SUBSCRIBERS = Gauge(
+    "event_subscribers",
+    "Open event stream subscriptions",
+    multiprocess_mode="livesum"
+)
+EVENT_SUBSCRIPTIONS_DROPPED = Counter(
+    "event_subscriptions_dropped",
+    "Subscriptions closed because the reader fell behind"
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, status counts and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Dict[Callable, str] = {}
+        self._latency: Dict[Tuple[str, str], object] = {}
+        self._requests: Dict[Tuple[str, str, int], object] = {}
+
+    def _route_path(self, scope) -> str:
+        """Route template for the matched endpoint, resolved once per endpoint"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            path = next(
+                (route.path for route in scope["app"].routes if getattr(route, "endpoint", None) is endpoint),
+                UNMATCHED_ROUTE
+            )
+            self._route_paths[endpoint] = path
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+
+            method = scope["method"]
+            route = self._route_path(scope)
+
+            latency = self._latency.get((method, route))
+            if latency is None:
+                latency = self._latency[(method, route)] = REQUEST_LATENCY.labels(method, route)
+            latency.observe(elapsed)
+
+            requests = self._requests.get((method, route, status_code))
+            if requests is None:
+                requests = self._requests[(method, route, status_code)] = REQUESTS.labels(
+                    method, route, str(status_code)
+                )
+            requests.inc()
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Records MongoDB command latency per collection and command"""
+
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        collection = event.command.get(key)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else "-"
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "-")
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "-")
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Records how long operations wait to check out a pooled connection"""
+
+    def __init__(self):
+        # Motor runs each pymongo call on an executor thread, so the
+        # started/checked-out pair for one checkout shares a thread
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+            self._local.started = None
+
+    def connection_check_out_failed(self, event):
+        self.connection_checked_out(event)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def mongo_event_listeners() -> list:
+    """Listeners to pass to the Motor client"""
+    return [MongoCommandListener(), MongoPoolListener()]
+
+
+class CacheCollector:
+    """Exposes TTLCache hit/miss counters and sizes at scrape time"""
+
+    def __init__(self, get_caches: Callable[[], Iterable[Tuple[str, object]]]):
+        self.get_caches = get_caches
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Live cache entries", labels=["cache"])
+
+        for name, cache in self.get_caches():
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            size.add_metric([name], stats["size"])
+
+        yield hits
+        yield misses
+        yield size
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus exposition for this process, or every worker in multiprocess mode"""
+    # Cache counters are per process, so they are not part of the multiprocess view
+    registry: Optional[CollectorRegistry] = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
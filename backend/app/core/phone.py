@@ -0,0 +1,36 @@
+from typing import List
+import re
+
+_SEPARATORS = re.compile(r"[\s\-().]")
+
+# Stored form of a normalized number; anything else predates normalization
+NORMALIZED_MOBILE_NUMBER = re.compile(r"^[6-9]\d{9}$")
+
+
+def normalize_mobile_number(value: str) -> str:
+    """Normalize an Indian mobile number to its 10 digits, or raise ValueError"""
+    digits = _SEPARATORS.sub("", str(value))
+
+    if digits.startswith("+"):
+        if not digits.startswith("+91"):
+            raise ValueError("only +91 mobile numbers are supported")
+        digits = digits[3:]
+    elif len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+
+    if len(digits) != 10 or not digits.isdigit() or digits[0] not in "6789":
+        raise ValueError(f"invalid mobile number: {value!r}")
+
+    return digits
+
+
+def legacy_mobile_numbers(digits: str) -> List[str]:
+    """A normalized number plus the prefixed forms rows stored before normalization commonly use"""
+    return [digits, f"+91{digits}", f"91{digits}", f"0{digits}", f"+91 {digits}", f"+91-{digits}"]
+
+
+def e164_mobile_number(value: str) -> str:
+    """E.164 form ("+91" and the 10 digits) of an Indian mobile number, as SMS gateways expect"""
+    return "+91" + normalize_mobile_number(value)
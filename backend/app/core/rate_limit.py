@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Optional
+from fastapi import HTTPException, Request
+from pymongo import ReturnDocument
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import RATE_LIMITED
+from app.core.phone import normalize_mobile_number
+import json
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimit(NamedTuple):
+    limit: int
+    period_seconds: float
+
+    @property
+    def interval(self) -> float:
+        """Seconds each request adds to the key's theoretical arrival time"""
+        return self.period_seconds / self.limit
+
+
+def parse_rate_limit(value: str) -> Optional[RateLimit]:
+    """Parse "<count>/<second|minute|hour|day>"; an empty value or a count of 0 disables the limit"""
+    if not value:
+        return None
+    count, _, period = value.partition("/")
+    limit = int(count)
+    if limit <= 0:
+        return None
+    return RateLimit(limit, PERIODS[period.strip().rstrip("s")])
+
+
+class MemoryRateLimitBackend:
+    """Per-process limiter state; each worker enforces the limit on its own"""
+
+    def __init__(self, maxsize: int = 100000):
+        self.arrivals = TTLCache(maxsize)
+
+    async def hit(self, key: str, rate: RateLimit) -> float:
+        """Record one request and return 0 if allowed, else seconds until it would be"""
+        now = time.monotonic()
+        tat = max(self.arrivals.get(key, now), now)
+
+        retry_after = tat + rate.interval - rate.period_seconds - now
+        if retry_after > 0:
+            return retry_after
+
+        self.arrivals.set(key, tat + rate.interval, ttl=tat + rate.interval - now)
+        return 0
+
+
+class MongoRateLimitBackend:
+    """Limiter state shared by every worker in the rate_limits collection"""
+
+    def __init__(self, database):
+        self.collection = database.rate_limits
+
+    async def hit(self, key: str, rate: RateLimit) -> float:
+        """Record one request and return 0 if allowed, else seconds until it would be"""
+        now = datetime.utcnow()
+        now_ms = time.time() * 1000
+        interval_ms = rate.interval * 1000
+        period_ms = rate.period_seconds * 1000
+
+        # GCRA in a single atomic update: advance the key's theoretical arrival
+        # time (epoch ms) only when the request fits within the period. The
+        # arrival time never runs more than one period ahead, so the document
+        # can expire a period from now.
+        record = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tat": {"$max": [{"$ifNull": ["$tat", now_ms]}, now_ms]}}},
+                {"$set": {"allowed": {"$lte": [
+                    {"$subtract": [{"$add": ["$tat", interval_ms]}, now_ms]},
+                    period_ms
+                ]}}},
+                {"$set": {
+                    "tat": {"$cond": ["$allowed", {"$add": ["$tat", interval_ms]}, "$tat"]},
+                    "expires_at": {"$literal": now + timedelta(seconds=rate.period_seconds)}
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if record["allowed"]:
+            return 0
+        return max((record["tat"] + interval_ms - period_ms - now_ms) / 1000, 0)
+
+
+class RateLimiter:
+    """Applies rate limits through the configured backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def check(self, name: str, key: str, rate: Optional[RateLimit]) -> None:
+        """Raise 429 with Retry-After when `key` is over `rate`"""
+        if rate is None or not key:
+            return
+
+        try:
+            retry_after = await self.backend.hit(f"{name}:{key}", rate)
+        except Exception as e:
+            # Fail open: a limiter outage must not take the endpoint down with it
+            logger.error(f"Error checking rate limit {name}: {e}")
+            return
+
+        if retry_after > 0:
+            RATE_LIMITED.labels(name).inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+
+def create_rate_limiter(database) -> RateLimiter:
+    """Build the limiter selected by RATE_LIMIT_BACKEND"""
+    if settings.RATE_LIMIT_BACKEND == "mongo":
+        return RateLimiter(MongoRateLimitBackend(database))
+    return RateLimiter(MemoryRateLimitBackend(settings.RATE_LIMIT_MEMORY_KEYS))
+
+
+async def _mobile_number(request: Request) -> str:
+    """mobile_number from the JSON body, which FastAPI has already read and cached"""
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return ""
+    mobile_number = body.get("mobile_number") if isinstance(body, dict) else None
+    if not mobile_number:
+        return ""
+    # Keyed like the stored number, so "+91 98765 43210" and "9876543210" share a bucket
+    try:
+        return normalize_mobile_number(mobile_number)
+    except ValueError:
+        return str(mobile_number).strip()
+
+
+def rate_limit(name: str, per_number: str, per_ip: str) -> Callable:
+    """Dependency limiting an endpoint per client IP and per mobile_number in the body"""
+    number_rate = parse_rate_limit(per_number)
+    ip_rate = parse_rate_limit(per_ip)
+
+    async def dependency(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        limiter: RateLimiter = request.app.state.services.rate_limiter
+        # Behind a proxy listed in FORWARDED_ALLOW_IPS, uvicorn has already replaced the
+        # proxy's address with the client's from X-Forwarded-For
+        await limiter.check(f"{name}:ip", request.client.host if request.client else "", ip_rate)
+        await limiter.check(f"{name}:number", await _mobile_number(request), number_rate)
+
+    return dependency
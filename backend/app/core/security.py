@@ -1,14 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Optional, Union
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
+import asyncio
+import hashlib
+import os
 import secrets
 import string
+import time
+
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT is only needed for JWT_BACKEND=pyjwt
+    pyjwt = None
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# Verified claims keyed by token digest; entries expire with the token's exp claim
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE)
+
+# Bounded pool for CPU-bound crypto so bcrypt never runs on the event loop.
+# Threads start lazily on first use, i.e. after gunicorn has forked the workers.
+crypto_executor = ThreadPoolExecutor(
+    max_workers=settings.CRYPTO_EXECUTOR_WORKERS or min(4, os.cpu_count() or 1),
+    thread_name_prefix="crypto"
+)
+
+_JWT_ERRORS = (JWTError, pyjwt.PyJWTError) if pyjwt is not None else (JWTError,)
+
+
+def _use_pyjwt() -> bool:
+    """Whether the PyJWT backend is selected"""
+    if settings.JWT_BACKEND == "pyjwt":
+        if pyjwt is None:
+            raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package")
+        return True
+    return False
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
@@ -17,8 +54,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
+
     to_encode.update({"exp": expire})
+    if _use_pyjwt():
+        return pyjwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -26,12 +65,47 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 def verify_token(token: str) -> Optional[dict]:
     """Verify JWT token"""
     try:
+        if _use_pyjwt():
+            return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
-    except JWTError:
+    except _JWT_ERRORS:
         return None
 
 
+def verify_token_cached(token: str) -> Optional[dict]:
+    """Verify JWT token, reusing claims verified earlier for the same token"""
+    if not settings.TOKEN_CACHE_ENABLED:
+        return verify_token(token)
+
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    if payload and "exp" in payload:
+        token_cache.set(key, payload, ttl=payload["exp"] - time.time())
+
+    return payload
+
+
+async def get_current_user_id(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> str:
+    """Get current user ID from the Authorization: Bearer header"""
+    payload = verify_token_cached(credentials.credentials) if credentials else None
+
+    if not payload or not payload.get("user_id"):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    return payload["user_id"]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -42,6 +116,32 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_in_crypto_executor(func, *args, **kwargs):
+    """Run a blocking crypto call on the crypto executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(crypto_executor, partial(func, *args, **kwargs))
+
+
+async def create_access_token_async(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create JWT access token off the event loop"""
+    return await _run_in_crypto_executor(create_access_token, data, expires_delta)
+
+
+async def verify_token_async(token: str) -> Optional[dict]:
+    """Verify JWT token off the event loop"""
+    return await _run_in_crypto_executor(verify_token, token)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password off the event loop"""
+    return await _run_in_crypto_executor(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password off the event loop"""
+    return await _run_in_crypto_executor(get_password_hash, password)
+
+
 def generate_otp(length: int = 4) -> str:
     """Generate OTP"""
     return ''.join(secrets.choice(string.digits) for _ in range(length))
@@ -0,0 +1,107 @@
+from typing import Any, Dict, List, Optional
+from uvicorn import Server
+from app.core.config import settings
+from app.core.events import close_event_streams
+import os
+import socket
+import sys
+
+try:
+    from gunicorn.arbiter import Arbiter
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # gunicorn is not available on Windows
+    UvicornWorker = object
+
+
+class DrainingServer(Server):
+    """uvicorn Server that ends event streams before waiting on in-flight responses
+
+    uvicorn only runs lifespan shutdown (which stops the services) once every
+    response has finished, so an open SSE stream would otherwise hold the worker
+    until gunicorn kills it.
+    """
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        close_event_streams()
+        await super().shutdown(sockets)
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools"""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        # Leaves the rest of gunicorn's graceful timeout for lifespan shutdown
+        # (the SMS dispatcher drains for up to half of it)
+        "timeout_graceful_shutdown": settings.GRACEFUL_TIMEOUT_SECONDS / 3
+    }
+
+    async def _serve(self) -> None:
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+def default_worker_count() -> int:
+    """One async worker per CPU available to this process"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    """Gunicorn settings derived from Settings"""
+    return {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": settings.WEB_CONCURRENCY or default_worker_count(),
+        "worker_class": "app.core.server.ProductionUvicornWorker",
+        # Import the app once in the master; Motor clients are created per
+        # worker by the lifespan, after fork
+        "preload_app": True,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT_SECONDS,
+        "timeout": settings.WORKER_TIMEOUT_SECONDS,
+        "keepalive": settings.KEEPALIVE_SECONDS,
+        "backlog": settings.BACKLOG,
+        # Passed on to uvicorn's proxy headers middleware by the worker
+        "forwarded_allow_ips": settings.FORWARDED_ALLOW_IPS,
+        "max_requests": settings.WORKER_MAX_REQUESTS,
+        "max_requests_jitter": settings.WORKER_MAX_REQUESTS_JITTER,
+        "loglevel": settings.LOG_LEVEL,
+        "accesslog": "-" if settings.ACCESS_LOG else None,
+        "errorlog": "-",
+    }
+
+
+def serve() -> None:
+    """Run the API: auto-reloading uvicorn in DEBUG, multi-worker gunicorn otherwise"""
+    if settings.DEBUG:
+        import uvicorn
+        uvicorn.run(
+            "app.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=True,
+            log_level=settings.LOG_LEVEL,
+            proxy_headers=True,
+            forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS
+        )
+        return
+
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options().items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    ProductionApplication().run()
@@ -1,14 +1,42 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from prometheus_client import REGISTRY
 from app.core.config import settings
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.container import ServiceContainer
+from app.core.database import connect_to_mongo, close_mongo_connection, get_database
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.metrics import CacheCollector, MetricsMiddleware, render_metrics
+from app.core.security import token_cache
 from app.api.v1.api import api_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect to MongoDB and build and start the service container once per process"""
+    await connect_to_mongo()
+    app.state.services = ServiceContainer(get_database())
+    await app.state.services.start()
+    
+    loop_monitor = LoopLagMonitor(settings.LOOP_LAG_INTERVAL_SECONDS, settings.LOOP_LAG_WARN_SECONDS)
+    if settings.LOOP_LAG_MONITOR_ENABLED:
+        loop_monitor.start()
+    
+    yield
+    
+    await loop_monitor.stop()
+    await app.state.services.stop()
+    await close_mongo_connection()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -20,20 +48,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Startup event"""
-    await connect_to_mongo()
+def _caches():
+    """Caches reported on /metrics"""
+    yield "tokens", token_cache
+    services = getattr(app.state, "services", None)
+    if services:
+        yield "families", services.family_service.family_cache
+        yield "user_families", services.family_service.user_family_cache
+        yield "family_members", services.family_service.member_cache
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Shutdown event"""
-    await close_mongo_connection()
+REGISTRY.register(CacheCollector(_caches))
 
 
 @app.get("/")
@@ -52,11 +84,15 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=settings.DEBUG
-    )
+    from app.core.server import serve
+    serve()
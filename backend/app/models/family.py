@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -11,7 +11,7 @@ class FamilyJoinStatus(str, Enum):
 
 
 class Family(BaseModel):
-    id: Optional[str] = Field(alias="_id")
+    id: Optional[str] = Field(default=None, alias="_id")
     family_id: str
     created_by: str
     members: List[str] = []
@@ -19,11 +19,7 @@ class Family(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
 
-    class Config:
-        populate_by_name = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class FamilyCreate(BaseModel):
@@ -31,7 +27,7 @@ class FamilyCreate(BaseModel):
 
 
 class FamilyJoinRequest(BaseModel):
-    id: Optional[str] = Field(alias="_id")
+    id: Optional[str] = Field(default=None, alias="_id")
     family_id: str
     requester_id: str
     requester_name: str
@@ -39,11 +35,7 @@ class FamilyJoinRequest(BaseModel):
     requested_at: datetime = Field(default_factory=datetime.utcnow)
     processed_at: Optional[datetime] = None
 
-    class Config:
-        populate_by_name = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class FamilyResponse(BaseModel):
@@ -55,8 +47,7 @@ class FamilyResponse(BaseModel):
     updated_at: datetime
     is_active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FamilyJoinRequestResponse(BaseModel):
@@ -68,5 +59,4 @@ class FamilyJoinRequestResponse(BaseModel):
     requested_at: datetime
     processed_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
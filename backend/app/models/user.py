@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -10,7 +10,7 @@ class ProfileType(str, Enum):
 
 
 class User(BaseModel):
-    id: Optional[str] = Field(alias="_id")
+    id: Optional[str] = Field(default=None, alias="_id")
     name: str
     email: Optional[str] = None
     mobile_number: str
@@ -18,15 +18,20 @@ class User(BaseModel):
     family_id: Optional[str] = None
     profile_type: ProfileType = ProfileType.MYSELF
     profile_data: Optional[dict] = None
+    profile_completion: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
 
-    class Config:
-        populate_by_name = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class UserAuthSummary(BaseModel):
+    id: str = Field(alias="_id")
+    mobile_number: str
+    is_active: bool = True
+
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class UserCreate(BaseModel):
@@ -56,5 +61,4 @@ class UserResponse(BaseModel):
     updated_at: datetime
     is_active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
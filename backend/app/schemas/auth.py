@@ -1,8 +1,19 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
+from app.core.phone import normalize_mobile_number
 from app.models.user import ProfileType
 
 
+class MobileNumberRequest(BaseModel):
+    """Request carrying a mobile number, normalized to 10 digits so every path stores and looks up the same value"""
+    mobile_number: str
+
+    @field_validator("mobile_number")
+    @classmethod
+    def normalize_mobile(cls, value: str) -> str:
+        return normalize_mobile_number(value)
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -12,23 +23,21 @@ class TokenData(BaseModel):
     user_id: Optional[str] = None
 
 
-class LoginRequest(BaseModel):
-    mobile_number: str
+class LoginRequest(MobileNumberRequest):
+    pass
 
 
-class RegisterRequest(BaseModel):
+class RegisterRequest(MobileNumberRequest):
     name: str
-    mobile_number: str
     profile_type: ProfileType = ProfileType.MYSELF
     family_id: Optional[str] = None
 
 
-class OTPRequest(BaseModel):
-    mobile_number: str
+class OTPRequest(MobileNumberRequest):
+    pass
 
 
-class OTPVerifyRequest(BaseModel):
-    mobile_number: str
+class OTPVerifyRequest(MobileNumberRequest):
     otp: str
 
 
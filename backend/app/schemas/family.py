@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
-from app.models.family import FamilyJoinStatus
+from app.models.family import Family, FamilyJoinStatus
 
 
 class FamilyCreateRequest(BaseModel):
@@ -12,6 +12,14 @@ class FamilyJoinRequest(BaseModel):
     user_id: str
 
 
+class FamilyMemberSummary(BaseModel):
+    id: str
+    name: str
+    profile_type: Optional[str] = None
+    profile_completion: int = 0
+    is_active: bool = True
+
+
 class FamilyResponse(BaseModel):
     id: str
     family_id: str
@@ -20,6 +28,8 @@ class FamilyResponse(BaseModel):
     created_at: str
     updated_at: str
     is_active: bool
+    # Only with ?expand=members
+    member_details: Optional[List[FamilyMemberSummary]] = None
 
 
 class FamilyJoinRequestResponse(BaseModel):
@@ -32,5 +42,36 @@ class FamilyJoinRequestResponse(BaseModel):
     processed_at: Optional[str] = None
 
 
+class FamilyJoinRequestPage(BaseModel):
+    requests: List[FamilyJoinRequestResponse]
+    next_cursor: Optional[str] = None
+
+
 class FamilyJoinRequestAction(BaseModel):
     action: str  # "approve" or "reject"
+
+
+def family_response(family: Family) -> dict:
+    """FamilyResponse wire format built directly from a Family"""
+    return {
+        "id": family.id,
+        "family_id": family.family_id,
+        "created_by": family.created_by,
+        "members": family.members,
+        "created_at": family.created_at,
+        "updated_at": family.updated_at,
+        "is_active": family.is_active
+    }
+
+
+def join_request_response(document: dict) -> dict:
+    """FamilyJoinRequestResponse wire format built directly from a stored join request"""
+    return {
+        "id": str(document["_id"]),
+        "family_id": document["family_id"],
+        "requester_id": document["requester_id"],
+        "requester_name": document["requester_name"],
+        "status": document["status"],
+        "requested_at": document["requested_at"],
+        "processed_at": document.get("processed_at")
+    }
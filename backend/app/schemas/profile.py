@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 
 
 class AddressData(BaseModel):
@@ -27,6 +27,32 @@ class ProfileData(BaseModel):
     marital: Optional[MaritalData] = None
 
 
+class AddressPatch(BaseModel):
+    location: Optional[str] = None
+    pincode: Optional[str] = None
+    grew_up_in: Optional[str] = None
+    residency_status: Optional[str] = None
+
+
+class CastePatch(BaseModel):
+    caste: Optional[str] = None
+    subcaste: Optional[str] = None
+    is_not_particular_about_caste: Optional[bool] = None
+
+
+class MaritalPatch(BaseModel):
+    marital_status: Optional[str] = None
+    height: Optional[str] = None
+    diet: Optional[str] = None
+
+
+class ProfilePatch(BaseModel):
+    """Sparse ProfileData: omitted fields are left alone, explicit nulls are removed"""
+    address: Optional[AddressPatch] = None
+    caste: Optional[CastePatch] = None
+    marital: Optional[MaritalPatch] = None
+
+
 class ProfileUpdateRequest(BaseModel):
     user_id: str
     profile_data: ProfileData
@@ -36,3 +62,28 @@ class ProfileResponse(BaseModel):
     user_id: str
     profile_data: ProfileData
     completion_percentage: int
+
+
+# Each ProfileData section's fields and the value reported when one is missing
+PROFILE_SECTION_DEFAULTS: Dict[str, dict] = {
+    section: {name: None if field.is_required() else field.default for name, field in model.model_fields.items()}
+    for section, model in (("address", AddressData), ("caste", CasteData), ("marital", MaritalData))
+}
+
+
+def profile_data_response(profile_data: Optional[dict]) -> Optional[dict]:
+    """ProfileData wire format from a stored document: every field present, unknown keys dropped
+
+    Stored documents may lack fields (removed by PATCH, or written before they
+    existed), so this fills keys rather than validating with ProfileData.
+    """
+    if profile_data is None:
+        return None
+    response = {}
+    for section, defaults in PROFILE_SECTION_DEFAULTS.items():
+        stored = profile_data.get(section)
+        response[section] = (
+            {name: stored.get(name, default) for name, default in defaults.items()}
+            if isinstance(stored, dict) else None
+        )
+    return response
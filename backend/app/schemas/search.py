@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from app.core.config import settings
+
+
+class SearchFilters(BaseModel):
+    location: Optional[str] = None
+    pincode: Optional[str] = None
+    caste: Optional[str] = None
+    subcaste: Optional[str] = None
+    marital_status: Optional[str] = None
+    height: Optional[str] = None
+    diet: Optional[str] = None
+    min_height_cm: Optional[int] = Field(default=None, ge=0)
+    max_height_cm: Optional[int] = Field(default=None, ge=0)
+    near_pincode: Optional[str] = None
+    radius_km: Optional[float] = Field(default=None, gt=0, le=settings.SEARCH_MAX_RADIUS_KM)
+    limit: int = Field(default=20, ge=1, le=100)
+    cursor: Optional[str] = None
+
+
+class SearchResult(BaseModel):
+    id: str
+    name: str
+    family_id: Optional[str] = None
+    profile_data: dict
+    profile_completion: int = 0
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    next_cursor: Optional[str] = None
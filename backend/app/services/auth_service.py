@@ -1,63 +1,76 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Union
 from bson import ObjectId
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from app.core.database import get_database
+from app.core.phone import NORMALIZED_MOBILE_NUMBER, legacy_mobile_numbers, normalize_mobile_number
 from app.core.security import generate_otp, create_access_token
-from app.models.user import User, UserCreate, ProfileType
-from app.models.otp import OTP, OTPCreate, OTPVerify
+from app.models.user import User, UserAuthSummary, UserCreate, ProfileType
 from app.core.config import settings
+from app.services.sms_service import SMSDispatcher, SMSUnavailableError
 import logging
 
 logger = logging.getLogger(__name__)
 
+AUTH_SUMMARY_PROJECTION = {"mobile_number": 1, "is_active": 1}
+
+DUPLICATE_KEY = 11000
+
 
 class AuthService:
-    def __init__(self):
-        self.db = get_database()
+    def __init__(self, database=None, sms_dispatcher: Optional[SMSDispatcher] = None):
+        self.db = database if database is not None else get_database()
         self.users_collection = self.db.users
         self.otp_collection = self.db.otps
+        self.sms_dispatcher = sms_dispatcher
 
     async def send_otp(self, mobile_number: str) -> dict:
         """Send OTP to mobile number"""
         try:
             # Generate OTP (using default 1234 for testing)
             otp_code = "1234"  # generate_otp(settings.OTP_LENGTH)
-            expires_at = datetime.utcnow() + timedelta(minutes=settings.OTP_EXPIRE_MINUTES)
+            now = datetime.utcnow()
+            expires_at = now + timedelta(minutes=settings.OTP_EXPIRE_MINUTES)
             
-            # Check if OTP already exists for this mobile number
-            existing_otp = await self.otp_collection.find_one({
-                "mobile_number": mobile_number,
-                "is_verified": False
-            })
+            # One OTP document per number, reset atomically on every send
+            for attempt in range(2):
+                try:
+                    otp_record = await self.otp_collection.find_one_and_update(
+                        {"mobile_number": mobile_number},
+                        {
+                            "$set": {
+                                "otp": otp_code,
+                                "expires_at": expires_at,
+                                "attempts": 0,
+                                "is_verified": False,
+                                "created_at": now
+                            }
+                        },
+                        projection={"expires_at": 1},
+                        upsert=True,
+                        return_document=ReturnDocument.AFTER
+                    )
+                    break
+                except DuplicateKeyError:
+                    # A concurrent send inserted the document first; retry as an update
+                    if attempt:
+                        raise
             
-            if existing_otp:
-                # Update existing OTP
-                await self.otp_collection.update_one(
-                    {"_id": existing_otp["_id"]},
-                    {
-                        "$set": {
-                            "otp": otp_code,
-                            "expires_at": expires_at,
-                            "attempts": 0,
-                            "created_at": datetime.utcnow()
-                        }
-                    }
+            # Delivery happens in the background; the request only waits for the write
+            if self.sms_dispatcher is not None:
+                queued = self.sms_dispatcher.enqueue(
+                    mobile_number,
+                    f"Your DrShaadi verification code is {otp_code}"
                 )
+                if not queued:
+                    raise SMSUnavailableError("SMS delivery is temporarily unavailable, please retry")
             else:
-                # Create new OTP
-                otp_data = OTP(
-                    mobile_number=mobile_number,
-                    otp=otp_code,
-                    expires_at=expires_at
-                )
-                await self.otp_collection.insert_one(otp_data.dict(by_alias=True))
-            
-            # In production, send SMS here using Twilio or similar service
-            logger.info(f"OTP for {mobile_number}: {otp_code}")
+                logger.info(f"OTP for {mobile_number}: {otp_code}")
             
             return {
                 "mobile_number": mobile_number,
-                "expires_at": expires_at.isoformat(),
+                "expires_at": otp_record["expires_at"].isoformat(),
                 "message": "OTP sent successfully"
             }
             
@@ -68,30 +81,28 @@ class AuthService:
     async def verify_otp(self, mobile_number: str, otp: str) -> bool:
         """Verify OTP"""
         try:
-            otp_record = await self.otp_collection.find_one({
-                "mobile_number": mobile_number,
-                "otp": otp,
-                "is_verified": False
-            })
-            
-            if not otp_record:
-                return False
-            
-            # Check if OTP is expired
-            if datetime.utcnow() > otp_record["expires_at"]:
-                return False
-            
-            # Check attempts
-            if otp_record["attempts"] >= settings.MAX_OTP_ATTEMPTS:
-                return False
-            
-            # Mark OTP as verified
-            await self.otp_collection.update_one(
-                {"_id": otp_record["_id"]},
-                {"$set": {"is_verified": True}}
+            # Expiry and attempts are checked in the filter; every attempt is
+            # counted server-side and a matching code marks the OTP verified
+            otp_record = await self.otp_collection.find_one_and_update(
+                {
+                    "mobile_number": mobile_number,
+                    "is_verified": False,
+                    "expires_at": {"$gt": datetime.utcnow()},
+                    "attempts": {"$lt": settings.MAX_OTP_ATTEMPTS}
+                },
+                [
+                    {
+                        "$set": {
+                            "attempts": {"$add": ["$attempts", 1]},
+                            "is_verified": {"$eq": ["$otp", {"$literal": otp}]}
+                        }
+                    }
+                ],
+                projection={"is_verified": 1},
+                return_document=ReturnDocument.AFTER
             )
             
-            return True
+            return bool(otp_record and otp_record["is_verified"])
             
         except Exception as e:
             logger.error(f"Error verifying OTP: {e}")
@@ -108,7 +119,7 @@ class AuthService:
                 is_mobile_verified=True
             )
             
-            result = await self.users_collection.insert_one(user.dict(by_alias=True))
+            result = await self.users_collection.insert_one(user.model_dump(by_alias=True, exclude={"id"}))
             user.id = str(result.inserted_id)
             
             return user
@@ -117,15 +128,135 @@ class AuthService:
             logger.error(f"Error creating user: {e}")
             raise
 
+    @staticmethod
+    def _mobile_number_filter(mobile_number: str) -> dict:
+        """Match a normalized number and the prefixed forms of rows stored before normalization
+
+        Users stored as "+91...", "91..." or "0..." stay reachable until
+        `manage.py normalize-mobile-numbers` rewrites them; it is one index lookup per form.
+        """
+        return {"mobile_number": {"$in": legacy_mobile_numbers(mobile_number)}}
+
+    async def normalize_stored_mobile_numbers(self, batch_size: int = 500) -> dict:
+        """Rewrite users and otps stored before mobile numbers were normalized, in _id order batches
+
+        A user whose normalized number already belongs to another user is left
+        unchanged and reported as a collision for a manual merge; a legacy OTP
+        whose number already has a current OTP is removed.
+        """
+        report = {"users": 0, "otps": 0, "otps_removed": 0, "collisions": [], "invalid": []}
+        now = datetime.utcnow()
+        
+        async for batch in self._legacy_mobile_batches(self.users_collection, batch_size, report):
+            operations = [
+                UpdateOne(
+                    {"_id": _id, "mobile_number": stored},
+                    {"$set": {"mobile_number": normalized, "updated_at": now}}
+                )
+                for _id, stored, normalized in batch
+            ]
+            try:
+                result = await self.users_collection.bulk_write(operations, ordered=False)
+                report["users"] += result.modified_count
+            except BulkWriteError as e:
+                report["users"] += e.details["nModified"]
+                for error in e.details["writeErrors"]:
+                    if error["code"] != DUPLICATE_KEY:
+                        raise
+                    _id, stored, normalized = batch[error["index"]]
+                    owner = await self.users_collection.find_one({"mobile_number": normalized}, {"_id": 1})
+                    report["collisions"].append({
+                        "id": str(_id),
+                        "mobile_number": stored,
+                        "normalized": normalized,
+                        "conflicts_with": str(owner["_id"]) if owner else None
+                    })
+            logger.info(f"Normalized mobile numbers for {report['users']} users")
+        
+        async for batch in self._legacy_mobile_batches(self.otp_collection, batch_size, report):
+            operations = [
+                UpdateOne({"_id": _id, "mobile_number": stored}, {"$set": {"mobile_number": normalized}})
+                for _id, stored, normalized in batch
+            ]
+            try:
+                result = await self.otp_collection.bulk_write(operations, ordered=False)
+                report["otps"] += result.modified_count
+            except BulkWriteError as e:
+                report["otps"] += e.details["nModified"]
+                duplicates = []
+                for error in e.details["writeErrors"]:
+                    if error["code"] != DUPLICATE_KEY:
+                        raise
+                    duplicates.append(DeleteOne({"_id": batch[error["index"]][0]}))
+                result = await self.otp_collection.bulk_write(duplicates, ordered=False)
+                report["otps_removed"] += result.deleted_count
+        
+        return report
+
+    @staticmethod
+    async def _legacy_mobile_batches(collection, batch_size: int, report: dict):
+        """(_id, stored, normalized) batches of documents whose mobile_number is not normalized"""
+        last_id = None
+        
+        while True:
+            query = {"mobile_number": {"$not": NORMALIZED_MOBILE_NUMBER}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            
+            documents = await collection.find(
+                query,
+                {"mobile_number": 1}
+            ).sort("_id", 1).limit(batch_size).to_list(batch_size)
+            
+            if not documents:
+                return
+            last_id = documents[-1]["_id"]
+            
+            batch = []
+            for document in documents:
+                stored = document.get("mobile_number")
+                try:
+                    batch.append((document["_id"], stored, normalize_mobile_number(stored)))
+                except (TypeError, ValueError):
+                    report["invalid"].append({
+                        "collection": collection.name, "id": str(document["_id"]), "mobile_number": stored
+                    })
+            if batch:
+                yield batch
+
+    async def user_exists_by_mobile(self, mobile_number: str) -> bool:
+        """Check whether a user is registered with this mobile number"""
+        user_data = await self.users_collection.find_one(
+            self._mobile_number_filter(mobile_number),
+            {"_id": 1}
+        )
+        return user_data is not None
+
+    async def get_auth_summary_by_mobile(self, mobile_number: str) -> Optional[UserAuthSummary]:
+        """Get the fields needed to mint a token for a mobile number"""
+        try:
+            user_data = await self.users_collection.find_one(
+                self._mobile_number_filter(mobile_number),
+                AUTH_SUMMARY_PROJECTION
+            )
+            
+            if user_data:
+                user_data["_id"] = str(user_data["_id"])
+                return UserAuthSummary(**user_data)
+            
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error getting user auth summary: {e}")
+            return None
+
     async def get_user_by_mobile(self, mobile_number: str) -> Optional[User]:
         """Get user by mobile number"""
         try:
-            user_data = await self.users_collection.find_one({
-                "mobile_number": mobile_number
-            })
+            user_data = await self.users_collection.find_one(self._mobile_number_filter(mobile_number))
             
             if user_data:
-                user_data["id"] = str(user_data["_id"])
+                user_data["_id"] = str(user_data["_id"])
                 return User(**user_data)
             
             return None
@@ -142,7 +273,7 @@ class AuthService:
             })
             
             if user_data:
-                user_data["id"] = str(user_data["_id"])
+                user_data["_id"] = str(user_data["_id"])
                 return User(**user_data)
             
             return None
@@ -151,7 +282,7 @@ class AuthService:
             logger.error(f"Error getting user by ID: {e}")
             return None
 
-    async def create_access_token_for_user(self, user: User) -> str:
+    async def create_access_token_for_user(self, user: Union[User, UserAuthSummary]) -> str:
         """Create access token for user"""
         token_data = {
             "user_id": user.id,
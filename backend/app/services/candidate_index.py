@@ -0,0 +1,429 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from bson import ObjectId
+from app.core.database import get_database
+import asyncio
+import logging
+import numpy as np
+import time
+
+logger = logging.getLogger(__name__)
+
+# Indexed field -> (section, key) inside profile_data
+INDEX_FIELDS = {
+    "location": ("address", "location"),
+    "pincode": ("address", "pincode"),
+    "residency_status": ("address", "residency_status"),
+    "caste": ("caste", "caste"),
+    "subcaste": ("caste", "subcaste"),
+    "marital_status": ("marital", "marital_status"),
+    "height": ("marital", "height"),
+    "diet": ("marital", "diet"),
+}
+
+# Fields with at most this many distinct values keep one packed bitset per value;
+# higher-cardinality fields (pincode, subcaste) are matched from their code column
+BITSET_MAX_CARDINALITY = 64
+
+# Rows unpacked per step when walking a match from the newest _id backwards
+MATCH_BLOCK_ROWS = 65536
+
+INDEX_PROJECTION = {"is_active": 1, "profile_data": 1, "height_cm": 1, "updated_at": 1}
+
+# Re-read this much before the watermark so writes committed out of order are not missed
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+MISSING = 0
+
+# Code columns start as uint16 and widen once a field has more distinct values
+# than that holds (free-text fields such as location or subcaste can)
+NARROW_CODE_MAX = np.iinfo(np.uint16).max
+
+
+def _key(object_id: ObjectId) -> bytes:
+    """Row key for an _id; numpy's S12 drops trailing NUL bytes, so strip them up front"""
+    return object_id.binary.rstrip(b"\x00")
+
+
+def _object_id(key: bytes) -> ObjectId:
+    return ObjectId(key.ljust(12, b"\x00"))
+
+
+class CandidateIndex:
+    """In-process columnar index of categorical profile_data fields for partner filtering
+
+    Rows are kept in _id order. Each field is a uint16 code column (code 0 =
+    missing), widened to uint32 if its vocabulary outgrows uint16; low-cardinality fields also get a packed bitset per value so a
+    filter is a vectorized AND of ORs. height_cm is a plain numeric column for
+    range filters. Memory per million profiles is about 12MB of ids, 18MB of
+    columns and 1MB of flags plus 125KB per bitset value (~10MB with the
+    default vocabularies), i.e. roughly 40MB.
+
+    A refresh builds the next version off the event loop: it copies the ids,
+    columns and flags (~30MB per million, ~8ms of memcpy) and patches only
+    the bitset bytes covering changed rows, so bitsets whose bits did not
+    change are shared with the previous version instead of held twice (~4ms
+    for 500 changed rows). New rows grow every bitset; new rows that sort
+    before existing ones, and full loads, rebuild them all (~10ms per
+    million profiles). Measured with benchmarks/bench_candidate_index.py.
+    """
+
+    def __init__(self, database=None):
+        self.db = database if database is not None else get_database()
+        self.users_collection = self.db.users
+        self.ready = False
+        self.watermark: Optional[datetime] = None
+        self._reset()
+        self._task: Optional[asyncio.Task] = None
+
+    def _reset(self) -> None:
+        self.ids = np.empty(0, dtype="S12")
+        self.codes = {field: np.empty(0, dtype=np.uint16) for field in INDEX_FIELDS}
+        self.height_cm = np.empty(0, dtype=np.uint16)
+        self.vocab: Dict[str, Dict[str, int]] = {field: {} for field in INDEX_FIELDS}
+        self.active = np.empty(0, dtype=bool)
+        self.not_particular = np.empty(0, dtype=bool)
+        self._bitsets: Dict[str, Dict[int, np.ndarray]] = {}
+        self._active_bits = np.empty(0, dtype=np.uint8)
+        self._not_particular_bits = np.empty(0, dtype=np.uint8)
+        # Rows changed by apply() since the bitsets were last built or patched
+        self._changed_rows: List[np.ndarray] = []
+        self._resorted = False
+        # updated_at of rows inside the refresh overlap window, so re-reads of rows
+        # already applied are skipped
+        self._recent: Dict[bytes, datetime] = {}
+
+    def _copy(self) -> "CandidateIndex":
+        """Independent copy for building the next version off the event loop"""
+        copy = CandidateIndex(self.db)
+        copy.ids = self.ids.copy()
+        copy.codes = {field: column.copy() for field, column in self.codes.items()}
+        copy.height_cm = self.height_cm.copy()
+        copy.vocab = {field: dict(vocab) for field, vocab in self.vocab.items()}
+        copy.active = self.active.copy()
+        copy.not_particular = self.not_particular.copy()
+        # Bitsets are never modified in place, so the copy shares them until patched
+        copy._bitsets = {field: dict(bitsets) for field, bitsets in self._bitsets.items()}
+        copy._active_bits, copy._not_particular_bits = self._active_bits, self._not_particular_bits
+        copy.watermark = self.watermark
+        copy._recent = dict(self._recent)
+        return copy
+
+    def _adopt(self, other: "CandidateIndex") -> None:
+        """Swap in another version's state; matches never see a partial update"""
+        self.ids, self.codes, self.vocab = other.ids, other.codes, other.vocab
+        self.height_cm = other.height_cm
+        self.active, self.not_particular = other.active, other.not_particular
+        self._bitsets = other._bitsets
+        self._active_bits, self._not_particular_bits = other._active_bits, other._not_particular_bits
+        self.watermark = other.watermark
+        self._recent = other._recent
+        self.ready = True
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _code(self, field: str, value) -> int:
+        if value is None or value == "":
+            return MISSING
+        vocab = self.vocab[field]
+        code = vocab.get(value)
+        if code is None:
+            code = vocab[value] = len(vocab) + 1
+            if code > NARROW_CODE_MAX and self.codes[field].dtype == np.uint16:
+                # Assigning past the dtype's range would wrap onto another value's code
+                logger.warning(f"Candidate index field {field} exceeded {NARROW_CODE_MAX} values; widening to uint32")
+                self.codes[field] = self.codes[field].astype(np.uint32)
+        return code
+
+    def apply(self, documents: Iterable[dict]) -> int:
+        """Insert or update rows from user documents; returns the number applied"""
+        new_ids, new_rows, updated_rows = [], [], []
+        applied = 0
+
+        for document in documents:
+            applied += 1
+            active = document.get("is_active") is True and document.get("profile_data") is not None
+            profile_data = document.get("profile_data") or {}
+            row = [
+                self._code(field, (profile_data.get(section) or {}).get(key))
+                for field, (section, key) in INDEX_FIELDS.items()
+            ]
+            row.append(document.get("height_cm") or MISSING)
+            flags = (
+                active,
+                (profile_data.get("caste") or {}).get("is_not_particular_about_caste") is True
+            )
+
+            key = _key(document["_id"])
+            updated_at = document.get("updated_at")
+            if updated_at is not None:
+                self._recent[key] = updated_at
+                if self.watermark is None or updated_at > self.watermark:
+                    self.watermark = updated_at
+
+            position = int(np.searchsorted(self.ids, key))
+            if position < len(self.ids) and self.ids[position] == key:
+                for column, code in zip([*self.codes.values(), self.height_cm], row):
+                    column[position] = code
+                self.active[position], self.not_particular[position] = flags
+                updated_rows.append(position)
+            else:
+                new_ids.append(key)
+                new_rows.append((row, flags))
+
+        if self.watermark is not None:
+            cutoff = self.watermark - REFRESH_OVERLAP
+            self._recent = {key: updated_at for key, updated_at in self._recent.items() if updated_at >= cutoff}
+        if updated_rows:
+            self._changed_rows.append(np.array(updated_rows, dtype=np.int64))
+        if new_ids:
+            self._append(new_ids, new_rows)
+
+        return applied
+
+    def _append(self, new_ids: List[bytes], new_rows: list) -> None:
+        ids = np.array(new_ids, dtype="S12")
+        codes = np.array([row for row, _ in new_rows], dtype=np.uint32).reshape(len(new_rows), len(INDEX_FIELDS) + 1)
+        flags = np.array([flags for _, flags in new_rows], dtype=bool).reshape(len(new_rows), 2)
+        count = len(self.ids)
+
+        self.ids = np.concatenate([self.ids, ids])
+        for index, field in enumerate(INDEX_FIELDS):
+            column = self.codes[field]
+            self.codes[field] = np.concatenate([column, codes[:, index].astype(column.dtype)])
+        self.height_cm = np.concatenate([self.height_cm, codes[:, -1].astype(np.uint16)])
+        self.active = np.concatenate([self.active, flags[:, 0]])
+        self.not_particular = np.concatenate([self.not_particular, flags[:, 1]])
+
+        # ObjectIds are roughly time ordered, so new users usually append in order
+        if len(self.ids) > 1 and not (self.ids[:-1] <= self.ids[1:]).all():
+            # Existing rows moved, so every bitset has to be rebuilt
+            self._resorted = True
+            order = np.argsort(self.ids, kind="stable")
+            self.ids = self.ids[order]
+            self.codes = {field: column[order] for field, column in self.codes.items()}
+            self.height_cm = self.height_cm[order]
+            self.active = self.active[order]
+            self.not_particular = self.not_particular[order]
+        else:
+            self._changed_rows.append(np.arange(count, len(self.ids)))
+
+    def build_bitsets(self) -> None:
+        """Rebuild packed per-value bitsets from the code columns"""
+        bitsets = {}
+        for field, vocab in self.vocab.items():
+            if len(vocab) <= BITSET_MAX_CARDINALITY:
+                column = self.codes[field]
+                bitsets[field] = {code: np.packbits(column == code) for code in (MISSING, *vocab.values())}
+
+        self._bitsets = bitsets
+        self._active_bits = np.packbits(self.active)
+        self._not_particular_bits = np.packbits(self.not_particular)
+        self._changed_rows = []
+        self._resorted = False
+
+    def update_bitsets(self) -> None:
+        """Patch the bitsets for rows changed since they were built, copying only the ones that differ"""
+        if self._resorted or not self._bitsets:
+            self.build_bitsets()
+            return
+        if not self._changed_rows:
+            return
+
+        count = len(self.ids)
+        size = (count + 7) // 8
+        # Every row in the bytes the changed rows fall in; rows past the end pack as zero
+        blocks = np.unique(np.concatenate(self._changed_rows) // 8)
+        rows = (blocks[:, None] * 8 + np.arange(8)).ravel()
+        in_range = rows < count
+        rows = np.minimum(rows, count - 1)
+
+        def patched(bits: np.ndarray, values: np.ndarray) -> np.ndarray:
+            packed = np.packbits((values & in_range).reshape(-1, 8), axis=1).ravel()
+            if len(bits) == size and np.array_equal(bits[blocks], packed):
+                return bits
+            # New rows grow every bitset; otherwise only bitsets whose bits changed are copied
+            bits = np.concatenate([bits[:size], np.zeros(size - min(len(bits), size), dtype=np.uint8)])
+            bits[blocks] = packed
+            return bits
+
+        empty = np.empty(0, dtype=np.uint8)
+        bitsets = {}
+        for field, vocab in self.vocab.items():
+            if len(vocab) <= BITSET_MAX_CARDINALITY:
+                previous = self._bitsets.get(field, {})
+                column = self.codes[field][rows]
+                # A value first seen in this refresh only occurs in the changed rows
+                bitsets[field] = {
+                    code: patched(previous.get(code, empty), column == code) for code in (MISSING, *vocab.values())
+                }
+
+        self._bitsets = bitsets
+        self._active_bits = patched(self._active_bits, self.active[rows])
+        self._not_particular_bits = patched(self._not_particular_bits, self.not_particular[rows])
+        self._changed_rows = []
+
+    def _field_bits(self, field: str, codes: List[int]) -> np.ndarray:
+        bitsets = self._bitsets.get(field)
+        if bitsets is not None:
+            bits = np.zeros_like(self._active_bits)
+            for code in codes:
+                value_bits = bitsets.get(code)
+                if value_bits is not None:
+                    np.bitwise_or(bits, value_bits, out=bits)
+            return bits
+        return np.packbits(np.isin(self.codes[field], codes))
+
+    def match(
+        self,
+        filters: Dict[str, Union[str, Sequence[str]]],
+        searcher_caste: Optional[str] = None,
+        searcher_particular: bool = False,
+        apply_caste_rule: bool = True,
+        height_cm: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        before: Optional[str] = None,
+        exclude: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[ObjectId]:
+        """Active candidates matching every filter (any of a field's values), newest _id first"""
+        count = len(self.ids)
+        if limit is not None and limit <= 0:
+            return []
+        mask = self._active_bits.copy()
+
+        for field, values in filters.items():
+            if field not in INDEX_FIELDS:
+                raise KeyError(f"{field} is not indexed")
+            values = [values] if isinstance(values, str) else values
+            codes = [self.vocab[field][value] for value in values if value in self.vocab[field]]
+            if not codes:
+                return []
+            np.bitwise_and(mask, self._field_bits(field, codes), out=mask)
+
+        if height_cm is not None and height_cm != (None, None):
+            low, high = height_cm
+            in_range = self.height_cm != MISSING
+            if low is not None:
+                in_range &= self.height_cm >= low
+            if high is not None:
+                in_range &= self.height_cm <= high
+            np.bitwise_and(mask, np.packbits(in_range), out=mask)
+
+        if apply_caste_rule:
+            # Same rule as search_service.caste_rule
+            caste_code = self.vocab["caste"].get(searcher_caste, -1) if searcher_caste else None
+            if caste_code is None:
+                allowed = self._not_particular_bits
+            else:
+                allowed = self._field_bits("caste", [caste_code])
+                if not searcher_particular:
+                    np.bitwise_or(allowed, self._not_particular_bits, out=allowed)
+            np.bitwise_and(mask, allowed, out=mask)
+
+        stop = count if before is None else int(np.searchsorted(self.ids, _key(ObjectId(before))))
+        excluded = _key(ObjectId(exclude)) if exclude is not None else None
+
+        # Unpack newest rows first, a block at a time, so small pages stop early
+        found: List[np.ndarray] = []
+        remaining = count if limit is None else limit
+        while stop > 0 and remaining > 0:
+            start = max(0, stop - MATCH_BLOCK_ROWS) // 8 * 8
+            rows = np.flatnonzero(np.unpackbits(mask[start // 8:(stop + 7) // 8])[:stop - start])[::-1] + start
+            if excluded is not None:
+                rows = rows[self.ids[rows] != excluded]
+            found.append(rows[:remaining])
+            remaining -= len(found[-1])
+            stop = start
+
+        rows = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        return [_object_id(key) for key in self.ids[rows].tolist()]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the columns, flags and bitsets"""
+        total = self.ids.nbytes + self.height_cm.nbytes + self.active.nbytes + self.not_particular.nbytes
+        total += sum(column.nbytes for column in self.codes.values())
+        total += self._active_bits.nbytes + self._not_particular_bits.nbytes
+        total += sum(bits.nbytes for bitsets in self._bitsets.values() for bits in bitsets.values())
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "rows": len(self.ids),
+            "memory_bytes": self.memory_bytes(),
+            "watermark": self.watermark.isoformat() if self.watermark else None
+        }
+
+    async def load(self, batch_size: int = 5000) -> None:
+        """Build the index from every user"""
+        start = time.perf_counter()
+        fresh = CandidateIndex(self.db)
+
+        batch = []
+        async for document in self.users_collection.find({}, INDEX_PROJECTION).sort("_id", 1).batch_size(batch_size):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                await asyncio.to_thread(fresh.apply, batch)
+                batch = []
+        await asyncio.to_thread(fresh.apply, batch)
+        await asyncio.to_thread(fresh.build_bitsets)
+
+        self._adopt(fresh)
+        logger.info(
+            f"Candidate index loaded {len(self)} profiles in {time.perf_counter() - start:.1f}s "
+            f"({self.memory_bytes() / 1024 / 1024:.1f} MiB)"
+        )
+
+    async def refresh(self) -> int:
+        """Apply users updated since the last load or refresh; returns how many changed"""
+        if self.watermark is None:
+            await self.load()
+            return len(self)
+
+        documents = await self.users_collection.find(
+            {"updated_at": {"$gte": self.watermark - REFRESH_OVERLAP}},
+            INDEX_PROJECTION
+        ).to_list(None)
+        # The overlap window re-reads rows already applied; with nothing new, keep
+        # the current version rather than copying it
+        documents = [
+            document for document in documents
+            if self._recent.get(_key(document["_id"])) != document.get("updated_at")
+        ]
+        if not documents:
+            return 0
+
+        snapshot = self._copy()
+        await asyncio.to_thread(snapshot.apply, documents)
+        await asyncio.to_thread(snapshot.update_bitsets)
+        self._adopt(snapshot)
+        return len(documents)
+
+    async def _run(self, refresh_seconds: float, rebuild_seconds: float) -> None:
+        last_load = 0.0
+        while True:
+            try:
+                # Retry a failed initial load every interval (searches use Mongo until it succeeds);
+                # periodic full loads pick up hard-deleted users, which deltas cannot see
+                if not self.ready or (rebuild_seconds and time.monotonic() - last_load >= rebuild_seconds):
+                    await self.load()
+                    last_load = time.monotonic()
+                else:
+                    await self.refresh()
+            except Exception as e:
+                logger.error(f"Error {'refreshing' if self.ready else 'loading'} candidate index: {e}")
+            await asyncio.sleep(refresh_seconds)
+
+    def start(self, refresh_seconds: float, rebuild_seconds: float = 0) -> None:
+        """Load in the background, then refresh from updated_at deltas"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(refresh_seconds, rebuild_seconds))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import get_database
+import csv
+import io
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Rows are handed to the response in chunks of about this size
+FLUSH_BYTES = 65536
+
+EXPORT_PROJECTION = {
+    "name": 1,
+    "mobile_number": 1,
+    "family_id": 1,
+    "profile_type": 1,
+    "profile_data": 1,
+    "profile_completion": 1,
+    "is_active": 1,
+    "created_at": 1,
+    "updated_at": 1
+}
+
+# Flattened column -> path into the exported document
+CSV_COLUMNS = [
+    ("id", ("_id",)),
+    ("name", ("name",)),
+    ("mobile_number", ("mobile_number",)),
+    ("family_id", ("family_id",)),
+    ("profile_type", ("profile_type",)),
+    ("profile_completion", ("profile_completion",)),
+    ("is_active", ("is_active",)),
+    ("created_at", ("created_at",)),
+    ("updated_at", ("updated_at",)),
+    ("location", ("profile_data", "address", "location")),
+    ("pincode", ("profile_data", "address", "pincode")),
+    ("grew_up_in", ("profile_data", "address", "grew_up_in")),
+    ("residency_status", ("profile_data", "address", "residency_status")),
+    ("caste", ("profile_data", "caste", "caste")),
+    ("subcaste", ("profile_data", "caste", "subcaste")),
+    ("is_not_particular_about_caste", ("profile_data", "caste", "is_not_particular_about_caste")),
+    ("marital_status", ("profile_data", "marital", "marital_status")),
+    ("height", ("profile_data", "marital", "height")),
+    ("diet", ("profile_data", "marital", "diet")),
+]
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; convert aware inputs to match"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _csv_value(document: dict, path: tuple):
+    value = document
+    for key in path:
+        if not isinstance(value, dict):
+            return ""
+        value = value.get(key)
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    def __init__(self, database=None):
+        self.db = database if database is not None else get_database()
+        self.users_collection = self.db.users
+
+    @staticmethod
+    def build_query(after: Optional[str] = None, since: Optional[datetime] = None) -> tuple:
+        """Filter and sort for a full (_id order) or incremental (updated_at, _id order) export"""
+        since = _naive_utc(since)
+        after_id = ObjectId(after) if after else None
+
+        if since is None:
+            query = {"_id": {"$gt": after_id}} if after_id else {}
+            return query, [("_id", 1)]
+
+        if after_id is None:
+            query = {"updated_at": {"$gte": since}}
+        else:
+            # Resuming an incremental export: `since` is the checkpoint row's updated_at
+            query = {"$or": [
+                {"updated_at": {"$gt": since}},
+                {"updated_at": since, "_id": {"$gt": after_id}}
+            ]}
+        return query, [("updated_at", 1), ("_id", 1)]
+
+    async def iter_users(
+        self,
+        after: Optional[str] = None,
+        since: Optional[datetime] = None,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """Stream exported user documents one cursor batch at a time"""
+        query, sort = self.build_query(after, since)
+        cursor = self.users_collection.find(query, EXPORT_PROJECTION).sort(sort).batch_size(
+            batch_size or settings.EXPORT_BATCH_SIZE
+        )
+
+        exported = 0
+        async for document in cursor:
+            document["_id"] = str(document["_id"])
+            exported += 1
+            yield document
+
+        logger.info(f"Exported {exported} users")
+
+    async def export_ndjson(self, **kwargs) -> AsyncIterator[bytes]:
+        """Stream users as NDJSON lines"""
+        buffer = bytearray()
+
+        async for document in self.iter_users(**kwargs):
+            buffer += orjson.dumps(document)
+            buffer += b"\n"
+            if len(buffer) >= FLUSH_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+
+        yield bytes(buffer)
+
+    async def export_csv(self, **kwargs) -> AsyncIterator[str]:
+        """Stream users as CSV rows with profile_data flattened into columns"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column for column, _ in CSV_COLUMNS])
+
+        async for document in self.iter_users(**kwargs):
+            writer.writerow([_csv_value(document, path) for _, path in CSV_COLUMNS])
+            if buffer.tell() >= FLUSH_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
@@ -1,81 +1,194 @@
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_database
+from app.core.events import EventHub
 from app.core.security import generate_family_id
 from app.models.family import Family, FamilyCreate, FamilyJoinRequest, FamilyJoinStatus
 from app.models.user import User
+from app.schemas.family import join_request_response
 from datetime import datetime
+import asyncio
+import base64
+import binascii
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Distinguishes "not cached" from a cached negative (None) entry
+_MISSING = object()
+
+T = TypeVar("T")
+
+# Fields returned per member by expand=members
+MEMBER_SUMMARY_PROJECTION = {"name": 1, "profile_type": 1, "profile_completion": 1, "is_active": 1}
+
+# Join requests are listed oldest first; _id breaks ties between equal timestamps
+JOIN_REQUEST_SORT = [("requested_at", 1), ("_id", 1)]
+
+
+# Join request status -> event type pushed to /family/{family_id}/requests/stream
+JOIN_REQUEST_EVENT_TYPES = {
+    FamilyJoinStatus.PENDING: "join_request.created",
+    FamilyJoinStatus.APPROVED: "join_request.approved",
+    FamilyJoinStatus.REJECTED: "join_request.rejected"
+}
+
+
+def join_request_event(document: dict) -> dict:
+    """Stream event for a stored join request in its current status"""
+    return {
+        "type": JOIN_REQUEST_EVENT_TYPES[document["status"]],
+        "request": join_request_response(document)
+    }
+
+
+def encode_join_request_cursor(requested_at: datetime, request_id: str) -> str:
+    """Opaque next_cursor token for the join request after which a page ends"""
+    raw = f"{requested_at.isoformat()}|{request_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_join_request_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """(requested_at, _id) from a next_cursor token, or ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        requested_at, request_id = raw.split("|")
+        return datetime.fromisoformat(requested_at), ObjectId(request_id)
+    except (ValueError, InvalidId, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def join_requests_query(family_id: str, cursor: Optional[str] = None) -> dict:
+    """Filter for a page of pending join requests, sorted by JOIN_REQUEST_SORT"""
+    query = {
+        "family_id": family_id,
+        "status": FamilyJoinStatus.PENDING
+    }
+    
+    if cursor:
+        requested_at, request_id = decode_join_request_cursor(cursor)
+        query["$or"] = [
+            {"requested_at": {"$gt": requested_at}},
+            {"requested_at": requested_at, "_id": {"$gt": request_id}}
+        ]
+    
+    return query
+
 
 class FamilyService:
-    def __init__(self):
-        self.db = get_database()
+    def __init__(self, database=None, event_hub: Optional[EventHub] = None):
+        self.db = database if database is not None else get_database()
+        # With the change-stream source every worker publishes from the feed instead
+        self.event_hub = event_hub if settings.JOIN_REQUEST_EVENTS_SOURCE == "local" else None
         self.families_collection = self.db.families
         self.join_requests_collection = self.db.family_join_requests
         self.users_collection = self.db.users
+        # family_id -> Family (or None for a known miss)
+        self.family_cache = TTLCache(settings.FAMILY_CACHE_SIZE, settings.FAMILY_CACHE_TTL_SECONDS)
+        # user_id -> family_id (or None for a user without a family)
+        self.user_family_cache = TTLCache(settings.FAMILY_CACHE_SIZE, settings.FAMILY_CACHE_TTL_SECONDS)
+        # family_id -> (members, member summaries); invalidated with the family
+        self.member_cache = TTLCache(settings.FAMILY_CACHE_SIZE, settings.FAMILY_CACHE_TTL_SECONDS)
+
+    def invalidate_cache(self, family_id: Optional[str] = None, *user_ids: str) -> None:
+        """Drop cached entries touched by a membership write"""
+        if family_id:
+            self.family_cache.pop(family_id)
+            self.member_cache.pop(family_id)
+        for user_id in user_ids:
+            self.user_family_cache.pop(user_id)
+
+    def _written_family(self, family_data: dict, *user_ids: str) -> Family:
+        """Family from a document returned by a membership write, invalidating what it touched"""
+        family_data["_id"] = str(family_data["_id"])
+        family = Family(**family_data)
+        self.invalidate_cache(family.family_id, *user_ids)
+        return family
+
+    async def _in_transaction(self, operation: Callable[[Optional[object]], Awaitable[T]]) -> T:
+        """Run operation(session) in a multi-document transaction when enabled, else without a session"""
+        # Transactions need a replica set; with_transaction retries transient errors,
+        # so operations only write to Mongo and leave the caches to the caller
+        if not settings.MONGODB_USE_TRANSACTIONS:
+            return await operation(None)
+        
+        async with await self.db.client.start_session() as session:
+            return await session.with_transaction(operation)
+
+    def _publish_join_request(self, document: dict) -> None:
+        """Push a join request's new status to the family's stream subscribers"""
+        if self.event_hub is not None:
+            self.event_hub.publish(document["family_id"], join_request_event(document))
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for the family caches"""
+        return {
+            "families": self.family_cache.stats(),
+            "user_families": self.user_family_cache.stats(),
+            "family_members": self.member_cache.stats()
+        }
 
     async def create_family(self, created_by: str) -> Family:
         """Create new family"""
         try:
-            family_id = generate_family_id()
-            
             family = Family(
-                family_id=family_id,
+                family_id=generate_family_id(),
                 created_by=created_by,
                 members=[created_by]
             )
+            document = family.model_dump(by_alias=True, exclude={"id"})
             
-            result = await self.families_collection.insert_one(family.dict(by_alias=True))
-            family.id = str(result.inserted_id)
+            async def create(session) -> None:
+                await self.families_collection.insert_one(document, session=session)
+                await self._set_user_family(created_by, family.family_id, session)
             
-            # Update user with family_id
-            await self.users_collection.update_one(
-                {"_id": ObjectId(created_by)},
-                {"$set": {"family_id": family_id}}
-            )
+            await self._in_transaction(create)
             
-            return family
+            return self._written_family(document, created_by)
             
         except Exception as e:
             logger.error(f"Error creating family: {e}")
             raise
 
+    async def _set_user_family(self, user_id: str, family_id: Optional[str], session=None) -> None:
+        """Point a user at a family, or clear the mapping"""
+        update = {"$set": {"updated_at": datetime.utcnow()}}
+        if family_id:
+            update["$set"]["family_id"] = family_id
+        else:
+            update["$unset"] = {"family_id": ""}
+        await self.users_collection.update_one({"_id": ObjectId(user_id)}, update, session=session)
+
+    async def _add_member(self, family_id: str, user_id: str, session=None) -> dict:
+        """Add a member and return the updated family document in one round trip"""
+        family_data = await self.families_collection.find_one_and_update(
+            {"family_id": family_id},
+            {
+                "$addToSet": {"members": user_id},
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            return_document=ReturnDocument.AFTER,
+            session=session
+        )
+        
+        if not family_data:
+            raise ValueError("Family not found")
+        
+        await self._set_user_family(user_id, family_id, session)
+        return family_data
+
     async def join_family(self, family_id: str, user_id: str) -> Family:
         """Join existing family"""
         try:
-            # Check if family exists
-            family_data = await self.families_collection.find_one({
-                "family_id": family_id
-            })
-            
-            if not family_data:
-                raise ValueError("Family not found")
-            
-            # Add user to family members
-            await self.families_collection.update_one(
-                {"family_id": family_id},
-                {
-                    "$addToSet": {"members": user_id},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
+            family_data = await self._in_transaction(
+                lambda session: self._add_member(family_id, user_id, session)
             )
             
-            # Update user with family_id
-            await self.users_collection.update_one(
-                {"_id": ObjectId(user_id)},
-                {"$set": {"family_id": family_id}}
-            )
-            
-            # Get updated family
-            updated_family = await self.families_collection.find_one({
-                "family_id": family_id
-            })
-            
-            updated_family["id"] = str(updated_family["_id"])
-            return Family(**updated_family)
+            return self._written_family(family_data, user_id)
             
         except Exception as e:
             logger.error(f"Error joining family: {e}")
@@ -84,31 +197,61 @@ class FamilyService:
     async def get_family_by_id(self, family_id: str) -> Optional[Family]:
         """Get family by family_id"""
         try:
+            cached = self.family_cache.get(family_id, _MISSING)
+            if cached is not _MISSING:
+                return cached
+            
             family_data = await self.families_collection.find_one({
                 "family_id": family_id
             })
             
+            family = None
             if family_data:
-                family_data["id"] = str(family_data["_id"])
-                return Family(**family_data)
+                family_data["_id"] = str(family_data["_id"])
+                family = Family(**family_data)
             
-            return None
+            self.family_cache.set(family_id, family)
+            return family
             
         except Exception as e:
             logger.error(f"Error getting family: {e}")
             return None
 
+    async def get_member_summaries(self, family: Family) -> List[dict]:
+        """Summaries of a family's members in `members` order, from one $in query"""
+        members = tuple(family.members)
+        cached = self.member_cache.get(family.family_id)
+        if cached is not None and cached[0] == members:
+            return cached[1]
+        
+        member_ids = [ObjectId(member) for member in members if ObjectId.is_valid(member)]
+        users = {}
+        async for user_data in self.users_collection.find({"_id": {"$in": member_ids}}, MEMBER_SUMMARY_PROJECTION):
+            user_data["id"] = str(user_data.pop("_id"))
+            users[user_data["id"]] = user_data
+        
+        # Members whose user document is gone are left out
+        summaries = [users[member] for member in members if member in users]
+        self.member_cache.set(family.family_id, (members, summaries))
+        return summaries
+
     async def get_family_by_user_id(self, user_id: str) -> Optional[Family]:
         """Get family by user ID"""
         try:
-            user_data = await self.users_collection.find_one({
-                "_id": ObjectId(user_id)
-            })
+            family_id = self.user_family_cache.get(user_id, _MISSING)
+            
+            if family_id is _MISSING:
+                user_data = await self.users_collection.find_one(
+                    {"_id": ObjectId(user_id)},
+                    {"family_id": 1}
+                )
+                family_id = user_data.get("family_id") if user_data else None
+                self.user_family_cache.set(user_id, family_id)
             
-            if not user_data or not user_data.get("family_id"):
+            if not family_id:
                 return None
             
-            return await self.get_family_by_id(user_data["family_id"])
+            return await self.get_family_by_id(family_id)
             
         except Exception as e:
             logger.error(f"Error getting family by user ID: {e}")
@@ -117,20 +260,20 @@ class FamilyService:
     async def leave_family(self, family_id: str, user_id: str) -> bool:
         """Leave family"""
         try:
-            # Remove user from family members
-            await self.families_collection.update_one(
-                {"family_id": family_id},
-                {
-                    "$pull": {"members": user_id},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
-            )
+            async def leave(session) -> None:
+                await self.families_collection.update_one(
+                    {"family_id": family_id},
+                    {
+                        "$pull": {"members": user_id},
+                        "$set": {"updated_at": datetime.utcnow()}
+                    },
+                    session=session
+                )
+                await self._set_user_family(user_id, None, session)
             
-            # Remove family_id from user
-            await self.users_collection.update_one(
-                {"_id": ObjectId(user_id)},
-                {"$unset": {"family_id": ""}}
-            )
+            await self._in_transaction(leave)
+            
+            self.invalidate_cache(family_id, user_id)
             
             return True
             
@@ -147,64 +290,139 @@ class FamilyService:
                 requester_name=requester_name
             )
             
-            result = await self.join_requests_collection.insert_one(join_request.dict(by_alias=True))
+            document = join_request.model_dump(by_alias=True, exclude={"id"})
+            result = await self.join_requests_collection.insert_one(document)
             join_request.id = str(result.inserted_id)
             
+            document["_id"] = result.inserted_id
+            self._publish_join_request(document)
+            
             return join_request
             
         except Exception as e:
             logger.error(f"Error creating join request: {e}")
             raise
 
-    async def get_join_requests(self, family_id: str) -> List[FamilyJoinRequest]:
-        """Get family join requests"""
+    async def get_join_requests(
+        self,
+        family_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """One page of pending join requests, oldest first, and the cursor for the next page"""
+        limit = min(limit or settings.JOIN_REQUESTS_PAGE_SIZE, settings.JOIN_REQUESTS_MAX_PAGE_SIZE)
+        query = join_requests_query(family_id, cursor)
+        
         try:
-            cursor = self.join_requests_collection.find({
-                "family_id": family_id,
-                "status": FamilyJoinStatus.PENDING
-            })
+            documents = self.join_requests_collection.find(query).sort(JOIN_REQUEST_SORT).limit(limit + 1)
             
+            # Stream the one extra row that signals another page instead of counting
             requests = []
-            async for request in cursor:
-                request["id"] = str(request["_id"])
-                requests.append(FamilyJoinRequest(**request))
+            next_cursor = None
+            async for document in documents.batch_size(limit + 1):
+                if len(requests) == limit:
+                    next_cursor = encode_join_request_cursor(requests[-1]["requested_at"], requests[-1]["id"])
+                    break
+                requests.append(join_request_response(document))
             
-            return requests
+            return requests, next_cursor
             
         except Exception as e:
             logger.error(f"Error getting join requests: {e}")
-            return []
+            return [], None
 
     async def process_join_request(self, request_id: str, action: str) -> bool:
         """Process join request (approve/reject)"""
         try:
             status = FamilyJoinStatus.APPROVED if action == "approve" else FamilyJoinStatus.REJECTED
             
-            await self.join_requests_collection.update_one(
-                {"_id": ObjectId(request_id)},
-                {
-                    "$set": {
-                        "status": status,
-                        "processed_at": datetime.utcnow()
-                    }
-                }
-            )
-            
-            if action == "approve":
-                # Get the request details
-                request_data = await self.join_requests_collection.find_one({
-                    "_id": ObjectId(request_id)
-                })
+            async def process(session) -> Tuple[dict, Optional[dict]]:
+                # Only a pending request can be processed, so concurrent approvals apply once
+                request_data = await self.join_requests_collection.find_one_and_update(
+                    {"_id": ObjectId(request_id), "status": FamilyJoinStatus.PENDING},
+                    {
+                        "$set": {
+                            "status": status,
+                            "processed_at": datetime.utcnow()
+                        }
+                    },
+                    return_document=ReturnDocument.AFTER,
+                    session=session
+                )
                 
-                if request_data:
-                    # Add user to family
-                    await self.join_family(
-                        request_data["family_id"],
-                        request_data["requester_id"]
-                    )
+                if not request_data:
+                    raise ValueError("Join request not found or already processed")
+                
+                if status == FamilyJoinStatus.APPROVED:
+                    family_data = await self._add_member(request_data["family_id"], request_data["requester_id"], session)
+                    return request_data, family_data
+                return request_data, None
+            
+            request_data, family_data = await self._in_transaction(process)
+            
+            if family_data:
+                self._written_family(family_data, request_data["requester_id"])
+            # Published only once the write (and any transaction) has committed
+            self._publish_join_request(request_data)
             
             return True
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error processing join request: {e}")
             return False
+
+
+class JoinRequestChangeFeed:
+    """Publishes join request inserts and status changes from a MongoDB change stream
+
+    Used instead of in-process publishing when several workers serve streams, so a
+    subscriber sees requests created or processed by any worker. Needs a replica set.
+    """
+
+    # Inserts, and updates that changed the status (approve/reject)
+    PIPELINE = [{"$match": {"$or": [
+        {"operationType": "insert"},
+        {"operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}}
+    ]}}]
+
+    def __init__(self, database, event_hub: EventHub, retry_seconds: float = 1):
+        self.collection = database.family_join_requests
+        self.event_hub = event_hub
+        self.retry_seconds = retry_seconds
+        self.resume_token = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self.collection.watch(
+                    self.PIPELINE,
+                    full_document="updateLookup",
+                    resume_after=self.resume_token
+                ) as stream:
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        document = change.get("fullDocument")
+                        if document:
+                            self.event_hub.publish(document["family_id"], join_request_event(document))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Join request change stream failed, resuming: {e}")
+                await asyncio.sleep(self.retry_seconds)
+
+    def start(self) -> None:
+        """Watch the join requests collection in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,143 @@
+from typing import AsyncIterable, AsyncIterator, List, Tuple, Union
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.core.database import get_database
+from app.models.user import User
+from app.schemas.auth import RegisterRequest
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+async def iter_lines(
+    chunks: AsyncIterable[Union[bytes, str]],
+    max_line_bytes: int = 65536
+) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines, truncating any line longer than max_line_bytes"""
+    buffer = b""
+    overflow = False
+
+    async for chunk in chunks:
+        buffer += chunk.encode() if isinstance(chunk, str) else chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+
+        for line in lines:
+            if overflow:
+                # Tail of an oversized line; its head was already reported
+                overflow = False
+                continue
+            yield line
+
+        if len(buffer) > max_line_bytes:
+            # Report the head once and drop the rest so one line cannot grow without bound
+            if not overflow:
+                yield buffer[:max_line_bytes + 1]
+                overflow = True
+            buffer = b""
+
+    if buffer and not overflow:
+        yield buffer
+
+
+class ImportService:
+    def __init__(self, database=None):
+        self.db = database if database is not None else get_database()
+        self.users_collection = self.db.users
+
+    @staticmethod
+    def _parse_row(line: bytes, max_line_bytes: int) -> dict:
+        """Validate one NDJSON row into a user document, raising ValueError"""
+        if len(line) > max_line_bytes:
+            raise ValueError(f"line longer than {max_line_bytes} bytes")
+
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON: {e}")
+
+        if not isinstance(row, dict):
+            raise ValueError("row must be a JSON object")
+
+        try:
+            request = RegisterRequest(**row)
+        except ValidationError as e:
+            raise ValueError("; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ))
+
+        user = User(
+            name=request.name,
+            mobile_number=request.mobile_number,
+            profile_type=request.profile_type,
+            family_id=request.family_id
+        )
+        return user.model_dump(by_alias=True, exclude={"id"})
+
+    async def _insert_chunk(self, chunk: List[Tuple[int, dict]]) -> List[dict]:
+        """Insert one chunk unordered and describe every row that was not created"""
+        try:
+            await self.users_collection.insert_many([document for _, document in chunk], ordered=False)
+            return []
+        except BulkWriteError as e:
+            results = []
+            for error in e.details.get("writeErrors", []):
+                line_number, document = chunk[error["index"]]
+                duplicate = error.get("code") == DUPLICATE_KEY_ERROR
+                results.append({
+                    "line": line_number,
+                    "status": "duplicate" if duplicate else "error",
+                    "mobile_number": document["mobile_number"],
+                    "error": "mobile number already registered" if duplicate else error.get("errmsg")
+                })
+            return results
+
+    async def import_users(
+        self,
+        lines: AsyncIterable[bytes],
+        chunk_size: int = None,
+        max_line_bytes: int = 65536
+    ) -> AsyncIterator[dict]:
+        """Import NDJSON RegisterRequest rows, yielding one result per rejected row and a summary"""
+        # Only one chunk of documents is held at a time; the unique
+        # mobile_number index rejects rows that are already registered
+        chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        summary = {"rows": 0, "created": 0, "duplicate": 0, "invalid": 0, "error": 0}
+        chunk: List[Tuple[int, dict]] = []
+        line_number = 0
+
+        async def flush():
+            rejected = await self._insert_chunk(chunk)
+            summary["created"] += len(chunk) - len(rejected)
+            for result in rejected:
+                summary[result["status"]] += 1
+            chunk.clear()
+            return rejected
+
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+
+            summary["rows"] += 1
+            try:
+                chunk.append((line_number, self._parse_row(line, max_line_bytes)))
+            except ValueError as e:
+                summary["invalid"] += 1
+                yield {"line": line_number, "status": "invalid", "error": str(e)}
+                continue
+
+            if len(chunk) >= chunk_size:
+                for result in await flush():
+                    yield result
+
+        if chunk:
+            for result in await flush():
+                yield result
+
+        logger.info(f"User import finished: {summary}")
+        yield {"summary": summary}
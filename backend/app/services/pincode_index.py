@@ -0,0 +1,160 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+from app.core.config import settings
+import csv
+import logging
+import math
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_TABLE = Path(__file__).resolve().parent.parent / "data" / "pincodes.npy"
+
+# One row per pincode, sorted by pincode; 12 bytes a row (~230KB for every Indian pincode)
+TABLE_DTYPE = np.dtype([("pincode", "<u4"), ("lat", "<f4"), ("lon", "<f4")])
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Grid cells of this many degrees (~28km of latitude) bucket pincodes for radius lookups
+GRID_CELL_DEGREES = 0.25
+_LON_CELLS = math.ceil(360 / GRID_CELL_DEGREES)
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to arrays of points"""
+    lat, lon = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats.astype(np.float64)), np.radians(lons.astype(np.float64))
+    a = np.sin((lats - lat) / 2) ** 2 + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+def _cell(lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+    """Grid (row, column) of points"""
+    lat_cell = np.floor((np.asarray(lat) + 90) / GRID_CELL_DEGREES).astype(np.int64)
+    lon_cell = np.floor((np.asarray(lon) + 180) / GRID_CELL_DEGREES).astype(np.int64)
+    return lat_cell, lon_cell
+
+
+def build_pincode_table(rows: Iterable[dict]) -> np.ndarray:
+    """Table from pincode/latitude/longitude rows, averaging rows that share a pincode"""
+    sums = {}
+    for row in rows:
+        try:
+            pincode = int(str(row.get("pincode", "")).strip())
+            lat = float(row.get("latitude", row.get("lat")))
+            lon = float(row.get("longitude", row.get("lon")))
+        except (TypeError, ValueError):
+            continue
+        if not (100000 <= pincode <= 999999 and -90 <= lat <= 90 and -180 <= lon <= 180):
+            continue
+        total = sums.setdefault(pincode, [0.0, 0.0, 0])
+        total[0] += lat
+        total[1] += lon
+        total[2] += 1
+
+    table = np.empty(len(sums), dtype=TABLE_DTYPE)
+    for index, (pincode, (lat, lon, count)) in enumerate(sorted(sums.items())):
+        table[index] = (pincode, lat / count, lon / count)
+    return table
+
+
+def convert_pincode_csv(csv_path: str, output_path: str) -> int:
+    """Convert a pincode directory CSV (pincode, latitude, longitude columns) to the .npy table"""
+    with open(csv_path, newline="", encoding="utf-8-sig") as source:
+        rows = ({(key or "").strip().lower(): value for key, value in row.items()} for row in csv.DictReader(source))
+        table = build_pincode_table(rows)
+    np.save(output_path, table)
+    return len(table)
+
+
+class PincodeIndex:
+    """Pincode -> centroid lookups and "pincodes within N km" over a uniform grid"""
+
+    def __init__(self, table: np.ndarray):
+        self.table = table
+        self.pincodes = table["pincode"]
+        self.lats = table["lat"]
+        self.lons = table["lon"]
+
+        # Rows ordered by grid cell, so each band of latitude cells is one contiguous
+        # slice per longitude range
+        lat_cells, lon_cells = _cell(self.lats, self.lons)
+        keys = lat_cells * _LON_CELLS + lon_cells
+        self._order = np.argsort(keys, kind="stable").astype(np.int32)
+        self._keys = keys[self._order]
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "PincodeIndex":
+        """Memory-map a table written by convert_pincode_csv"""
+        table = np.load(path or BUNDLED_TABLE, mmap_mode="r")
+        logger.info(f"Loaded {len(table)} pincodes from {path or BUNDLED_TABLE}")
+        return cls(table)
+
+    def __len__(self) -> int:
+        return len(self.pincodes)
+
+    def lookup(self, pincode: Optional[str]) -> Optional[Tuple[float, float]]:
+        """(lat, lon) centroid of a pincode, or None if unknown"""
+        try:
+            value = int(str(pincode).strip())
+        except (TypeError, ValueError):
+            return None
+        position = int(np.searchsorted(self.pincodes, value))
+        if position < len(self.pincodes) and self.pincodes[position] == value:
+            return float(self.lats[position]), float(self.lons[position])
+        return None
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[str]:
+        """Pincodes whose centroid lies within radius_km of a point, nearest first"""
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        low_lat, low_lon = _cell(max(lat - lat_span, -90), max(lon - lon_span, -180))
+        high_lat, high_lon = _cell(min(lat + lat_span, 90), min(lon + lon_span, 180))
+
+        slices = []
+        for lat_cell in range(int(low_lat), int(high_lat) + 1):
+            start, stop = np.searchsorted(
+                self._keys,
+                [lat_cell * _LON_CELLS + low_lon, lat_cell * _LON_CELLS + high_lon + 1]
+            )
+            if stop > start:
+                slices.append(self._order[start:stop])
+        if not slices:
+            return []
+
+        rows = np.concatenate(slices)
+        distances = haversine_km(lat, lon, self.lats[rows], self.lons[rows])
+        nearby = distances <= radius_km
+        rows = rows[nearby][np.argsort(distances[nearby], kind="stable")]
+        return [f"{pincode:06d}" for pincode in self.pincodes[rows].tolist()]
+
+    def near_pincode(self, pincode: str, radius_km: float) -> Optional[List[str]]:
+        """Pincodes within radius_km of a pincode's centroid, or None if it is unknown"""
+        center = self.lookup(pincode)
+        if center is None:
+            return None
+        return self.within(*center, radius_km)
+
+    def geo_point(self, pincode: Optional[str]) -> Optional[dict]:
+        """GeoJSON point for a pincode's centroid, as stored on users for the 2dsphere index"""
+        center = self.lookup(pincode)
+        if center is None:
+            return None
+        lat, lon = center
+        # float32 centroids are good to about a metre, so drop the noise digits
+        return {"type": "Point", "coordinates": [round(lon, 5), round(lat, 5)]}
+
+
+@lru_cache(maxsize=1)
+def get_pincode_index() -> PincodeIndex:
+    """Process-wide pincode index, loaded on first use"""
+    if settings.PINCODE_TABLE_PATH is None and not (settings.DEBUG or settings.PINCODE_ALLOW_SAMPLE_TABLE):
+        # Most real pincodes are missing from the sample, so their users would get no
+        # geo_point and could not search "near me"; refuse to start rather than degrade
+        raise RuntimeError(
+            "Only the bundled sample pincode table (major city centres) is available; set PINCODE_TABLE_PATH to a table built with `manage.py build-pincode-table`, "
+            "or PINCODE_ALLOW_SAMPLE_TABLE=true to run on the sample"
+        )
+    return PincodeIndex.load(settings.PINCODE_TABLE_PATH)
@@ -1,44 +1,228 @@
-from typing import Optional
+from typing import Optional, Tuple
 from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import UpdateOne
 from app.core.database import get_database
+from app.core.height import parse_height_cm
 from app.models.user import User
-from app.schemas.profile import ProfileData, ProfileUpdateRequest
+from app.schemas.profile import ProfileData, ProfilePatch, ProfileUpdateRequest
+from app.services.pincode_index import PincodeIndex, get_pincode_index
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Attempts at a patch whose version check lost to a concurrent write before giving up
+PATCH_MAX_ATTEMPTS = 3
+
+
+class ProfileVersionMismatch(RuntimeError):
+    """The stored profile_version is not the one the write was based on"""
+
+    def __init__(self, current_version: Optional[int] = None):
+        super().__init__("Profile was modified by another request")
+        self.current_version = current_version
+
+
+def profile_etag(version: int) -> str:
+    """ETag for a profile_version"""
+    return f'"{version}"'
+
+
+def parse_profile_etag(value: Optional[str]) -> Optional[int]:
+    """profile_version from an If-Match header; None when absent or "*" """
+    if value is None or value.strip() == "*":
+        return None
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise ValueError("Invalid If-Match header")
+
+
+def _without_nones(value):
+    """Copy of a patch value with explicit nulls dropped, for sections written whole"""
+    if isinstance(value, dict):
+        return {key: _without_nones(item) for key, item in value.items() if item is not None}
+    return value
+
+
+def diff_profile_patch(stored, changes: dict, prefix: str = "profile_data") -> Tuple[dict, dict, dict]:
+    """(merged document, $set, $unset) applying sparse changes to a stored subdocument
+
+    Unchanged values produce no operation. A section missing from (or null in) the
+    stored document is set whole, since Mongo cannot create a dotted path through null.
+    """
+    if not isinstance(stored, dict):
+        merged = _without_nones(changes)
+        return merged, ({prefix: merged} if merged else {}), {}
+    
+    merged, set_ops, unset_ops = dict(stored), {}, {}
+    for key, value in changes.items():
+        path = f"{prefix}.{key}"
+        if value is None:
+            if key in stored:
+                del merged[key]
+                unset_ops[path] = ""
+        elif isinstance(value, dict) and isinstance(stored.get(key), dict):
+            merged[key], child_set, child_unset = diff_profile_patch(stored[key], value, path)
+            set_ops.update(child_set)
+            unset_ops.update(child_unset)
+        elif _without_nones(value) not in ({}, stored.get(key)):
+            merged[key] = _without_nones(value)
+            set_ops[path] = merged[key]
+    return merged, set_ops, unset_ops
+
+
+def calculate_profile_completion(profile_data: Optional[ProfileData]) -> int:
+    """Calculate profile completion percentage"""
+    if not profile_data:
+        return 0
+    
+    completed_fields = 0
+    total_fields = 9
+    
+    # Check address fields
+    if profile_data.address:
+        if profile_data.address.location:
+            completed_fields += 1
+        if profile_data.address.pincode:
+            completed_fields += 1
+        if profile_data.address.grew_up_in:
+            completed_fields += 1
+        if profile_data.address.residency_status:
+            completed_fields += 1
+    
+    # Check caste fields
+    if profile_data.caste:
+        if profile_data.caste.is_not_particular_about_caste or profile_data.caste.caste:
+            completed_fields += 1
+        if profile_data.caste.subcaste:
+            completed_fields += 1
+    
+    # Check marital fields
+    if profile_data.marital:
+        if profile_data.marital.marital_status:
+            completed_fields += 1
+        if profile_data.marital.height:
+            completed_fields += 1
+        if profile_data.marital.diet:
+            completed_fields += 1
+    
+    return int((completed_fields / total_fields) * 100)
+
 
 class ProfileService:
-    def __init__(self):
-        self.db = get_database()
+    def __init__(self, database=None, pincode_index: Optional[PincodeIndex] = None):
+        self.db = database if database is not None else get_database()
         self.users_collection = self.db.users
+        self.pincode_index = pincode_index if pincode_index is not None else get_pincode_index()
 
-    async def update_profile(self, user_id: str, profile_data: ProfileData) -> bool:
-        """Update user profile data"""
+    def _materialized_fields(self, profile_data: Optional[ProfileData]) -> dict:
+        """Fields derived from profile_data and stored alongside it"""
+        return {
+            "profile_completion": calculate_profile_completion(profile_data),
+            # Numeric copy of the free-form height for indexed range queries
+            "height_cm": parse_height_cm(profile_data.marital.height) if profile_data and profile_data.marital else None,
+            # Pincode centroid for the 2dsphere index
+            "geo_point": self.pincode_index.geo_point(profile_data.address.pincode)
+            if profile_data and profile_data.address else None
+        }
+
+    async def update_profile(self, user_id: str, profile_data: ProfileData) -> Optional[int]:
+        """Update user profile data and return the stored completion percentage"""
         try:
+            materialized = self._materialized_fields(profile_data)
+            
             await self.users_collection.update_one(
                 {"_id": ObjectId(user_id)},
                 {
                     "$set": {
-                        "profile_data": profile_data.dict(),
+                        "profile_data": profile_data.model_dump(),
+                        **materialized,
                         "updated_at": datetime.utcnow()
-                    }
+                    },
+                    "$inc": {"profile_version": 1}
                 }
             )
             
-            return True
+            return materialized["profile_completion"]
             
         except Exception as e:
             logger.error(f"Error updating profile: {e}")
-            return False
+            return None
+
+    async def patch_profile(
+        self,
+        user_id: str,
+        patch: ProfilePatch,
+        expected_version: Optional[int] = None
+    ) -> Tuple[dict, int, int]:
+        """Apply a sparse update as dotted-path $set/$unset; returns (profile_data, completion, version)
+
+        The derived fields are recomputed from the merged profile and written in the same
+        update, which only applies if profile_version is unchanged since the read. With
+        expected_version (If-Match) a different stored version raises ProfileVersionMismatch;
+        without it a lost race is retried against the newer document.
+        """
+        changes = patch.model_dump(exclude_unset=True)
+        
+        for _ in range(PATCH_MAX_ATTEMPTS):
+            user_data = await self.users_collection.find_one(
+                {"_id": ObjectId(user_id)},
+                {"profile_data": 1, "profile_completion": 1, "profile_version": 1}
+            )
+            if not user_data:
+                raise ValueError("User not found")
+            
+            version = user_data.get("profile_version", 0)
+            if expected_version is not None and version != expected_version:
+                raise ProfileVersionMismatch(version)
+            
+            stored = user_data.get("profile_data")
+            merged, set_ops, unset_ops = diff_profile_patch(stored, changes)
+            if not set_ops and not unset_ops:
+                completion = user_data.get("profile_completion")
+                if completion is None:
+                    completion = calculate_profile_completion(ProfileData(**stored) if stored else None)
+                return stored or {}, completion, version
+            
+            try:
+                profile_data = ProfileData(**merged)
+            except ValidationError as e:
+                fields = ", ".join(".".join(str(part) for part in error["loc"]) for error in e.errors())
+                raise ValueError(f"Incomplete profile after update: {fields}")
+            
+            materialized = self._materialized_fields(profile_data)
+            update = {
+                "$set": {**set_ops, **materialized, "updated_at": datetime.utcnow()},
+                "$inc": {"profile_version": 1}
+            }
+            if unset_ops:
+                update["$unset"] = unset_ops
+            
+            # Users written before profile_version existed have no field to compare
+            result = await self.users_collection.update_one(
+                {"_id": ObjectId(user_id), "profile_version": version or {"$exists": False}},
+                update
+            )
+            if result.modified_count:
+                return merged, materialized["profile_completion"], version + 1
+            
+            if expected_version is not None:
+                raise ProfileVersionMismatch()
+        
+        raise ProfileVersionMismatch()
 
     async def get_profile(self, user_id: str) -> Optional[ProfileData]:
         """Get user profile data"""
         try:
-            user_data = await self.users_collection.find_one({
-                "_id": ObjectId(user_id)
-            })
+            user_data = await self.users_collection.find_one(
+                {"_id": ObjectId(user_id)},
+                {"profile_data": 1}
+            )
             
             if user_data and user_data.get("profile_data"):
                 return ProfileData(**user_data["profile_data"])
@@ -49,50 +233,101 @@ class ProfileService:
             logger.error(f"Error getting profile: {e}")
             return None
 
+    async def get_profile_with_completion(self, user_id: str) -> Tuple[Optional[dict], int, int]:
+        """Get the stored profile_data document, completion percentage and profile_version in one read"""
+        try:
+            user_data = await self.users_collection.find_one(
+                {"_id": ObjectId(user_id)},
+                {"profile_data": 1, "profile_completion": 1, "profile_version": 1}
+            )
+            
+            if not user_data:
+                return None, 0, 0
+            
+            version = user_data.get("profile_version", 0)
+            if not user_data.get("profile_data"):
+                return None, 0, version
+            
+            completion = user_data.get("profile_completion")
+            if completion is None:
+                completion = calculate_profile_completion(ProfileData(**user_data["profile_data"]))
+            
+            return user_data["profile_data"], completion, version
+            
+        except Exception as e:
+            logger.error(f"Error getting profile: {e}")
+            return None, 0, 0
+
     async def get_profile_completion_percentage(self, user_id: str) -> int:
-        """Calculate profile completion percentage"""
+        """Get the stored profile completion percentage"""
         try:
-            profile_data = await self.get_profile(user_id)
+            user_data = await self.users_collection.find_one(
+                {"_id": ObjectId(user_id)},
+                {"profile_completion": 1}
+            )
             
-            if not profile_data:
+            if not user_data:
                 return 0
             
-            completed_fields = 0
-            total_fields = 9
-            
-            # Check address fields
-            if profile_data.address:
-                if profile_data.address.location:
-                    completed_fields += 1
-                if profile_data.address.pincode:
-                    completed_fields += 1
-                if profile_data.address.grew_up_in:
-                    completed_fields += 1
-                if profile_data.address.residency_status:
-                    completed_fields += 1
-            
-            # Check caste fields
-            if profile_data.caste:
-                if profile_data.caste.is_not_particular_about_caste or profile_data.caste.caste:
-                    completed_fields += 1
-                if profile_data.caste.subcaste:
-                    completed_fields += 1
-            
-            # Check marital fields
-            if profile_data.marital:
-                if profile_data.marital.marital_status:
-                    completed_fields += 1
-                if profile_data.marital.height:
-                    completed_fields += 1
-                if profile_data.marital.diet:
-                    completed_fields += 1
-            
-            return int((completed_fields / total_fields) * 100)
+            if "profile_completion" in user_data:
+                return user_data["profile_completion"]
+            
+            # Documents written before the score was stored
+            return calculate_profile_completion(await self.get_profile(user_id))
             
         except Exception as e:
-            logger.error(f"Error calculating profile completion: {e}")
+            logger.error(f"Error getting profile completion: {e}")
             return 0
 
+    async def backfill_profile_completion(self, batch_size: int = 500) -> int:
+        """Store profile_completion on users that predate it, in _id order batches"""
+        return await self._backfill_materialized_fields({"profile_completion": {"$exists": False}}, batch_size)
+
+    async def backfill_height_cm(self, batch_size: int = 500) -> int:
+        """Store height_cm on users that predate it, in _id order batches"""
+        return await self._backfill_materialized_fields({"height_cm": {"$exists": False}}, batch_size)
+
+    async def backfill_geo_point(self, batch_size: int = 500) -> int:
+        """Store geo_point on users without one, in _id order batches
+
+        Also retries users whose pincode was unknown to the table in use when they were
+        written (geo_point null), so re-running after installing a fuller table fills them in.
+        """
+        return await self._backfill_materialized_fields({"geo_point": None}, batch_size)
+
+    async def _backfill_materialized_fields(self, missing: dict, batch_size: int) -> int:
+        """Recompute the materialized fields of users matching `missing`"""
+        updated = 0
+        last_id = None
+        
+        while True:
+            query = dict(missing)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            
+            batch = await self.users_collection.find(
+                query,
+                {"profile_data": 1}
+            ).sort("_id", 1).limit(batch_size).to_list(batch_size)
+            
+            if not batch:
+                return updated
+            
+            operations = [
+                UpdateOne(
+                    {"_id": user_data["_id"]},
+                    {"$set": self._materialized_fields(
+                        ProfileData(**user_data["profile_data"]) if user_data.get("profile_data") else None
+                    )}
+                )
+                for user_data in batch
+            ]
+            result = await self.users_collection.bulk_write(operations, ordered=False)
+            
+            updated += result.modified_count
+            last_id = batch[-1]["_id"]
+            logger.info(f"Backfilled {', '.join(missing)} for {updated} users")
+
     async def delete_profile(self, user_id: str) -> bool:
         """Delete user profile data"""
         try:
@@ -100,7 +335,11 @@ class ProfileService:
                 {"_id": ObjectId(user_id)},
                 {
                     "$unset": {"profile_data": ""},
-                    "$set": {"updated_at": datetime.utcnow()}
+                    "$set": {
+                        **self._materialized_fields(None),
+                        "updated_at": datetime.utcnow()
+                    },
+                    "$inc": {"profile_version": 1}
                 }
             )
             
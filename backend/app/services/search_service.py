@@ -0,0 +1,219 @@
+from typing import List, NamedTuple, Optional, Tuple
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import get_database
+from app.schemas.search import SearchFilters
+from app.services.candidate_index import CandidateIndex
+from app.services.pincode_index import EARTH_RADIUS_KM, PincodeIndex, get_pincode_index
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Search filter -> profile_data path
+FILTER_FIELDS = {
+    "location": "profile_data.address.location",
+    "pincode": "profile_data.address.pincode",
+    "caste": "profile_data.caste.caste",
+    "subcaste": "profile_data.caste.subcaste",
+    "marital_status": "profile_data.marital.marital_status",
+    "height": "profile_data.marital.height",
+    "diet": "profile_data.marital.diet",
+}
+
+SEARCH_RESULT_PROJECTION = {"name": 1, "family_id": 1, "profile_data": 1, "profile_completion": 1}
+
+
+class Proximity(NamedTuple):
+    """A resolved radius filter: the pincodes in range and the circle they were taken from"""
+    pincodes: List[str]
+    center: Tuple[float, float]
+    radius_km: float
+
+
+class Searcher(NamedTuple):
+    """What the caste rule and "near me" searches need from the searcher's own profile"""
+    caste: Optional[str]
+    particular: bool
+    pincode: Optional[str]
+
+
+def caste_rule(searcher_caste: Optional[str], searcher_particular: bool) -> dict:
+    """Mongo filter for the caste preference of both the searcher and the candidates
+
+    A candidate who is particular about caste only matches searchers of their caste, and a
+    searcher who is particular only sees their own caste. Without a caste of their own,
+    a searcher only matches candidates open to any caste (a missing caste never matches
+    another missing caste).
+    """
+    if searcher_caste is None:
+        return {"profile_data.caste.is_not_particular_about_caste": True}
+    if searcher_particular:
+        # Same caste satisfies the candidate's side too
+        return {"profile_data.caste.caste": searcher_caste}
+    return {"$or": [
+        {"profile_data.caste.is_not_particular_about_caste": True},
+        {"profile_data.caste.caste": searcher_caste}
+    ]}
+
+
+class SearchService:
+    def __init__(
+        self,
+        database=None,
+        candidate_index: Optional[CandidateIndex] = None,
+        pincode_index: Optional[PincodeIndex] = None
+    ):
+        self.db = database if database is not None else get_database()
+        self.users_collection = self.db.users
+        self.candidate_index = candidate_index
+        self.pincode_index = pincode_index if pincode_index is not None else get_pincode_index()
+
+    async def _searcher(self, user_id: str) -> Searcher:
+        """The searcher's own caste preference and pincode"""
+        user_data = await self.users_collection.find_one(
+            {"_id": ObjectId(user_id)},
+            {"profile_data.caste": 1, "profile_data.address.pincode": 1}
+        )
+        profile_data = (user_data or {}).get("profile_data") or {}
+        caste = profile_data.get("caste") or {}
+        return Searcher(
+            caste.get("caste"),
+            caste.get("is_not_particular_about_caste") is not True,
+            (profile_data.get("address") or {}).get("pincode")
+        )
+
+    def resolve_proximity(self, filters: SearchFilters, searcher_pincode: Optional[str]) -> Optional[Proximity]:
+        """Pincodes within radius_km of near_pincode (default: the searcher's own pincode)"""
+        if filters.radius_km is None:
+            return None
+        
+        pincode = filters.near_pincode or searcher_pincode
+        if not pincode:
+            raise ValueError("Set near_pincode or add a pincode to your profile to search by distance")
+        
+        center = self.pincode_index.lookup(pincode)
+        if center is None:
+            raise ValueError(f"Unknown pincode {pincode}")
+        
+        pincodes = self.pincode_index.within(*center, filters.radius_km)
+        if filters.pincode is not None:
+            pincodes = [nearby for nearby in pincodes if nearby == filters.pincode]
+        
+        return Proximity(pincodes, center, filters.radius_km)
+
+    @staticmethod
+    def build_query(
+        filters: SearchFilters,
+        user_id: str,
+        searcher_caste: Optional[str],
+        proximity: Optional[Proximity] = None,
+        searcher_particular: bool = False
+    ) -> dict:
+        """Mongo filter for a search page; results are keyset-paginated on _id descending"""
+        query = {
+            "_id": {"$ne": ObjectId(user_id)},
+            "is_active": True,
+            "profile_data": {"$ne": None}
+        }
+        
+        for name, path in FILTER_FIELDS.items():
+            value = getattr(filters, name)
+            if value is not None:
+                query[path] = value
+        
+        height_range = {}
+        if filters.min_height_cm is not None:
+            height_range["$gte"] = filters.min_height_cm
+        if filters.max_height_cm is not None:
+            height_range["$lte"] = filters.max_height_cm
+        if height_range:
+            query["height_cm"] = height_range
+        
+        if proximity is not None:
+            if len(proximity.pincodes) <= settings.SEARCH_MAX_PINCODES_IN:
+                query["profile_data.address.pincode"] = {"$in": proximity.pincodes}
+            else:
+                # Long $in lists get slow; large radii use the geo_point 2dsphere index instead
+                lat, lon = proximity.center
+                query["geo_point"] = {
+                    "$geoWithin": {"$centerSphere": [[lon, lat], proximity.radius_km / EARTH_RADIUS_KM]}
+                }
+        
+        if filters.cursor:
+            query["_id"]["$lt"] = ObjectId(filters.cursor)
+        
+        rule = caste_rule(searcher_caste, searcher_particular)
+        if "profile_data.caste.caste" in query and "profile_data.caste.caste" in rule:
+            # A caste filter different from the searcher's own caste matches nothing
+            query["$and"] = [rule]
+        else:
+            query.update(rule)
+        
+        return query
+
+    async def search(self, filters: SearchFilters, user_id: str) -> Tuple[List[dict], Optional[str]]:
+        """Return one page of matching profiles and the cursor for the next page"""
+        searcher = await self._searcher(user_id)
+        proximity = self.resolve_proximity(filters, searcher.pincode)
+        
+        if self.candidate_index is not None and self.candidate_index.ready:
+            return await self._search_indexed(filters, user_id, searcher, proximity)
+        
+        query = self.build_query(filters, user_id, searcher.caste, proximity, searcher.particular)
+        
+        results = await self.users_collection.find(
+            query,
+            SEARCH_RESULT_PROJECTION
+        ).sort("_id", -1).limit(filters.limit + 1).to_list(filters.limit + 1)
+        
+        next_cursor = None
+        if len(results) > filters.limit:
+            results = results[:filters.limit]
+            next_cursor = str(results[-1]["_id"])
+        
+        for result in results:
+            result["id"] = str(result.pop("_id"))
+        
+        return results, next_cursor
+
+    async def _search_indexed(
+        self,
+        filters: SearchFilters,
+        user_id: str,
+        searcher: Searcher,
+        proximity: Optional[Proximity] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Pick the page's _ids from the candidate index, then fetch them by _id"""
+        index_filters = {name: getattr(filters, name) for name in FILTER_FIELDS if getattr(filters, name) is not None}
+        if proximity is not None:
+            index_filters["pincode"] = proximity.pincodes
+        
+        candidate_ids = self.candidate_index.match(
+            index_filters,
+            searcher_caste=searcher.caste,
+            searcher_particular=searcher.particular,
+            height_cm=(filters.min_height_cm, filters.max_height_cm),
+            before=filters.cursor,
+            exclude=user_id,
+            limit=filters.limit + 1
+        )
+        
+        next_cursor = None
+        if len(candidate_ids) > filters.limit:
+            candidate_ids = candidate_ids[:filters.limit]
+            next_cursor = str(candidate_ids[-1])
+        
+        # Re-apply the filter so rows changed since the last refresh are dropped
+        query = self.build_query(
+            filters.model_copy(update={"cursor": None}), user_id, searcher.caste, proximity, searcher.particular
+        )
+        query["_id"]["$in"] = candidate_ids
+        results = await self.users_collection.find(
+            query,
+            SEARCH_RESULT_PROJECTION
+        ).sort("_id", -1).to_list(len(candidate_ids))
+        
+        for result in results:
+            result["id"] = str(result.pop("_id"))
+        
+        return results, next_cursor
@@ -0,0 +1,254 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional
+from app.core.config import settings
+from app.core.metrics import SMS_QUEUE_DEPTH, SMS_SEND_LATENCY, SMS_SENT
+from app.core.phone import e164_mobile_number
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SMSMessage(NamedTuple):
+    to: str
+    body: str
+    attempts: int = 0
+
+
+class DeadLetter(NamedTuple):
+    message: SMSMessage
+    error: str
+    failed_at: float
+
+
+class SMSUnavailableError(RuntimeError):
+    """A message could not be queued for delivery"""
+
+
+class SMSProvider(ABC):
+    """Base class for SMS providers"""
+
+    name = "base"
+
+    @abstractmethod
+    async def send(self, to: str, body: str) -> None:
+        """Deliver one message, raising on failure"""
+
+
+class FakeSMSProvider(SMSProvider):
+    """Local provider that logs messages after a configurable delay"""
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 0, failure_rate: float = 0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.sent: Deque[SMSMessage] = deque(maxlen=1000)
+
+    async def send(self, to: str, body: str) -> None:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError("Simulated SMS provider failure")
+        self.sent.append(SMSMessage(to, body))
+        logger.info(f"SMS to {to}: {body}")
+
+
+class TwilioSMSProvider(SMSProvider):
+    """Twilio provider; the blocking client call runs on a worker thread"""
+
+    name = "twilio"
+
+    def __init__(self, account_sid: str, auth_token: str, from_number: str):
+        from twilio.rest import Client
+        self.client = Client(account_sid, auth_token)
+        self.from_number = from_number
+
+    async def send(self, to: str, body: str) -> None:
+        # Numbers are stored as 10 digits; Twilio only accepts E.164
+        await asyncio.to_thread(
+            self.client.messages.create,
+            to=e164_mobile_number(to),
+            from_=self.from_number,
+            body=body
+        )
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per second with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SMSDispatcher:
+    """In-process queue delivering SMS in the background with retries and dead-lettering"""
+
+    def __init__(
+        self,
+        provider: SMSProvider,
+        workers: int = 4,
+        queue_size: int = 10000,
+        concurrency: int = 10,
+        rate_per_second: float = 0,
+        max_retries: int = 3,
+        retry_base_seconds: float = 0.5,
+        dead_letter_size: int = 1000
+    ):
+        self.provider = provider
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.dead_letters: Deque[DeadLetter] = deque(maxlen=dead_letter_size)
+        self.sent_count = 0
+        self._concurrency = asyncio.Semaphore(concurrency)
+        self._rate_limiter = TokenBucket(rate_per_second) if rate_per_second > 0 else None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Start the worker pool"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"SMS dispatcher started with {self.workers} workers ({self.provider.name})")
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Drain queued messages for up to `timeout` seconds, then stop the workers"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"SMS dispatcher stopped with {self.qsize()} messages undelivered")
+
+        for task in [*self._tasks, *self._retries]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+
+    async def join(self) -> None:
+        """Wait until every queued message, including pending retries, is settled"""
+        while True:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*self._retries, return_exceptions=True)
+
+    def enqueue(self, to: str, body: str) -> bool:
+        """Queue a message without waiting; False when the queue is full or not running"""
+        return self._put(SMSMessage(to, body))
+
+    def _put(self, message: SMSMessage) -> bool:
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.error(f"SMS queue full, dropping message to {message.to}")
+            SMS_SENT.labels(self.provider.name, "dropped").inc()
+            return False
+        SMS_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._deliver(message)
+            except Exception as e:
+                logger.error(f"Unexpected SMS dispatcher error: {e}")
+            finally:
+                self._queue.task_done()
+                SMS_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def _deliver(self, message: SMSMessage) -> None:
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+
+        start = time.perf_counter()
+        try:
+            async with self._concurrency:
+                await self.provider.send(message.to, message.body)
+        except Exception as e:
+            SMS_SEND_LATENCY.labels(self.provider.name).observe(time.perf_counter() - start)
+            self._handle_failure(message._replace(attempts=message.attempts + 1), e)
+            return
+
+        SMS_SEND_LATENCY.labels(self.provider.name).observe(time.perf_counter() - start)
+        SMS_SENT.labels(self.provider.name, "sent").inc()
+        self.sent_count += 1
+
+    def _handle_failure(self, message: SMSMessage, error: Exception) -> None:
+        if message.attempts > self.max_retries:
+            logger.error(f"SMS to {message.to} dead-lettered after {message.attempts} attempts: {error}")
+            SMS_SENT.labels(self.provider.name, "dead_lettered").inc()
+            self.dead_letters.append(DeadLetter(message, str(error), time.time()))
+            return
+
+        # Back off outside the workers so one failing number does not stall the queue
+        delay = self.retry_base_seconds * 2 ** (message.attempts - 1) * random.uniform(0.5, 1.5)
+        logger.warning(f"SMS to {message.to} failed ({error}), retrying in {delay:.2f}s")
+        SMS_SENT.labels(self.provider.name, "retried").inc()
+        task = asyncio.create_task(self._retry_later(message, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _retry_later(self, message: SMSMessage, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if not self._put(message):
+            self.dead_letters.append(DeadLetter(message, "queue full on retry", time.time()))
+
+
+def create_sms_provider() -> SMSProvider:
+    """Build the provider selected by SMS_PROVIDER"""
+    if settings.SMS_PROVIDER == "twilio":
+        return TwilioSMSProvider(
+            settings.TWILIO_ACCOUNT_SID,
+            settings.TWILIO_AUTH_TOKEN,
+            settings.TWILIO_PHONE_NUMBER
+        )
+    return FakeSMSProvider(settings.SMS_FAKE_LATENCY_MS, settings.SMS_FAKE_FAILURE_RATE)
+
+
+def create_sms_dispatcher(provider: Optional[SMSProvider] = None) -> SMSDispatcher:
+    """Build a dispatcher configured from Settings"""
+    return SMSDispatcher(
+        provider or create_sms_provider(),
+        workers=settings.SMS_WORKERS,
+        queue_size=settings.SMS_QUEUE_SIZE,
+        concurrency=settings.SMS_PROVIDER_CONCURRENCY,
+        rate_per_second=settings.SMS_RATE_PER_SECOND,
+        max_retries=settings.SMS_MAX_RETRIES,
+        retry_base_seconds=settings.SMS_RETRY_BASE_SECONDS,
+        dead_letter_size=settings.SMS_DEAD_LETTER_SIZE
+    )
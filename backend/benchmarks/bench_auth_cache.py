@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: authenticated no-op request throughput with the claims cache on and off
+"""
+
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import Depends, FastAPI
+from app.core import security
+from app.core.config import settings
+
+
+def build_app() -> FastAPI:
+    """A bare app with one authenticated no-op route"""
+    app = FastAPI()
+
+    @app.get("/noop")
+    async def noop(user_id: str = Depends(security.get_current_user_id)):
+        return {"user_id": user_id}
+
+    return app
+
+
+async def measure(app: FastAPI, headers: dict, requests: int, concurrency: int) -> float:
+    """Requests per second through the in-process ASGI transport"""
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        per_worker = requests // concurrency
+
+        async def worker():
+            for _ in range(per_worker):
+                response = await client.get("/noop", headers=headers)
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - start)
+
+
+async def run(args):
+    app = build_app()
+
+    for backend in ("jose", "pyjwt"):
+        settings.JWT_BACKEND = backend
+        token = security.create_access_token({"user_id": "64b000000000000000000000"})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for enabled in (False, True):
+            settings.TOKEN_CACHE_ENABLED = enabled
+            security.token_cache.clear()
+            rps = await measure(app, headers, args.requests, args.concurrency)
+            print(f"backend={backend:<6} cache={'on ' if enabled else 'off'}: {rps:10.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: in-memory candidate index vs Mongo for low-selectivity filter
+combinations (build time, memory per million profiles, match latency, and the
+CPU cost of one delta refresh)
+
+The index is built from synthetic documents without a database. --compare-mongod
+times the same first page against the bench_search database on a local mongod.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import create_mongo_client
+from app.schemas.search import SearchFilters
+from app.services.candidate_index import CandidateIndex, _object_id
+from app.services.search_service import SearchService
+from benchmarks.support import percentile, synthetic_profile
+
+FILTER_SETS = [
+    {"diet": "veg"},
+    {"marital_status": "never_married", "diet": "veg"},
+    {"residency_status": "citizen", "marital_status": "never_married", "diet": "veg"},
+    {"location": "Bengaluru", "marital_status": "never_married"},
+    {"pincode": "560042"},
+]
+
+SEARCHER_CASTE = "Iyer"
+
+
+def build(profiles: int, batch_size: int = 10000) -> CandidateIndex:
+    rng = random.Random(42)
+    index = CandidateIndex(SimpleNamespace(users=None))
+    for offset in range(0, profiles, batch_size):
+        index.apply(
+            {"_id": ObjectId(), "is_active": True, "profile_data": synthetic_profile(rng)}
+            for _ in range(min(batch_size, profiles - offset))
+        )
+    index.build_bitsets()
+    index.ready = True
+    return index
+
+
+def time_refresh(index: CandidateIndex, changed: int) -> None:
+    """The work refresh() does off the event loop for a delta of changed profiles"""
+    rng = random.Random(7)
+    rows = rng.sample(range(len(index)), min(changed, len(index)))
+    documents = [
+        {"_id": _object_id(key), "is_active": True, "profile_data": synthetic_profile(rng)}
+        for key in index.ids[rows].tolist()
+    ]
+
+    start = time.perf_counter()
+    snapshot = index._copy()
+    copied = time.perf_counter()
+    snapshot.apply(documents)
+    applied = time.perf_counter()
+    snapshot.update_bitsets()
+    patched = time.perf_counter()
+    snapshot.build_bitsets()
+    rebuilt = time.perf_counter()
+    print(f"refresh of {len(documents):,} changed profiles: copy {(copied - start) * 1000:.1f}ms, "
+          f"apply {(applied - copied) * 1000:.1f}ms, patch bitsets {(patched - applied) * 1000:.1f}ms "
+          f"(full rebuild {(rebuilt - patched) * 1000:.1f}ms)")
+
+
+def time_match(index: CandidateIndex, filters: dict, repeat: int):
+    latencies, matched = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        matched = len(index.match(filters, SEARCHER_CASTE, limit=21))
+        latencies.append(time.perf_counter() - start)
+    # Full match count (no limit) shows the selectivity
+    total = len(index.match(filters, SEARCHER_CASTE))
+    return sorted(latencies), matched, total
+
+
+async def time_mongo(filters: dict, repeat: int):
+    database = create_mongo_client()[f"{settings.DATABASE_NAME}_search_bench"]
+    query = SearchService.build_query(SearchFilters(**filters), str(ObjectId()), SEARCHER_CASTE)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await database.users.find(query, {"_id": 1}).sort("_id", -1).limit(21).to_list(21)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--changed", type=int, default=500, help="profiles changed per timed refresh")
+    parser.add_argument("--compare-mongod", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build(args.profiles)
+    print(f"built {len(index):,} rows in {time.perf_counter() - start:.1f}s")
+    print(f"memory: {index.memory_bytes() / 1024 / 1024:.1f} MiB "
+          f"({index.memory_bytes() / 1024 / 1024 * 1_000_000 / max(len(index), 1):.1f} MiB per million)")
+    time_refresh(index, args.changed)
+
+    print(f"{'filters':<84} {'matches':>9} {'p50':>8} {'p99':>8} {'mongo p50':>10}  (ms)")
+    for filters in FILTER_SETS:
+        latencies, _, total = time_match(index, filters, args.repeat)
+        mongo = ""
+        if args.compare_mongod:
+            mongo = f"{percentile(asyncio.run(time_mongo(filters, args.repeat)), 0.5) * 1000:10.2f}"
+        print(
+            f"{str(filters):<84} {total:9,} {percentile(latencies, 0.5) * 1000:8.2f} "
+            f"{percentile(latencies, 0.99) * 1000:8.2f} {mongo}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of an unrelated no-op route while bcrypt-heavy traffic runs,
+with hashing inline on the event loop vs on the crypto executor
+"""
+
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from app.core import security
+from app.core.loop_monitor import LoopLagMonitor
+from benchmarks.support import percentile
+
+
+def build_app() -> FastAPI:
+    """A bare app with inline and offloaded hash routes and a no-op route"""
+    app = FastAPI()
+
+    @app.post("/hash/inline")
+    async def hash_inline():
+        return {"hash": security.get_password_hash("correct horse battery staple")}
+
+    @app.post("/hash/offload")
+    async def hash_offload():
+        return {"hash": await security.get_password_hash_async("correct horse battery staple")}
+
+    @app.get("/noop")
+    async def noop():
+        return {}
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, mode: str, args) -> dict:
+    """No-op latencies sampled while `args.hashers` clients hash continuously"""
+    monitor = LoopLagMonitor(interval=0.01, warn_threshold=float("inf"))
+    monitor.start()
+    stop = asyncio.Event()
+    hashes = 0
+
+    async def hasher():
+        nonlocal hashes
+        while not stop.is_set():
+            await client.post(f"/hash/{mode}")
+            hashes += 1
+            # The in-process transport never yields on its own; a socket would
+            await asyncio.sleep(0)
+
+    hashers = [asyncio.create_task(hasher()) for _ in range(args.hashers)]
+    latencies = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.seconds:
+        # Latency from when the request was due, so time queued behind a blocked loop counts
+        due = time.perf_counter() + 0.005
+        await asyncio.sleep(0.005)
+        await client.get("/noop")
+        latencies.append(time.perf_counter() - due)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(*hashers)
+    await monitor.stop()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_lag_ms": monitor.max_lag * 1000,
+        "hashes_per_second": hashes / elapsed
+    }
+
+
+def time_per_call_us(func, calls: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def offloaded_per_call_us(func, calls: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await security._run_in_crypto_executor(func)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def run(args):
+    app = build_app()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.post("/hash/offload")
+        for mode in ("inline", "offload"):
+            result = await measure(client, mode, args)
+            print(
+                f"{mode:>8}: {result['requests']:5d} no-ops  "
+                f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  max loop lag {result['max_lag_ms']:7.1f} ms  {result['hashes_per_second']:5.1f} hashes/s"
+            )
+
+    token = security.create_access_token({"user_id": "64b000000000000000000000"})
+    print(
+        f"JWT verify: {time_per_call_us(lambda: security.verify_token(token)):.1f} µs inline, "
+        f"{await offloaded_per_call_us(lambda: security.verify_token(token)):.1f} µs offloaded"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hashers", type=int, default=4, help="concurrent clients hashing passwords")
+    parser.add_argument("--seconds", type=float, default=10, help="sampling time per mode")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark suite
+
+Drives every route in api_router through an in-process ASGI client, running
+the register -> OTP -> profile -> search -> family lifecycle (plus admin
+import/export) for many virtual users at a configurable concurrency. Reports
+p50/p95/p99 latency, throughput and Mongo operations per request, and writes
+JSON results that can be compared between commits. A route without a scenario
+fails the run, so new endpoints have to be added here:
+
+    python -m benchmarks.bench_endpoints --users 500 --concurrency 50 --output before.json
+    python -m benchmarks.bench_endpoints --users 500 --concurrency 50 --compare before.json
+
+By default MongoDB is replaced by mongomock-motor; --backend mongod runs
+against MONGODB_URL (using a throwaway <DATABASE_NAME>_bench database).
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+import httpx
+from fastapi.routing import APIRoute
+from app.api.v1.api import api_router
+from app.core import database
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.main import app
+from benchmarks.support import CountingDatabase, current_ops, percentile
+
+PREFIX = settings.API_V1_STR
+
+# One virtual user in this many also runs an admin import and export
+ADMIN_EVERY = 50
+
+
+class Recorder:
+    """Collects latency and Mongo op counts per route template"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.ops = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, method: str, template: str, path: str = None, **kwargs):
+        """Issue one request and record it under METHOD template"""
+        ops = [0]
+        token = current_ops.set(ops)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, PREFIX + (path or template), **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_ops.reset(token)
+
+        self.record(f"{method} {PREFIX}{template}", elapsed, ops[0], response.status_code)
+        return response
+
+    async def open_stream(self, template: str, path: str, headers: dict) -> int:
+        """Open an event stream and record the time to its first frame; returns the status code
+
+        Goes straight to the ASGI app: httpx's ASGITransport only returns once the
+        body ends, which an event stream never does. The client disconnects after
+        the first frame.
+        """
+        ops = [0]
+        token = current_ops.set(ops)
+        first_frame = asyncio.Event()
+        status = []
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "server": ("bench", 80), "client": ("127.0.0.1", 0), "root_path": "",
+            "path": PREFIX + path, "raw_path": (PREFIX + path).encode(), "query_string": b"",
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        }
+
+        async def receive():
+            await first_frame.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+            elif message["type"] == "http.response.body":
+                first_frame.set()
+
+        start = time.perf_counter()
+        try:
+            await app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_ops.reset(token)
+
+        self.record(f"GET {PREFIX}{template}", elapsed, ops[0], status[0] if status else 500)
+        return status[0] if status else 500
+
+    def record(self, key: str, elapsed: float, ops: int, status_code: int) -> None:
+        self.latencies[key].append(elapsed * 1000)
+        self.ops[key] += ops
+        if status_code >= 400:
+            self.errors[key] += 1
+
+
+async def admin_import_export(client: httpx.AsyncClient, recorder: Recorder, index: int):
+    """Bulk import a few users, then export everyone"""
+    headers = {"X-Admin-Key": settings.ADMIN_API_KEY, "Content-Type": "application/x-ndjson"}
+    rows = b"".join(
+        json.dumps({"name": f"Imported {index}-{row}", "mobile_number": f"8{index:05d}{row:04d}"}).encode() + b"\n"
+        for row in range(10)
+    )
+    await recorder.call(client, "POST", "/admin/users/import", content=rows, headers=headers)
+    await recorder.call(client, "GET", "/admin/users/export", headers=headers)
+
+
+async def user_lifecycle(client: httpx.AsyncClient, recorder: Recorder, index: int, families: list):
+    """Register -> OTP -> profile -> search -> family for one virtual user"""
+    mobile_number = f"9{index:09d}"
+    call = recorder.call
+
+    await call(client, "POST", "/auth/send-otp", json={"mobile_number": mobile_number})
+    await call(client, "POST", "/auth/verify-otp", json={"mobile_number": mobile_number, "otp": "1234"})
+    response = await call(client, "POST", "/auth/register", json={
+        "name": f"Bench User {index}", "mobile_number": mobile_number, "profile_type": "myself"
+    })
+    await call(client, "POST", "/auth/login", json={"mobile_number": mobile_number})
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    me = await call(client, "GET", "/auth/me", headers=headers)
+    user_id = me.json()["_id"]
+
+    profile = {"user_id": user_id, "profile_data": {
+        "address": {
+            "location": "Bengaluru", "pincode": f"560{index % 100:03d}",
+            "grew_up_in": "Mysuru", "residency_status": "citizen"
+        },
+        "caste": {"caste": "Iyer", "subcaste": None, "is_not_particular_about_caste": index % 2 == 0},
+        "marital": {"marital_status": "never_married", "height": "5'6\"", "diet": "veg"}
+    }}
+    await call(client, "POST", "/profile/create", json=profile, headers=headers)
+    profile["profile_data"]["caste"]["subcaste"] = "Vadama"
+    await call(client, "PUT", "/profile/update", json=profile, headers=headers)
+    response = await call(client, "GET", "/profile/", headers=headers)
+    await call(client, "PATCH", "/profile/", json={"marital": {"diet": "non_veg"}},
+               headers={**headers, "If-Match": response.headers.get("ETag", "*")})
+    await call(client, "GET", "/profile/completion", headers=headers)
+
+    search = {"location": "Bengaluru", "marital_status": "never_married"}
+    if index % 2:
+        search.update(near_pincode="560001", radius_km=10)
+    await call(client, "GET", "/search/", params=search, headers=headers)
+
+    if index % ADMIN_EVERY == 0:
+        await admin_import_export(client, recorder, index)
+
+    joined = index % 2 == 1 and bool(families)
+    if not joined:
+        response = await call(client, "POST", "/family/create", json={"created_by": user_id}, headers=headers)
+        family_id = response.json()["family_id"]
+        families.append((family_id, headers))
+    else:
+        family_id, owner_headers = families[-1]
+        await recorder.open_stream(
+            "/family/{family_id}/requests/stream", f"/family/{family_id}/requests/stream", owner_headers
+        )
+        await call(client, "POST", "/family/join", json={"family_id": family_id, "user_id": user_id}, headers=headers)
+
+        # Seed a join request so the owner can process it through the API
+        join_request = await app.state.services.family_service.create_join_request(
+            family_id, user_id, f"Bench User {index}"
+        )
+        await call(
+            client, "GET", "/family/{family_id}/requests", f"/family/{family_id}/requests", headers=owner_headers
+        )
+        await call(
+            client, "POST", "/family/requests/{request_id}/process", f"/family/requests/{join_request.id}/process",
+            json={"action": "approve"}, headers=owner_headers
+        )
+
+    await call(client, "GET", "/family/my-family", headers=headers)
+    await call(client, "GET", "/family/{family_id}", f"/family/{family_id}", headers=headers)
+    await call(
+        client, "GET", "/family/{family_id}?expand=members", f"/family/{family_id}",
+        params={"expand": "members"}, headers=headers
+    )
+
+    # Creators stay, so later joiners' owner can still list and process requests
+    if joined:
+        await call(client, "POST", "/family/leave", headers=headers)
+    await call(client, "DELETE", "/profile/", headers=headers)
+
+
+def uncovered_routes(recorder: Recorder) -> list:
+    """api_router routes the run never called"""
+    return sorted(
+        f"{method} {PREFIX}{route.path}"
+        for route in api_router.routes if isinstance(route, APIRoute)
+        for method in route.methods
+        if f"{method} {PREFIX}{route.path}" not in recorder.latencies
+    )
+
+
+def summarize(recorder: Recorder, wall_seconds: float, args) -> dict:
+    """Build the JSON result document"""
+    routes = {}
+    total_requests = 0
+    total_ops = 0
+
+    for key, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        total_requests += len(latencies)
+        total_ops += recorder.ops[key]
+        routes[key] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[key],
+            "p50_ms": round(percentile(latencies, 0.50), 3),
+            "p95_ms": round(percentile(latencies, 0.95), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "mongo_ops_per_request": round(recorder.ops[key] / len(latencies), 2),
+        }
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.utcnow().isoformat(),
+            "backend": args.backend,
+            "users": args.users,
+            "concurrency": args.concurrency,
+        },
+        "total": {
+            "requests": total_requests,
+            "seconds": round(wall_seconds, 3),
+            "requests_per_second": round(total_requests / wall_seconds, 1),
+            "mongo_ops_per_request": round(total_ops / total_requests, 2),
+        },
+        "routes": routes,
+        "uncovered_routes": uncovered_routes(recorder),
+    }
+
+
+def print_report(results: dict, baseline: dict = None):
+    """Print the results table, with deltas against a baseline if given"""
+    print(f"{'route':<52} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'ops':>6}")
+    for key, route in results["routes"].items():
+        line = (
+            f"{key:<52} {route['requests']:>6} {route['p50_ms']:>8.2f} {route['p95_ms']:>8.2f} "
+            f"{route['p99_ms']:>8.2f} {route['mongo_ops_per_request']:>6.2f}"
+        )
+        previous = (baseline or {}).get("routes", {}).get(key)
+        if previous and previous["p95_ms"]:
+            line += f"   p95 {(route['p95_ms'] / previous['p95_ms'] - 1) * 100:+6.1f}%"
+            line += f"  ops {route['mongo_ops_per_request'] - previous['mongo_ops_per_request']:+.2f}"
+        if route["errors"]:
+            line += f"   ({route['errors']} errors)"
+        print(line)
+
+    total = results["total"]
+    summary = f"\n{total['requests']} requests in {total['seconds']} s: {total['requests_per_second']} req/s, " \
+              f"{total['mongo_ops_per_request']} Mongo ops/request"
+    if baseline:
+        summary += f" (baseline {baseline['total']['requests_per_second']} req/s " \
+                   f"@ {baseline['meta'].get('commit')})"
+    print(summary)
+
+
+async def run(args) -> dict:
+    # Every simulated user shares one client IP
+    settings.PINCODE_ALLOW_SAMPLE_TABLE = True
+    settings.RATE_LIMIT_ENABLED = False
+    settings.ADMIN_API_KEY = settings.ADMIN_API_KEY or "bench-admin-key"
+
+    if args.backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        database.create_mongo_client = lambda: AsyncMongoMockClient()
+    else:
+        settings.DATABASE_NAME = f"{settings.DATABASE_NAME}_bench"
+
+    recorder = Recorder()
+    families = []
+
+    async with app.router.lifespan_context(app):
+        if args.backend == "mongod":
+            await database.db.client.drop_database(settings.DATABASE_NAME)
+            await database.ensure_indexes(database.get_database())
+        await app.state.services.stop()
+        app.state.services = ServiceContainer(CountingDatabase(database.get_database()))
+        await app.state.services.start()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            queue = asyncio.Queue()
+            for index in range(args.users):
+                queue.put_nowait(index)
+
+            async def worker():
+                while not queue.empty():
+                    await user_lifecycle(client, recorder, queue.get_nowait(), families)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            wall_seconds = time.perf_counter() - start
+
+        if args.backend == "mongod":
+            await database.db.client.drop_database(settings.DATABASE_NAME)
+
+    return summarize(recorder, wall_seconds, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DrShaadi endpoint benchmark suite")
+    parser.add_argument("--backend", choices=["mongomock", "mongod"], default="mongomock")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if results["uncovered_routes"]:
+        parser.exit(1, f"Routes without a benchmark scenario: {', '.join(results['uncovered_routes'])}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: thousands of idle join request stream subscribers
+
+Hub mode parks one reader per subscription, the way each open SSE response
+does, and reports memory per idle subscriber and how long one publish takes to
+wake every reader of a family. --http serves the app with uvicorn on loopback
+(mongomock-motor) and holds real /family/{family_id}/requests/stream
+connections open, reporting process RSS per connection and the time for one
+join request to reach all of them. Client sockets live in the same process, so
+the RSS figure is an upper bound.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+import httpx
+import uvicorn
+from app.core import database
+from app.core.config import settings
+from app.core.events import EventHub
+from app.core.server import DrainingServer
+from benchmarks.support import percentile
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * 4096
+
+
+async def bench_hub(subscribers: int, families: int, repeat: int) -> None:
+    hub = EventHub()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    subscriptions = [hub.subscribe(f"FAM{number % families}") for number in range(subscribers)]
+    woken = {}
+
+    async def reader(subscription):
+        while True:
+            event = await subscription.get(3600)
+            if event is None:
+                return
+            woken[event["id"]] = woken.get(event["id"], 0) + 1
+
+    readers = [asyncio.create_task(reader(subscription)) for subscription in subscriptions]
+    await asyncio.sleep(0)
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / subscribers
+    tracemalloc.stop()
+    print(f"{subscribers:,} idle subscribers over {families:,} families: "
+          f"{per_subscriber:.0f} bytes each (subscription + parked reader)")
+
+    per_family = subscribers // families
+    publish, fanout = [], []
+    for event_id in range(repeat):
+        start = time.perf_counter()
+        hub.publish(f"FAM{event_id % families}", {"type": "join_request.created", "id": event_id})
+        publish.append(time.perf_counter() - start)
+        while woken.get(event_id, 0) < per_family:
+            await asyncio.sleep(0)
+        fanout.append(time.perf_counter() - start)
+
+    publish.sort()
+    fanout.sort()
+    print(f"publish to {per_family:,} subscribers: p50 {percentile(publish, 0.5) * 1e6:.0f}us, "
+          f"all readers woken p50 {percentile(fanout, 0.5) * 1000:.2f}ms p99 {percentile(fanout, 0.99) * 1000:.2f}ms")
+
+    hub.close()
+    await asyncio.gather(*readers)
+
+
+async def open_stream(port: int, path: str, token: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: bench\r\nAuthorization: Bearer {token}\r\n"
+        f"Accept: text/event-stream\r\n\r\n".encode()
+    )
+    # Headers, then the initial keepalive frame
+    await reader.readuntil(b"\r\n\r\n")
+    await reader.readuntil(b"\n\n")
+    return reader, writer
+
+
+async def bench_http(connections: int, batch: int) -> None:
+    from mongomock_motor import AsyncMongoMockClient
+    from app.main import app
+
+    database.create_mongo_client = lambda: AsyncMongoMockClient()
+    settings.PINCODE_ALLOW_SAMPLE_TABLE = True
+    settings.RATE_LIMIT_ENABLED = False
+    settings.LOOP_LAG_MONITOR_ENABLED = False
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", backlog=4096)
+    server = DrainingServer(config)
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}{settings.API_V1_STR}") as client:
+        response = await client.post("/auth/register", json={"name": "Admin", "mobile_number": "9000000000"})
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        family_id = (await client.post("/family/create", json={"created_by": "ignored"}, headers=headers)).json()["family_id"]
+
+    path = f"{settings.API_V1_STR}/family/{family_id}/requests/stream"
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    streams = []
+    for offset in range(0, connections, batch):
+        streams.extend(await asyncio.gather(
+            *(open_stream(port, path, token) for _ in range(min(batch, connections - offset)))
+        ))
+    print(f"opened {len(streams):,} streams in {time.perf_counter() - start:.1f}s, "
+          f"RSS +{(rss_bytes() - rss_before) / len(streams) / 1024:.1f} KiB per connection")
+
+    family_service = app.state.services.family_service
+    start = time.perf_counter()
+    await family_service.create_join_request(family_id, "000000000000000000000000", "Requester")
+    await asyncio.gather(*(reader.readuntil(b"\n\n") for reader, _ in streams))
+    print(f"join request delivered to all {len(streams):,} streams in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for _, writer in streams:
+        writer.close()
+    server.should_exit = True
+    await serving
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=20_000)
+    parser.add_argument("--families", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--http", action="store_true", help="real SSE connections instead of the hub alone")
+    parser.add_argument("--connections", type=int, default=2_000)
+    parser.add_argument("--batch", type=int, default=200, help="streams opened concurrently")
+    args = parser.parse_args()
+
+    # One mode per run, so RSS is not skewed by memory the other mode freed
+    if args.http:
+        asyncio.run(bench_http(args.connections, args.batch))
+    else:
+        asyncio.run(bench_hub(args.subscribers, args.families, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk import throughput and peak memory for a generated NDJSON stream
+
+Needs a local mongod by default. Peak memory is the traced client-side
+allocations during the import and should stay flat as --rows grows;
+mongomock-motor stores the documents in process (and checks the unique index
+linearly), so with --backend mongomock only the row results are meaningful.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+import orjson
+from app.core.config import settings
+from app.core.database import create_mongo_client
+from app.core.indexes import ensure_indexes
+from app.services.import_service import ImportService, iter_lines
+
+
+async def generate_ndjson(rows: int, duplicate_every: int, chunk_bytes: int = 65536):
+    """Yield an NDJSON body in network-sized chunks without materializing it"""
+    buffer = bytearray()
+    for index in range(rows):
+        number = index - 1 if duplicate_every and index % duplicate_every == 0 and index else index
+        buffer += orjson.dumps({"name": f"Imported User {index}", "mobile_number": f"+91 9{number:09d}"})
+        buffer += b"\n"
+        if len(buffer) >= chunk_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def run(args):
+    if args.backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        client = create_mongo_client()
+    database = client[f"{settings.DATABASE_NAME}_bench"]
+    await client.drop_database(database.name)
+    await ensure_indexes(database)
+
+    service = ImportService(database)
+    tracemalloc.start()
+    start = time.perf_counter()
+    async for result in service.import_users(
+        iter_lines(generate_ndjson(args.rows, args.duplicate_every)),
+        args.chunk_size
+    ):
+        summary = result.get("summary")
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{summary['rows']} rows in {elapsed:.2f}s: {summary['rows'] / elapsed:,.0f} rows/s")
+    print(f"created {summary['created']}, duplicate {summary['duplicate']}, invalid {summary['invalid']}")
+    print(f"peak traced memory: {peak / 1024 / 1024:.1f} MiB (chunk size {args.chunk_size})")
+
+    await client.drop_database(database.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=["mongomock", "mongod"], default="mongod")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    parser.add_argument("--duplicate-every", type=int, default=100, help="repeat a number every N rows")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request overhead of MetricsMiddleware and the Mongo command listener
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+import httpx
+from fastapi import FastAPI
+from app.core.metrics import MetricsMiddleware, MongoCommandListener
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    """A bare app with one no-op route"""
+    app = FastAPI()
+
+    @app.get("/noop/{item_id}")
+    async def noop(item_id: str):
+        return {"item_id": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def per_request_us(app: FastAPI, requests: int) -> float:
+    """Mean wall time per request through the in-process ASGI transport"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(200):
+            await client.get("/noop/warmup")
+
+        start = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/noop/{i}")
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def listener_us(events: int) -> float:
+    """Mean cost of one started/succeeded listener pair"""
+    listener = MongoCommandListener()
+    started = SimpleNamespace(command_name="find", command={"find": "users"}, request_id=0)
+    succeeded = SimpleNamespace(command_name="find", request_id=0, duration_micros=350)
+
+    start = time.perf_counter()
+    for i in range(events):
+        started.request_id = succeeded.request_id = i
+        listener.started(started)
+        listener.succeeded(succeeded)
+    return (time.perf_counter() - start) / events * 1e6
+
+
+async def run(args):
+    baseline = await per_request_us(build_app(False), args.requests)
+    instrumented = await per_request_us(build_app(True), args.requests)
+
+    print(f"request without metrics: {baseline:8.2f} µs")
+    print(f"request with metrics:    {instrumented:8.2f} µs  (+{instrumented - baseline:.2f} µs)")
+    print(f"command listener:        {listener_us(args.requests * 10):8.2f} µs per Mongo command")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark: "near me" radius searches, pincode grid lookups and first-page
+search latency with the pincode $in list vs the geo_point 2dsphere index
+
+Uses a synthetic table of ~19k pincodes spread over India (the real count),
+and profiles whose pincodes are drawn from it. Requires a local mongod for
+millions of profiles; --backend mongomock is a smoke run of the $in path only
+(mongomock has no geo operators).
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import numpy as np
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import create_mongo_client
+from app.core.indexes import ensure_indexes
+from app.schemas.search import SearchFilters
+from app.services.pincode_index import PincodeIndex, TABLE_DTYPE
+from app.services.search_service import SearchService
+from benchmarks.support import percentile, synthetic_profile
+
+RADII_KM = [5, 25, 100, 300]
+
+# Population centres the synthetic pincodes cluster around (lat, lon)
+CENTRES = [(28.63, 77.22), (18.94, 72.84), (12.97, 77.59), (13.09, 80.28), (22.57, 88.36), (17.39, 78.49)]
+
+
+def synthetic_table(count: int, seed: int = 7) -> np.ndarray:
+    """Pincodes with half the centroids clustered around cities and half spread out"""
+    rng = np.random.default_rng(seed)
+    table = np.zeros(count, dtype=TABLE_DTYPE)
+    table["pincode"] = np.sort(rng.choice(np.arange(110000, 860000), size=count, replace=False))
+    clustered = count // 2
+    centres = np.array(CENTRES)[rng.integers(len(CENTRES), size=clustered)]
+    lats = np.concatenate([centres[:, 0] + rng.normal(0, 0.4, clustered), rng.uniform(8, 32, count - clustered)])
+    lons = np.concatenate([centres[:, 1] + rng.normal(0, 0.4, clustered), rng.uniform(69, 92, count - clustered)])
+    order = rng.permutation(count)
+    table["lat"], table["lon"] = lats[order], lons[order]
+    return table
+
+
+def time_grid(index: PincodeIndex, repeat: int):
+    print(f"{'radius km':>10} {'pincodes':>9} {'p50 us':>8} {'p99 us':>8}")
+    for radius_km in RADII_KM:
+        latencies, found = [], 0
+        for lat, lon in CENTRES * repeat:
+            start = time.perf_counter()
+            found = len(index.within(lat, lon, radius_km))
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(
+            f"{radius_km:10} {found:9,} {percentile(latencies, 0.5) * 1e6:8.1f} "
+            f"{percentile(latencies, 0.99) * 1e6:8.1f}"
+        )
+
+
+async def seed(collection, index: PincodeIndex, count: int, batch_size: int = 10000) -> None:
+    rng = random.Random(42)
+    pincodes = [f"{pincode:06d}" for pincode in index.pincodes.tolist()]
+    for start in range(0, count, batch_size):
+        documents = []
+        for number in range(start, min(start + batch_size, count)):
+            profile_data = synthetic_profile(rng)
+            profile_data["address"]["pincode"] = rng.choice(pincodes)
+            documents.append({
+                "name": f"Synthetic User {number}",
+                "mobile_number": f"7{number:09d}",
+                "is_active": True,
+                "profile_data": profile_data,
+                "geo_point": index.geo_point(profile_data["address"]["pincode"])
+            })
+        await collection.insert_many(documents, ordered=False)
+
+
+async def time_search(service: SearchService, user_id: str, near_pincode: str, repeat: int, geo: bool):
+    """First-page latency per radius via the $in list (or the 2dsphere index when geo)"""
+    rows = []
+    for radius_km in RADII_KM:
+        settings.SEARCH_MAX_PINCODES_IN = 0 if geo else 1_000_000
+        filters = SearchFilters(near_pincode=near_pincode, radius_km=radius_km, marital_status="never_married")
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await service.search(filters, user_id)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        rows.append((percentile(latencies, 0.5), percentile(latencies, 0.99)))
+    return rows
+
+
+async def run(args):
+    index = PincodeIndex(synthetic_table(args.pincodes))
+    time_grid(index, args.repeat)
+    if args.profiles == 0:
+        return
+
+    if args.backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        client = create_mongo_client()
+    database = client[f"{settings.DATABASE_NAME}_proximity_bench"]
+
+    if args.reseed or await database.users.estimated_document_count() != args.profiles:
+        await client.drop_database(database.name)
+        start = time.perf_counter()
+        await seed(database.users, index, args.profiles)
+        print(f"seeded {args.profiles:,} profiles in {time.perf_counter() - start:.1f}s")
+    await ensure_indexes(database)
+
+    service = SearchService(database, pincode_index=index)
+    user_id = str(ObjectId())
+    near_pincode = index.within(*CENTRES[2], 5)[0]
+
+    in_rows = await time_search(service, user_id, near_pincode, args.repeat, geo=False)
+    geo_rows = None
+    if args.backend != "mongomock":
+        geo_rows = await time_search(service, user_id, near_pincode, args.repeat, geo=True)
+
+    print(f"{'radius km':>10} {'$in p50':>9} {'$in p99':>9} {'geo p50':>9} {'geo p99':>9}  (ms)")
+    for position, radius_km in enumerate(RADII_KM):
+        in_p50, in_p99 = in_rows[position]
+        geo = f"{geo_rows[position][0] * 1000:9.2f} {geo_rows[position][1] * 1000:9.2f}" if geo_rows else ""
+        print(f"{radius_km:10} {in_p50 * 1000:9.2f} {in_p99 * 1000:9.2f} {geo}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=["mongomock", "mongod"], default="mongod")
+    parser.add_argument("--pincodes", type=int, default=19_000)
+    parser.add_argument("--profiles", type=int, default=3_000_000, help="0 to time only the pincode grid")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--reseed", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /search filter combinations over synthetic profiles, first page and
+deep pages via keyset cursors vs the equivalent skip/limit
+
+Requires a local mongod (millions of profiles); --backend mongomock is a smoke run.
+"""
+
+import argparse
+import asyncio
+import time
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import create_mongo_client
+from app.core.indexes import ensure_indexes
+from app.schemas.search import SearchFilters
+from app.services.search_service import SearchService
+from benchmarks.support import percentile, seed_profiles
+
+FILTER_SETS = [
+    {"pincode": "560042"},
+    {"location": "Bengaluru", "marital_status": "never_married"},
+    {"caste": "Iyer", "marital_status": "never_married"},
+    {"marital_status": "never_married", "diet": "veg"},
+    {"location": "Pune", "marital_status": "never_married", "diet": "jain"},
+    {"min_height_cm": 160, "max_height_cm": 175},
+]
+
+
+async def time_pages(service: SearchService, user_id: str, filters: dict, pages: int, repeat: int):
+    """Latency of page 1 and of page `pages` reached by following cursors"""
+    first, deep = [], []
+    for _ in range(repeat):
+        cursor = None
+        for page in range(pages):
+            start = time.perf_counter()
+            _, cursor = await service.search(SearchFilters(**filters, limit=20, cursor=cursor), user_id)
+            elapsed = time.perf_counter() - start
+            if page == 0:
+                first.append(elapsed)
+            if cursor is None:
+                break
+        deep.append(elapsed)
+    return sorted(first), sorted(deep)
+
+
+async def time_skip(service: SearchService, user_id: str, filters: dict, pages: int, repeat: int):
+    """Latency of the same deep page fetched with skip/limit"""
+    searcher = await service._searcher(user_id)
+    proximity = service.resolve_proximity(SearchFilters(**filters), searcher.pincode)
+    query = service.build_query(SearchFilters(**filters), user_id, searcher.caste, proximity, searcher.particular)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await service.users_collection.find(query).sort("_id", -1).skip((pages - 1) * 20).limit(20).to_list(20)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+async def run(args):
+    settings.PINCODE_ALLOW_SAMPLE_TABLE = True
+    if args.backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        client = create_mongo_client()
+    database = client[f"{settings.DATABASE_NAME}_search_bench"]
+
+    if args.reseed or await database.users.estimated_document_count() != args.profiles:
+        await client.drop_database(database.name)
+        start = time.perf_counter()
+        await seed_profiles(database.users, args.profiles)
+        print(f"seeded {args.profiles:,} profiles in {time.perf_counter() - start:.1f}s")
+    await ensure_indexes(database)
+
+    service = SearchService(database)
+    searcher = await database.users.find_one({}, {"_id": 1})
+    user_id = str(searcher["_id"] if searcher else ObjectId())
+
+    print(f"{'filters':<72} {'p1 p50':>8} {'p1 p99':>8} {'deep cursor':>12} {'deep skip':>10}  (ms)")
+    for filters in FILTER_SETS:
+        first, deep = await time_pages(service, user_id, filters, args.pages, args.repeat)
+        skipped = await time_skip(service, user_id, filters, args.pages, args.repeat)
+        print(
+            f"{str(filters):<72} {percentile(first, 0.5) * 1000:8.2f} {percentile(first, 0.99) * 1000:8.2f} "
+            f"{percentile(deep, 0.5) * 1000:12.2f} {percentile(skipped, 0.5) * 1000:10.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=["mongomock", "mongod"], default="mongod")
+    parser.add_argument("--profiles", type=int, default=3_000_000)
+    parser.add_argument("--pages", type=int, default=50, help="depth of the deep page")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--reseed", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
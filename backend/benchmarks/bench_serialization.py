@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response serialization cost for /family/my-family and /profile/
+
+Compares the previous path (response model built field by field, re-validated
+through response_model, rendered with json) against direct ORJSONResponse
+rendering, over 1k, 10k and 100k iteration loops.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.models.family import Family
+from app.schemas.family import FamilyResponse, family_response
+from app.schemas.profile import ProfileData, ProfileResponse, profile_data_response
+
+LOOPS = (1_000, 10_000, 100_000)
+
+FAMILY = Family(
+    _id="64b000000000000000000001",
+    family_id="ABC1234",
+    created_by="64b000000000000000000002",
+    members=[f"64b00000000000000000{i:04d}" for i in range(6)],
+    created_at=datetime(2024, 1, 2, 3, 4, 5, 123000),
+    updated_at=datetime(2024, 1, 2, 3, 4, 5, 456000)
+)
+
+PROFILE_DOCUMENT = {
+    "address": {
+        "location": "Bengaluru",
+        "pincode": "560001",
+        "grew_up_in": "Mysuru",
+        "residency_status": "citizen"
+    },
+    "caste": {"caste": "Iyer", "subcaste": "Vadama", "is_not_particular_about_caste": False},
+    "marital": {"marital_status": "never_married", "height": "5'6\"", "diet": "veg"}
+}
+
+FAMILY_FIELD = create_response_field(name="Response_my_family", type_=FamilyResponse)
+PROFILE_FIELD = create_response_field(name="Response_profile", type_=ProfileResponse)
+
+
+async def family_before() -> bytes:
+    content = FamilyResponse(
+        id=FAMILY.id,
+        family_id=FAMILY.family_id,
+        created_by=FAMILY.created_by,
+        members=FAMILY.members,
+        created_at=FAMILY.created_at.isoformat(),
+        updated_at=FAMILY.updated_at.isoformat(),
+        is_active=FAMILY.is_active
+    )
+    # member_details is only sent with ?expand=members
+    return JSONResponse(
+        await serialize_response(field=FAMILY_FIELD, response_content=content, exclude_unset=True)
+    ).body
+
+
+async def family_after() -> bytes:
+    return ORJSONResponse(family_response(FAMILY)).body
+
+
+async def profile_before() -> bytes:
+    content = ProfileResponse(
+        user_id="64b000000000000000000002",
+        profile_data=ProfileData(**PROFILE_DOCUMENT),
+        completion_percentage=100
+    )
+    return JSONResponse(await serialize_response(field=PROFILE_FIELD, response_content=content)).body
+
+
+async def profile_after() -> bytes:
+    return ORJSONResponse({
+        "user_id": "64b000000000000000000002",
+        "profile_data": profile_data_response(PROFILE_DOCUMENT),
+        "completion_percentage": 100
+    }).body
+
+
+async def run():
+    for before, after in ((family_before, family_after), (profile_before, profile_after)):
+        assert json.loads(await before()) == json.loads(await after())
+
+    for label, before, after in (
+        ("/family/my-family", family_before, family_after),
+        ("/profile/", profile_before, profile_after),
+    ):
+        for loops in LOOPS:
+            timings = []
+            for func in (before, after):
+                start = time.perf_counter()
+                for _ in range(loops):
+                    await func()
+                timings.append((time.perf_counter() - start) / loops * 1e6)
+            print(
+                f"{label:<18} {loops:>7} loops: before {timings[0]:7.2f} µs  "
+                f"after {timings[1]:7.2f} µs  ({timings[0] / timings[1]:4.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
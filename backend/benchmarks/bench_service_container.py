@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-request service construction vs the application container
+"""
+
+import timeit
+from types import SimpleNamespace
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core import database
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.api.deps import get_auth_service, get_family_service, get_profile_service
+from app.services.auth_service import AuthService
+from app.services.family_service import FamilyService
+from app.services.profile_service import ProfileService
+
+ITERATIONS = 100_000
+
+
+def main():
+    """Compare the cost of resolving the three services per request"""
+    # Motor connects lazily, so no server is needed to build handles
+    client = AsyncIOMotorClient("mongodb://localhost:27017", connect=False)
+    database.db.client = client
+    settings.PINCODE_ALLOW_SAMPLE_TABLE = True
+    database.db.database = client["drshaadi_bench"]
+
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(
+        services=ServiceContainer(database.get_database())
+    )))
+
+    def per_request():
+        AuthService()
+        FamilyService()
+        ProfileService()
+
+    def container():
+        get_auth_service(request)
+        get_family_service(request)
+        get_profile_service(request)
+
+    for label, func in (("per-request construction", per_request), ("container lookup", container)):
+        seconds = min(timeit.repeat(func, number=ITERATIONS, repeat=5))
+        print(f"{label:>26}: {seconds / ITERATIONS * 1e6:8.3f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: send_otp latency with SMS delivered inline vs through the dispatch queue
+
+Uses the fake provider with injected latency and mongomock-motor, so it runs fully
+offline; mongomock executes queries synchronously, which caps the queued req/s.
+"""
+
+import argparse
+import asyncio
+import time
+from mongomock_motor import AsyncMongoMockClient
+from app.services.auth_service import AuthService
+from app.services.sms_service import FakeSMSProvider, SMSDispatcher
+from benchmarks.support import percentile
+
+
+class InlineAuthService(AuthService):
+    """Calls the provider inside the request, as a direct Twilio call would"""
+
+    def __init__(self, database, provider):
+        super().__init__(database)
+        self.provider = provider
+
+    async def send_otp(self, mobile_number: str) -> dict:
+        result = await super().send_otp(mobile_number)
+        try:
+            await self.provider.send(mobile_number, "Your DrShaadi verification code is 1234")
+        except RuntimeError:
+            pass
+        return result
+
+
+async def measure(service: AuthService, numbers: int, concurrency: int) -> dict:
+    """Per-call send_otp latency for `numbers` distinct numbers"""
+    latencies = []
+    queue = asyncio.Queue()
+    for index in range(numbers):
+        queue.put_nowait(f"9{index:09d}")
+
+    async def worker():
+        while not queue.empty():
+            mobile_number = queue.get_nowait()
+            start = time.perf_counter()
+            await service.send_otp(mobile_number)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_seconds = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": numbers / wall_seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000
+    }
+
+
+async def run(args):
+    inline = await measure(
+        InlineAuthService(AsyncMongoMockClient()["drshaadi_bench"], FakeSMSProvider(args.latency_ms, args.failure_rate)),
+        args.numbers,
+        args.concurrency
+    )
+
+    dispatcher = SMSDispatcher(
+        FakeSMSProvider(args.latency_ms, args.failure_rate),
+        workers=args.workers,
+        concurrency=args.provider_concurrency,
+        rate_per_second=args.rate,
+        retry_base_seconds=0.05
+    )
+    await dispatcher.start()
+    queued = await measure(AuthService(AsyncMongoMockClient()["drshaadi_bench"], dispatcher), args.numbers, args.concurrency)
+    drain_start = time.perf_counter()
+    await dispatcher.join()
+    drain_seconds = time.perf_counter() - drain_start
+    await dispatcher.stop()
+
+    for label, result in (("inline", inline), ("queued", queued)):
+        print(
+            f"{label:>7}: {result['rps']:8.0f} req/s  "
+            f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms"
+        )
+    print(
+        f"queue drained {drain_seconds:.2f}s after the last request: "
+        f"{dispatcher.sent_count} sent, {len(dispatcher.dead_letters)} dead-lettered"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--numbers", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--provider-concurrency", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=0, help="provider sends per second, 0 = unlimited")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
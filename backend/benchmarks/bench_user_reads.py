@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes transferred and latency for each AuthService user read path
+
+Requires a local mongod; set MONGODB_URL to point elsewhere.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.services.auth_service import AuthService
+
+
+class ReplyBytesListener(monitoring.CommandListener):
+    """Sum the BSON size of every command reply"""
+
+    def __init__(self):
+        self.reply_bytes = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.reply_bytes += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+
+def large_profile(size_kb: int) -> dict:
+    """A profile_data blob padded to roughly size_kb"""
+    return {
+        "address": {
+            "location": "Bengaluru",
+            "pincode": "560001",
+            "grew_up_in": "Mysuru",
+            "residency_status": "citizen"
+        },
+        "caste": {"caste": "Iyer", "subcaste": "Vadama", "is_not_particular_about_caste": False},
+        "marital": {"marital_status": "never_married", "height": "5'6\"", "diet": "veg"},
+        "about": "x" * (size_kb * 1024)
+    }
+
+
+async def run(args):
+    listener = ReplyBytesListener()
+    client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[listener])
+    database = client[f"{settings.DATABASE_NAME}_bench"]
+    await client.drop_database(database.name)
+    await ensure_indexes(database)
+
+    numbers = [f"9{i:09d}" for i in range(args.users)]
+    await database.users.insert_many([
+        {"name": f"User {i}", "mobile_number": number, "is_active": True,
+         "profile_data": large_profile(args.profile_kb)}
+        for i, number in enumerate(numbers)
+    ])
+    ids = [str(user["_id"]) async for user in database.users.find({}, {"_id": 1})]
+
+    service = AuthService(database)
+    paths = {
+        "user_exists_by_mobile": lambda: service.user_exists_by_mobile(random.choice(numbers)),
+        "get_auth_summary_by_mobile": lambda: service.get_auth_summary_by_mobile(random.choice(numbers)),
+        "get_user_by_mobile": lambda: service.get_user_by_mobile(random.choice(numbers)),
+        "get_user_by_id": lambda: service.get_user_by_id(random.choice(ids)),
+    }
+
+    print(f"{args.users} users, ~{args.profile_kb} KB profile_data, {args.iterations} reads per path")
+    for name, call in paths.items():
+        listener.reply_bytes = 0
+        latencies = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        latencies.sort()
+        print(
+            f"{name:>28}: {listener.reply_bytes / args.iterations:10.0f} B/read  "
+            f"p50 {statistics.median(latencies):6.3f} ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1]:6.3f} ms"
+        )
+
+    await client.drop_database(database.name)
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--profile-kb", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=2000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
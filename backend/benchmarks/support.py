@@ -0,0 +1,139 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+
+from contextvars import ContextVar
+from typing import Any, Awaitable, List, Optional, Tuple
+import math
+
+# Mongo operations issued by the current request; set per request by the driver
+current_ops: ContextVar[Optional[List[int]]] = ContextVar("current_ops", default=None)
+
+_COUNTED_METHODS = {
+    "aggregate", "bulk_write", "count_documents", "delete_many", "delete_one",
+    "distinct", "find", "find_one", "find_one_and_delete", "find_one_and_replace",
+    "find_one_and_update", "insert_many", "insert_one", "replace_one",
+    "update_many", "update_one",
+}
+
+
+class CountingCollection:
+    """Collection proxy that counts each operation against current_ops"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in _COUNTED_METHODS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            ops = current_ops.get()
+            if ops is not None:
+                ops[0] += 1
+            return attribute(*args, **kwargs)
+
+        return counted
+
+
+class CountingDatabase:
+    """Database proxy whose collections count operations"""
+
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name])
+
+    def __getattr__(self, name):
+        attribute = getattr(self._database, name)
+        if name.startswith("_") or (callable(attribute) and not hasattr(attribute, "find_one")):
+            return attribute
+        return CountingCollection(attribute)
+
+
+async def count_ops(operation: Awaitable) -> Tuple[Any, int]:
+    """Await an operation and return its result with the Mongo operations it issued"""
+    ops = [0]
+    token = current_ops.set(ops)
+    try:
+        result = await operation
+    finally:
+        current_ops.reset(token)
+    return result, ops[0]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+# Vocabularies for synthetic profiles, skewed roughly like real sign-ups
+LOCATIONS = [
+    "Bengaluru", "Mumbai", "Delhi", "Hyderabad", "Chennai", "Pune", "Kolkata", "Ahmedabad",
+    "Jaipur", "Lucknow", "Mysuru", "Kochi", "Indore", "Nagpur", "Coimbatore", "Surat"
+]
+CASTES = [
+    "Brahmin", "Reddy", "Iyer", "Iyengar", "Nair", "Maratha", "Jat", "Rajput", "Agarwal",
+    "Kamma", "Lingayat", "Vokkaliga", "Ezhava", "Kayastha", "Khatri", "Yadav"
+]
+MARITAL_STATUSES = ["never_married", "never_married", "never_married", "divorced", "widowed", "awaiting_divorce"]
+DIETS = ["veg", "veg", "non_veg", "non_veg", "eggetarian", "jain", "vegan"]
+RESIDENCY_STATUSES = ["citizen", "citizen", "citizen", "permanent_resident", "work_permit", "student_visa"]
+HEIGHTS = [f"{inches // 12}'{inches % 12}\"" for inches in range(56, 77)]
+
+
+def synthetic_profile(rng) -> dict:
+    """A random but plausible profile_data document"""
+    location_index = min(int(rng.expovariate(0.25)), len(LOCATIONS) - 1)
+    caste = rng.choice(CASTES)
+    return {
+        "address": {
+            "location": LOCATIONS[location_index],
+            "pincode": f"{560001 + location_index * 1000 + rng.randrange(100)}",
+            "grew_up_in": rng.choice(LOCATIONS),
+            "residency_status": rng.choice(RESIDENCY_STATUSES)
+        },
+        "caste": {
+            "caste": caste,
+            "subcaste": f"{caste} {rng.randrange(5)}",
+            "is_not_particular_about_caste": rng.random() < 0.3
+        },
+        "marital": {
+            "marital_status": rng.choice(MARITAL_STATUSES),
+            "height": rng.choice(HEIGHTS),
+            "diet": rng.choice(DIETS)
+        }
+    }
+
+
+async def seed_profiles(collection, count: int, seed: int = 42, batch_size: int = 10000) -> None:
+    """Insert `count` active users with synthetic profile_data in unordered batches"""
+    import random
+    from datetime import datetime
+    from app.core.height import parse_height_cm
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for start in range(0, count, batch_size):
+        profiles = [synthetic_profile(rng) for _ in range(start, min(start + batch_size, count))]
+        await collection.insert_many(
+            [
+                {
+                    "name": f"Synthetic User {index}",
+                    "mobile_number": f"7{index:09d}",
+                    "is_active": True,
+                    "profile_data": profile_data,
+                    "profile_completion": 100,
+                    "height_cm": parse_height_cm(profile_data["marital"]["height"]),
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for index, profile_data in enumerate(profiles, start)
+            ],
+            ordered=False
+        )
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Management commands for DrShaadi Backend API
+"""
+
+import argparse
+import asyncio
+import sys
+from app.core.config import settings
+from app.core.database import create_mongo_client
+from app.core.indexes import ensure_indexes, audit_query_plans
+from app.services.auth_service import AuthService
+from app.services.export_service import ExportService
+from app.services.import_service import ImportService
+from app.services.pincode_index import BUNDLED_TABLE, convert_pincode_csv
+from app.services.profile_service import ProfileService
+from datetime import datetime
+import json
+
+
+def get_database():
+    """Open a standalone database handle for management commands"""
+    return create_mongo_client()[settings.DATABASE_NAME]
+
+
+async def ensure_indexes_command(args) -> int:
+    """Create and verify the declared indexes"""
+    await ensure_indexes(get_database())
+    print("✅ Indexes match the declared spec")
+    return 0
+
+
+async def audit_indexes_command(args) -> int:
+    """Fail if any service query shape scans a collection, sorts in memory or scans an unselective index"""
+    offenders = await audit_query_plans(get_database())
+
+    if offenders:
+        for offender in offenders:
+            print(f"❌ {offender}")
+        return 1
+
+    print("✅ Every query shape uses a selective index in sort order")
+    return 0
+
+
+async def backfill_completion_command(args) -> int:
+    """Store profile_completion on users written before it was materialized"""
+    updated = await ProfileService(get_database()).backfill_profile_completion(args.batch_size)
+    print(f"✅ Backfilled profile completion for {updated} users")
+    return 0
+
+
+async def backfill_height_command(args) -> int:
+    """Store height_cm on users written before it was materialized"""
+    updated = await ProfileService(get_database()).backfill_height_cm(args.batch_size)
+    print(f"✅ Backfilled height_cm for {updated} users")
+    return 0
+
+
+async def backfill_geo_command(args) -> int:
+    """Store the pincode geo_point on users written before it was materialized"""
+    updated = await ProfileService(get_database()).backfill_geo_point(args.batch_size)
+    print(f"✅ Backfilled geo_point for {updated} users")
+    return 0
+
+
+async def normalize_mobile_numbers_command(args) -> int:
+    """Rewrite users and otps stored before mobile numbers were normalized to 10 digits"""
+    report = await AuthService(get_database()).normalize_stored_mobile_numbers(args.batch_size)
+    print(f"✅ Normalized {report['users']} users and {report['otps']} OTPs "
+          f"({report['otps_removed']} superseded OTPs removed)")
+
+    for collision in report["collisions"]:
+        print(f"❌ Collision: user {collision['id']} ({collision['mobile_number']}) normalizes to "
+              f"{collision['normalized']}, already used by user {collision['conflicts_with']}")
+    for invalid in report["invalid"]:
+        print(f"❌ Invalid: {invalid['collection']} {invalid['id']} has mobile number {invalid['mobile_number']!r}")
+
+    return 1 if report["collisions"] or report["invalid"] else 0
+
+
+async def build_pincode_table_command(args) -> int:
+    """Convert a pincode directory CSV to the memory-mapped .npy table"""
+    count = convert_pincode_csv(args.csv_path, args.output)
+    print(f"✅ Wrote {count} pincodes to {args.output}")
+    return 0
+
+
+async def _read_lines(path: str):
+    """Yield raw lines from a file, or stdin for "-", without loading it whole"""
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        for line in stream:
+            yield line
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+async def import_users_command(args) -> int:
+    """Bulk import users from an NDJSON file of RegisterRequest rows"""
+    results = ImportService(get_database()).import_users(
+        _read_lines(args.path),
+        args.chunk_size,
+        settings.IMPORT_MAX_LINE_BYTES
+    )
+
+    async for result in results:
+        if "summary" in result:
+            summary = result["summary"]
+            print(
+                f"✅ Imported {summary['created']} of {summary['rows']} users "
+                f"({summary['duplicate']} duplicate, {summary['invalid']} invalid, {summary['error']} failed)",
+                file=sys.stderr
+            )
+            return 0 if not summary["error"] else 1
+        print(json.dumps(result))
+
+    return 1
+
+
+async def export_users_command(args) -> int:
+    """Stream users to NDJSON or CSV for analytics"""
+    service = ExportService(get_database())
+    options = {
+        "after": args.after,
+        "since": datetime.fromisoformat(args.since) if args.since else None,
+        "batch_size": args.batch_size
+    }
+    output = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+
+    try:
+        if args.format == "csv":
+            async for chunk in service.export_csv(**options):
+                output.write(chunk.encode())
+        else:
+            async for chunk in service.export_ndjson(**options):
+                output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+    print(f"✅ Exported users to {args.output}", file=sys.stderr)
+    return 0
+
+
+def main():
+    """Parse arguments and dispatch to a command"""
+    parser = argparse.ArgumentParser(description="DrShaadi management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("ensure-indexes", help="Create and verify indexes").set_defaults(
+        handler=ensure_indexes_command
+    )
+    subparsers.add_parser("audit-indexes", help="Explain service queries and reject scans and sorts").set_defaults(
+        handler=audit_indexes_command
+    )
+
+    backfill_completion = subparsers.add_parser(
+        "backfill-completion", help="Store profile_completion on existing users"
+    )
+    backfill_completion.add_argument("--batch-size", type=int, default=500)
+    backfill_completion.set_defaults(handler=backfill_completion_command)
+
+    backfill_height = subparsers.add_parser(
+        "backfill-height", help="Store the numeric height_cm on existing users"
+    )
+    backfill_height.add_argument("--batch-size", type=int, default=500)
+    backfill_height.set_defaults(handler=backfill_height_command)
+
+    backfill_geo = subparsers.add_parser(
+        "backfill-geo", help="Store the pincode geo_point on existing users"
+    )
+    backfill_geo.add_argument("--batch-size", type=int, default=500)
+    backfill_geo.set_defaults(handler=backfill_geo_command)
+
+    normalize_mobile_numbers = subparsers.add_parser(
+        "normalize-mobile-numbers", help="Rewrite stored mobile numbers to 10 digits and report collisions"
+    )
+    normalize_mobile_numbers.add_argument("--batch-size", type=int, default=500)
+    normalize_mobile_numbers.set_defaults(handler=normalize_mobile_numbers_command)
+
+    build_pincode_table = subparsers.add_parser(
+        "build-pincode-table", help="Convert a pincode,latitude,longitude CSV to the pincode table"
+    )
+    build_pincode_table.add_argument("csv_path")
+    build_pincode_table.add_argument("--output", default=str(BUNDLED_TABLE))
+    build_pincode_table.set_defaults(handler=build_pincode_table_command)
+
+    import_users = subparsers.add_parser(
+        "import-users", help="Bulk import users from NDJSON (rejected rows are printed as NDJSON)"
+    )
+    import_users.add_argument("path", help="NDJSON file, or - for stdin")
+    import_users.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    import_users.set_defaults(handler=import_users_command)
+
+    export_users = subparsers.add_parser(
+        "export-users", help="Export users with profile_data and family membership"
+    )
+    export_users.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    export_users.add_argument("--output", default="-", help="Output file, or - for stdout")
+    export_users.add_argument("--after", help="Resume after this user _id")
+    export_users.add_argument("--since", help="Only users with updated_at >= this ISO timestamp")
+    export_users.add_argument("--batch-size", type=int, default=settings.EXPORT_BATCH_SIZE)
+    export_users.set_defaults(handler=export_users_command)
+
+    args = parser.parse_args()
+    sys.exit(asyncio.run(args.handler(args)))
+
+
+if __name__ == "__main__":
+    main()
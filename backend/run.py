@@ -1,16 +1,13 @@
 #!/usr/bin/env python3
 """
 Run script for DrShaadi Backend API
+
+DEBUG=true starts a single auto-reloading uvicorn process; otherwise the app
+is served by gunicorn with one uvloop/httptools worker per CPU (see
+app/core/server.py and the server settings in app/core/config.py).
 """
 
-import uvicorn
-from app.core.config import settings
+from app.core.server import serve
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8005,
-        reload=settings.DEBUG,
-        log_level="info"
-    )
+    serve()
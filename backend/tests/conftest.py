@@ -0,0 +1,19 @@
+import os
+
+# The suite runs outside DEBUG against the bundled sample pincode table
+os.environ.setdefault("PINCODE_ALLOW_SAMPLE_TABLE", "true")
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from app.core import database
+from app.main import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client running the app lifespan against an in-memory MongoDB"""
+    monkeypatch.setattr(database, "create_mongo_client", lambda: AsyncMongoMockClient())
+
+    with TestClient(app) as test_client:
+        yield test_client
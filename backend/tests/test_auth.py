@@ -1,25 +1,26 @@
+import asyncio
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
+from datetime import datetime, timedelta
+from mongomock_motor import AsyncMongoMockClient
+from app.core.indexes import ensure_indexes
+from app.services.auth_service import AuthService
 
-client = TestClient(app)
 
-
-def test_root():
+def test_root(client):
     """Test root endpoint"""
     response = client.get("/")
     assert response.status_code == 200
     assert "message" in response.json()
 
 
-def test_health_check():
+def test_health_check(client):
     """Test health check endpoint"""
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
 
-def test_send_otp():
+def test_send_otp(client):
     """Test send OTP endpoint"""
     response = client.post(
         "/api/v1/auth/send-otp",
@@ -29,10 +30,117 @@ def test_send_otp():
     assert "mobile_number" in response.json()
 
 
-def test_verify_otp_invalid():
+def test_verify_otp_invalid(client):
     """Test verify OTP with invalid OTP"""
     response = client.post(
         "/api/v1/auth/verify-otp",
         json={"mobile_number": "9876543210", "otp": "0000"}
     )
     assert response.status_code == 400
+
+
+def test_register_and_login(client):
+    """Test registering a user, rejecting a duplicate and logging in"""
+    payload = {"name": "Test User", "mobile_number": "9876543210", "profile_type": "myself"}
+
+    response = client.post("/api/v1/auth/register", json=payload)
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+
+    response = client.post("/api/v1/auth/register", json=payload)
+    assert response.status_code == 400
+
+    response = client.post("/api/v1/auth/login", json={"mobile_number": "9876543210"})
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+
+
+def test_legacy_stored_number_can_log_in_and_is_not_registered_twice(client):
+    """Test that users stored with a +91 prefix before normalization are still found"""
+    asyncio.run(client.app.state.services.database.users.insert_one(
+        {"name": "Legacy", "mobile_number": "+919876543210", "is_active": True}
+    ))
+
+    response = client.post("/api/v1/auth/login", json={"mobile_number": "98765 43210"})
+    assert response.status_code == 200
+
+    response = client.post("/api/v1/auth/register", json={"name": "Again", "mobile_number": "9876543210"})
+    assert response.status_code == 400
+
+
+def test_normalize_stored_mobile_numbers_reports_collisions():
+    """Test the batched rewrite of legacy users and otps mobile numbers"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    service = AuthService(database)
+
+    async def run():
+        await ensure_indexes(database)
+        users = await database.users.insert_many([
+            {"name": "Spaced", "mobile_number": "+91 98765 43210"},
+            {"name": "Current", "mobile_number": "9876543211"},
+            {"name": "Duplicate", "mobile_number": "919876543211"},
+            {"name": "Bogus", "mobile_number": "12345"},
+        ])
+        expires_at = datetime.utcnow() + timedelta(minutes=5)
+        await database.otps.insert_many([
+            {"mobile_number": "+919876543212", "otp": "1234", "expires_at": expires_at},
+            {"mobile_number": "9876543213", "otp": "1234", "expires_at": expires_at},
+            {"mobile_number": "09876543213", "otp": "9999", "expires_at": expires_at},
+        ])
+        report = await service.normalize_stored_mobile_numbers(batch_size=2)
+        stored_users = [user["mobile_number"] for user in await database.users.find().sort("_id", 1).to_list(None)]
+        stored_otps = sorted((otp["mobile_number"], otp["otp"]) for otp in await database.otps.find().to_list(None))
+        return users.inserted_ids, report, stored_users, stored_otps
+
+    user_ids, report, stored_users, stored_otps = asyncio.run(run())
+
+    assert report["users"] == 1
+    assert report["collisions"] == [{
+        "id": str(user_ids[2]),
+        "mobile_number": "919876543211",
+        "normalized": "9876543211",
+        "conflicts_with": str(user_ids[1])
+    }]
+    assert [invalid["mobile_number"] for invalid in report["invalid"]] == ["12345"]
+    assert stored_users == ["9876543210", "9876543211", "919876543211", "12345"]
+    assert (report["otps"], report["otps_removed"]) == (1, 1)
+    assert stored_otps == [("9876543212", "1234"), ("9876543213", "1234")]
+    # Re-running finds only what it could not fix
+    again = asyncio.run(service.normalize_stored_mobile_numbers())
+    assert (again["users"], again["otps"], len(again["collisions"])) == (0, 0, 1)
+
+
+def test_login_unknown_user(client):
+    """Test login with an unregistered number"""
+    response = client.post("/api/v1/auth/login", json={"mobile_number": "9000000000"})
+    assert response.status_code == 404
+
+
+def test_me_requires_bearer_token(client):
+    """Test that /me reads the Authorization: Bearer header"""
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"name": "Test User", "mobile_number": "9876543210"}
+    )
+    token = response.json()["access_token"]
+
+    response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["mobile_number"] == "9876543210"
+
+    response = client.get("/api/v1/auth/me", params={"token": token})
+    assert response.status_code == 401
+
+    response = client.get("/api/v1/auth/me", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+
+
+def test_metrics_endpoint(client):
+    """Test that /metrics reports per-route request metrics"""
+    client.post("/api/v1/auth/send-otp", json={"mobile_number": "9876543210"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'route="/api/v1/auth/send-otp"' in response.text
+    assert "http_requests_in_flight" in response.text
+    assert 'cache="tokens"' in response.text
@@ -0,0 +1,19 @@
+import argparse
+import asyncio
+from mongomock_motor import AsyncMongoMockClient
+from app.core import database
+from app.core.config import settings
+from benchmarks import bench_endpoints
+
+
+def test_bench_endpoints_covers_every_route(monkeypatch):
+    """Test that the endpoint benchmark has an error-free scenario for every api_router route"""
+    # run() changes these for the benchmark; monkeypatch restores them afterwards
+    monkeypatch.setattr(database, "create_mongo_client", lambda: AsyncMongoMockClient())
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", settings.RATE_LIMIT_ENABLED)
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", None)
+
+    results = asyncio.run(bench_endpoints.run(argparse.Namespace(backend="mongomock", users=4, concurrency=1)))
+
+    assert results["uncovered_routes"] == []
+    assert {key: route["errors"] for key, route in results["routes"].items() if route["errors"]} == {}
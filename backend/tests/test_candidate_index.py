@@ -0,0 +1,245 @@
+import asyncio
+import random
+import numpy as np
+from datetime import datetime, timedelta
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+from app.schemas.search import SearchFilters
+from app.core.height import parse_height_cm
+from app.services import candidate_index
+from app.services.candidate_index import CandidateIndex
+from app.services.search_service import SearchService
+from benchmarks.support import synthetic_profile
+
+START = datetime(2024, 6, 1)
+
+
+def seed(database, count: int = 300) -> list:
+    """Random profiles plus inactive and profile-less users"""
+    rng = random.Random(7)
+    documents = []
+    for i in range(count):
+        profile_data = synthetic_profile(rng) if i % 23 else None
+        documents.append({
+            "name": f"User {i}",
+            "is_active": i % 17 != 0,
+            "profile_data": profile_data,
+            "height_cm": parse_height_cm(profile_data["marital"]["height"]) if profile_data else None,
+            "updated_at": START
+        })
+    asyncio.run(database.users.insert_many(documents))
+    return documents
+
+
+def mongo_ids(database, filters: SearchFilters, user_id: str, searcher_caste, searcher_particular: bool):
+    query = SearchService.build_query(filters, user_id, searcher_caste, searcher_particular=searcher_particular)
+    documents = asyncio.run(database.users.find(query, {"_id": 1}).sort("_id", -1).to_list(None))
+    return [document["_id"] for document in documents]
+
+
+def test_match_agrees_with_mongo_query(monkeypatch):
+    """Test that index matches equal the search query for random filter combinations"""
+    # Small blocks so matches span several unpack steps
+    monkeypatch.setattr(candidate_index, "MATCH_BLOCK_ROWS", 24)
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    documents = seed(database)
+    index = CandidateIndex(database)
+    asyncio.run(index.load(batch_size=50))
+    rng = random.Random(11)
+
+    for _ in range(40):
+        searcher = rng.choice(documents)
+        searcher_caste = ((searcher["profile_data"] or {}).get("caste") or {}).get("caste")
+        searcher_particular = rng.random() < 0.5
+        sample = (rng.choice(documents)["profile_data"] or {})
+        filters = {}
+        for field, (section, key) in (("location", ("address", "location")), ("diet", ("marital", "diet")),
+                                      ("marital_status", ("marital", "marital_status"))):
+            if rng.random() < 0.5 and sample:
+                filters[field] = sample[section][key]
+
+        height_cm = rng.choice([(None, None), (160, None), (None, 170), (155, 175)])
+
+        expected = mongo_ids(
+            database,
+            SearchFilters(**filters, min_height_cm=height_cm[0], max_height_cm=height_cm[1]),
+            str(searcher["_id"]),
+            searcher_caste,
+            searcher_particular
+        )
+        assert index.match(
+            filters, searcher_caste, searcher_particular, height_cm=height_cm, exclude=str(searcher["_id"])
+        ) == expected
+        before = str(documents[rng.randrange(len(documents))]["_id"])
+        page = index.match(
+            filters, searcher_caste, searcher_particular,
+            height_cm=height_cm, before=before, exclude=str(searcher["_id"]), limit=5
+        )
+        assert page == [_id for _id in expected if str(_id) < before][:5]
+
+
+def test_refresh_applies_updates_and_new_users():
+    """Test that refresh picks up changed and inserted users from updated_at"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    documents = seed(database, count=50)
+    index = CandidateIndex(database)
+    asyncio.run(index.load())
+
+    target = next(document for document in documents if document["is_active"] and document["profile_data"])
+    later = START + timedelta(minutes=1)
+    asyncio.run(database.users.update_one(
+        {"_id": target["_id"]},
+        {"$set": {"profile_data.address.location": "Atlantis", "updated_at": later}}
+    ))
+    # An _id ending in NUL bytes must survive the fixed-width id column
+    new_id = ObjectId(ObjectId().binary[:10] + b"\x00\x00")
+    profile_data = synthetic_profile(random.Random(1))
+    profile_data["address"]["location"] = "Atlantis"
+    profile_data["caste"]["is_not_particular_about_caste"] = True
+    asyncio.run(database.users.insert_one(
+        {"_id": new_id, "is_active": True, "profile_data": profile_data, "updated_at": later}
+    ))
+
+    assert asyncio.run(index.refresh()) == 2
+    # The overlap window re-reads both rows, but they are already applied: the
+    # idle refresh changes nothing and keeps the current arrays
+    ids, location, bitsets = index.ids, index.codes["location"], index._bitsets
+    assert asyncio.run(index.refresh()) == 0
+    assert index.ids is ids and index.codes["location"] is location and index._bitsets is bitsets
+    matches = index.match({"location": "Atlantis"}, apply_caste_rule=False)
+    assert set(matches) == {target["_id"], new_id}
+    assert len(index) == 51
+    assert index.watermark == later
+
+
+def assert_bitsets_rebuilt(index: CandidateIndex) -> None:
+    """Assert the index's bitsets equal ones built from scratch from its columns"""
+    rebuilt = CandidateIndex(index.db)
+    rebuilt.ids, rebuilt.codes, rebuilt.vocab = index.ids, index.codes, index.vocab
+    rebuilt.active, rebuilt.not_particular = index.active, index.not_particular
+    rebuilt.build_bitsets()
+    assert index._bitsets.keys() == rebuilt._bitsets.keys()
+    for field, bitsets in rebuilt._bitsets.items():
+        assert index._bitsets[field].keys() == bitsets.keys()
+        for code, bits in bitsets.items():
+            assert np.array_equal(index._bitsets[field][code], bits), (field, code)
+    assert np.array_equal(index._active_bits, rebuilt._active_bits)
+    assert np.array_equal(index._not_particular_bits, rebuilt._not_particular_bits)
+
+
+def test_refresh_patches_only_changed_bitsets():
+    """Test that a refresh shares untouched bitsets and ends up equal to a full rebuild"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    documents = seed(database, count=50)
+    index = CandidateIndex(database)
+    asyncio.run(index.load())
+    diet_bitsets = index._bitsets["diet"]
+
+    target = next(document for document in documents if document["is_active"] and document["profile_data"])
+    later = START + timedelta(minutes=1)
+    asyncio.run(database.users.update_one(
+        {"_id": target["_id"]},
+        {"$set": {"profile_data.address.location": "Atlantis", "updated_at": later}}
+    ))
+    asyncio.run(index.refresh())
+
+    assert all(index._bitsets["diet"][code] is bits for code, bits in diet_bitsets.items())
+    assert_bitsets_rebuilt(index)
+
+    # New users appended after the existing rows, plus deactivations
+    new_profile = synthetic_profile(random.Random(2))
+    asyncio.run(database.users.insert_many(
+        [{"is_active": True, "profile_data": new_profile, "updated_at": later} for _ in range(3)]
+    ))
+    for document in documents[:3]:
+        asyncio.run(database.users.update_one({"_id": document["_id"]}, {"$set": {"is_active": False, "updated_at": later}}))
+    asyncio.run(index.refresh())
+    assert len(index) == 53
+    assert_bitsets_rebuilt(index)
+
+    # A new user sorting before every existing row
+    asyncio.run(database.users.insert_one(
+        {"_id": ObjectId("000000000000000000000001"), "is_active": True, "profile_data": new_profile, "updated_at": later}
+    ))
+    asyncio.run(index.refresh())
+    assert len(index) == 54
+    assert_bitsets_rebuilt(index)
+
+
+def test_background_load_retries_after_failure(monkeypatch):
+    """Test that a failed initial load is logged and retried instead of ending the refresh task"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    seed(database, count=20)
+    index = CandidateIndex(database)
+    load = index.load
+    attempts = []
+
+    async def flaky_load(*args, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("mongo unavailable")
+        await load(*args, **kwargs)
+
+    monkeypatch.setattr(index, "load", flaky_load)
+
+    async def run():
+        index.start(refresh_seconds=0.01)
+        for _ in range(100):
+            if index.ready:
+                break
+            await asyncio.sleep(0.01)
+        await index.stop()
+
+    asyncio.run(run())
+    assert index.ready
+    assert len(index) == 20
+    assert len(attempts) >= 2
+
+
+def test_code_column_widens_past_uint16():
+    """Test that a field with more than 65535 distinct values gets new codes instead of wrapping"""
+    index = CandidateIndex(AsyncMongoMockClient()["drshaadi_test"])
+    first = {"_id": ObjectId(), "is_active": True, "profile_data": {"address": {"location": "Town 1"}}}
+    index.apply([first])
+    # Pretend the vocabulary is already full, so the next values land on the boundary
+    index.vocab["location"].update({f"Town {code}": code for code in range(2, candidate_index.NARROW_CODE_MAX + 1)})
+
+    boundary = [
+        {"_id": ObjectId(), "is_active": True, "profile_data": {"address": {"location": f"New {n}"}}}
+        for n in range(3)
+    ]
+    index.apply(boundary[:2])
+    # In-place updates of existing rows go through the widened column too
+    index.apply([{**first, "profile_data": {"address": {"location": "New 2"}}}, boundary[2]])
+    index.build_bitsets()
+
+    assert index.codes["location"].dtype == np.uint32
+    assert index.codes["marital_status"].dtype == np.uint16
+    assert index.vocab["location"]["New 1"] == candidate_index.NARROW_CODE_MAX + 2
+    # 65537 would have wrapped onto code 1 ("Town 1")
+    assert index.match({"location": "Town 1"}, apply_caste_rule=False) == []
+    assert index.match({"location": "New 1"}, apply_caste_rule=False) == [boundary[1]["_id"]]
+    assert index.match({"location": "New 2"}, apply_caste_rule=False) == [boundary[2]["_id"], first["_id"]]
+
+
+def test_search_uses_ready_index_with_pagination():
+    """Test that indexed search pages match the Mongo-only search"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    documents = seed(database, count=80)
+    index = CandidateIndex(database)
+    asyncio.run(index.load())
+    searcher_id = str(documents[1]["_id"])
+
+    def walk(service, **filters):
+        seen, cursor = [], None
+        while True:
+            results, cursor = asyncio.run(service.search(SearchFilters(**filters, limit=7, cursor=cursor), searcher_id))
+            seen.extend(result["id"] for result in results)
+            if cursor is None:
+                return seen
+
+    assert walk(SearchService(database, index)) == walk(SearchService(database))
+
+    near = {"near_pincode": "560001", "radius_km": 30}
+    assert walk(SearchService(database, index), **near) == walk(SearchService(database), **near)
+    assert walk(SearchService(database), **near)
@@ -0,0 +1,104 @@
+import asyncio
+import orjson
+from app.core.events import SSE_KEEPALIVE, EventHub, format_sse, sse_stream
+
+
+def test_publish_fans_out_to_topic_subscribers():
+    """Test that events reach every subscriber of their topic and no other"""
+    async def run():
+        hub = EventHub()
+        first, second = hub.subscribe("FAM1"), hub.subscribe("FAM1")
+        other = hub.subscribe("FAM2")
+        delivered = hub.publish("FAM1", {"type": "ping"})
+        received = [await first.get(0), await second.get(0), await other.get(0.01)]
+        hub.unsubscribe(first)
+        return hub, delivered, received
+
+    hub, delivered, received = asyncio.run(run())
+    assert delivered == 2
+    assert received == [{"type": "ping"}, {"type": "ping"}, None]
+    assert hub.subscriber_count("FAM1") == 1
+    assert hub.subscriber_count() == 2
+
+
+def test_slow_subscriber_is_dropped():
+    """Test that a subscriber whose backlog is full is closed instead of growing"""
+    async def run():
+        hub = EventHub(queue_size=2)
+        slow = hub.subscribe("FAM1")
+        delivered = [hub.publish("FAM1", {"type": str(n)}) for n in range(3)]
+        return hub, slow, delivered, await slow.get(0)
+
+    hub, slow, delivered, event = asyncio.run(run())
+    assert delivered == [1, 1, 0]
+    assert slow.closed and event is None
+    assert hub.subscriber_count() == 0
+    assert hub.dropped == 1
+
+
+def test_sse_stream_frames_and_close():
+    """Test the SSE stream's keepalives, event frames and shutdown"""
+    async def run():
+        hub = EventHub()
+        stream = sse_stream(hub, "FAM1", keepalive_seconds=0.01)
+        frames = [await stream.__anext__()]
+        hub.publish("FAM1", {"type": "join_request.created", "request": {"id": "1"}})
+        frames.append(await stream.__anext__())
+        frames.append(await stream.__anext__())
+
+        hub.close()
+        rest = [frame async for frame in stream]
+        return hub, frames, rest
+
+    hub, frames, rest = asyncio.run(run())
+    assert frames[0] == SSE_KEEPALIVE
+    assert frames[1] == format_sse({"type": "join_request.created", "request": {"id": "1"}})
+    assert frames[1].startswith(b"event: join_request.created\ndata: ")
+    assert orjson.loads(frames[1].split(b"data: ")[1])["request"] == {"id": "1"}
+    assert frames[2] == SSE_KEEPALIVE
+    assert rest == []
+    assert hub.subscriber_count() == 0
+
+
+def test_server_shutdown_ends_open_streams(monkeypatch):
+    """Test that a worker with an open stream still shuts down and stops its services"""
+    import uvicorn
+    from mongomock_motor import AsyncMongoMockClient
+    from app.core import database
+    from app.core.config import settings
+    from app.core.server import DrainingServer
+    from app.main import app
+
+    monkeypatch.setattr(database, "create_mongo_client", lambda: AsyncMongoMockClient())
+    monkeypatch.setattr(settings, "LOOP_LAG_MONITOR_ENABLED", False)
+
+    class TestServer(DrainingServer):
+        def install_signal_handlers(self) -> None:
+            pass
+
+    async def run():
+        server = TestServer(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+
+        import httpx
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}{settings.API_V1_STR}") as client:
+            response = await client.post("/auth/register", json={"name": "Admin", "mobile_number": "9876543210"})
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            family_id = (await client.post("/family/create", json={"created_by": "x"}, headers=headers)).json()["family_id"]
+
+            async with client.stream("GET", f"/family/{family_id}/requests/stream", headers=headers) as stream:
+                chunks = stream.aiter_bytes()
+                assert await chunks.__anext__() == SSE_KEEPALIVE
+                services = app.state.services
+                server.should_exit = True
+                await asyncio.wait_for(serving, 5)
+                rest = [chunk async for chunk in chunks]
+        return services, rest
+
+    services, rest = asyncio.run(run())
+    assert rest == []
+    assert services.event_hub.subscriber_count() == 0
+    assert not services.sms_dispatcher.running
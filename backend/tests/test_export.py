@@ -0,0 +1,81 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from mongomock_motor import AsyncMongoMockClient
+from app.core.config import settings
+from app.services.export_service import ExportService
+
+START = datetime(2024, 6, 1)
+
+
+def make_service():
+    """ExportService over ten users updated one hour apart"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    asyncio.run(database.users.insert_many([
+        {
+            "name": f"User {i}",
+            "mobile_number": f"98765432{i:02d}",
+            "family_id": "FAM0001" if i % 2 else None,
+            "profile_data": {"address": {"location": "Pune", "pincode": "411001"}},
+            "updated_at": START + timedelta(hours=i % 5)
+        }
+        for i in range(10)
+    ]))
+    return ExportService(database)
+
+
+def export(service, **kwargs):
+    async def run():
+        return [document async for document in service.iter_users(**kwargs)]
+    return asyncio.run(run())
+
+
+def test_full_export_resumes_from_id_checkpoint():
+    """Test that a full export continues after the checkpoint _id"""
+    service = make_service()
+    first = export(service, batch_size=3)
+    resumed = export(service, after=first[3]["_id"])
+
+    assert len(first) == 10
+    assert resumed == first[4:]
+
+
+def test_incremental_export_resumes_within_equal_timestamps():
+    """Test updated_at >= since, resumable from a row sharing its timestamp"""
+    service = make_service()
+    since = START + timedelta(hours=3)
+    changed = export(service, since=since)
+    resumed = export(service, since=changed[0]["updated_at"], after=changed[0]["_id"])
+
+    assert len(changed) == 4
+    assert all(document["updated_at"] >= since for document in changed)
+    assert resumed == changed[1:]
+
+
+def test_export_endpoint_streams_csv(client, monkeypatch):
+    """Test the admin CSV export flattens profile_data"""
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-secret")
+    services = client.app.state.services
+    asyncio.run(services.database.users.insert_one({
+        "name": "Asha",
+        "mobile_number": "9876543210",
+        "family_id": "FAM0001",
+        "profile_data": {"address": {"location": "Pune", "pincode": "411001"}},
+        "updated_at": START
+    }))
+
+    response = client.get(
+        "/api/v1/admin/users/export",
+        params={"format": "csv"},
+        headers={"X-Admin-Key": "admin-secret"}
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.status_code == 200
+    assert rows[0]["family_id"] == "FAM0001"
+    assert rows[0]["location"] == "Pune"
+
+    response = client.get("/api/v1/admin/users/export", headers={"X-Admin-Key": "admin-secret"})
+    assert json.loads(response.text.splitlines()[0])["mobile_number"] == "9876543210"
@@ -0,0 +1,272 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from mongomock_motor import AsyncMongoMockClient
+from app.core.config import settings
+from app.core.events import EventHub
+from app.services.family_service import FamilyService
+from benchmarks.support import CountingDatabase, count_ops
+
+START = datetime(2024, 6, 1)
+
+
+def make_service() -> FamilyService:
+    """FamilyService over a fresh in-memory database"""
+    return FamilyService(AsyncMongoMockClient()["drshaadi_test"])
+
+
+async def insert_user(service: FamilyService, name: str) -> str:
+    """Insert a bare user and return its id"""
+    result = await service.users_collection.insert_one({"name": name})
+    return str(result.inserted_id)
+
+
+def test_family_reads_are_cached():
+    """Test that repeated family reads are served from the cache"""
+    service = make_service()
+
+    async def run():
+        owner_id = await insert_user(service, "Owner")
+        family = await service.create_family(owner_id)
+        first = await service.get_family_by_user_id(owner_id)
+        second = await service.get_family_by_user_id(owner_id)
+        return family, first, second
+
+    family, first, second = asyncio.run(run())
+    assert first.family_id == second.family_id == family.family_id
+    stats = service.cache_stats()
+    assert stats["families"]["hits"] == 1
+    assert stats["user_families"]["hits"] == 1
+
+
+def test_membership_writes_invalidate_cache():
+    """Test that join and leave are visible immediately"""
+    service = make_service()
+
+    async def run():
+        owner_id = await insert_user(service, "Owner")
+        member_id = await insert_user(service, "Member")
+        family = await service.create_family(owner_id)
+
+        assert await service.get_family_by_user_id(member_id) is None
+        await service.join_family(family.family_id, member_id)
+        joined = await service.get_family_by_user_id(member_id)
+
+        await service.leave_family(family.family_id, member_id)
+        left = await service.get_family_by_user_id(member_id)
+        remaining = await service.get_family_by_id(family.family_id)
+        return joined, left, remaining, member_id
+
+    joined, left, remaining, member_id = asyncio.run(run())
+    assert member_id in joined.members
+    assert left is None
+    assert member_id not in remaining.members
+
+
+def test_missing_family_is_negatively_cached():
+    """Test that unknown family ids are cached as misses"""
+    service = make_service()
+
+    async def run():
+        await service.get_family_by_id("NOPE123")
+        return await service.get_family_by_id("NOPE123")
+
+    assert asyncio.run(run()) is None
+    assert service.cache_stats()["families"]["hits"] == 1
+
+
+def test_my_family_wire_format(client):
+    """Test the family response shape served through ORJSONResponse"""
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"name": "Owner", "mobile_number": "9876543210"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    created = client.post("/api/v1/family/create", json={"created_by": "ignored"}, headers=headers)
+    assert created.status_code == 200
+
+    response = client.get("/api/v1/family/my-family", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"id", "family_id", "created_by", "members", "created_at", "updated_at", "is_active"}
+    assert body["family_id"] == created.json()["family_id"]
+    assert isinstance(body["created_at"], str)
+
+
+def test_join_requests_keyset_pagination(monkeypatch):
+    """Test that pages walk pending requests oldest first, across equal timestamps"""
+    monkeypatch.setattr(settings, "JOIN_REQUESTS_MAX_PAGE_SIZE", 4)
+    service = make_service()
+    requested_at = [START + timedelta(minutes=i // 3) for i in range(10)]
+
+    async def run():
+        await service.join_requests_collection.insert_many(
+            [
+                {
+                    "family_id": "FAM0001",
+                    "requester_id": f"user-{i}",
+                    "requester_name": f"User {i}",
+                    "status": "pending",
+                    "requested_at": at
+                }
+                for i, at in enumerate(requested_at)
+            ]
+            + [{"family_id": "FAM0001", "requester_id": "done", "requester_name": "Done",
+                "status": "approved", "requested_at": START}]
+        )
+        pages, cursor = [], None
+        while True:
+            # Requests above the cap are clamped to it
+            requests, cursor = await service.get_join_requests("FAM0001", limit=50, cursor=cursor)
+            pages.append([request["requester_id"] for request in requests])
+            if cursor is None:
+                return pages
+
+    pages = asyncio.run(run())
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert sum(pages, []) == [f"user-{i}" for i in range(10)]
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_join_requests("FAM0001", cursor="not-a-cursor"))
+
+
+def test_join_requests_endpoint_shape(client):
+    """Test the paginated join request response the app reads as data['requests']"""
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"name": "Owner", "mobile_number": "9876543210"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    family_id = client.post("/api/v1/family/create", json={"created_by": "ignored"}, headers=headers).json()["family_id"]
+
+    response = client.get(f"/api/v1/family/{family_id}/requests", params={"limit": 10}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"requests": [], "next_cursor": None}
+
+    response = client.get(f"/api/v1/family/{family_id}/requests", params={"limit": 10_000}, headers=headers)
+    assert response.status_code == 422
+
+    response = client.get(f"/api/v1/family/{family_id}/requests", params={"cursor": "bogus"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_membership_writes_round_trips():
+    """Test the number of Mongo operations per join, approve and reject"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    service = FamilyService(CountingDatabase(database))
+
+    async def run():
+        owner_id = await insert_user(service, "Owner")
+        joiner_id = await insert_user(service, "Joiner")
+        requester_id = await insert_user(service, "Requester")
+        rejected_id = await insert_user(service, "Rejected")
+        family = await service.create_family(owner_id)
+
+        joined, join_ops = await count_ops(service.join_family(family.family_id, joiner_id))
+        approve = await service.create_join_request(family.family_id, requester_id, "Requester")
+        reject = await service.create_join_request(family.family_id, rejected_id, "Rejected")
+        _, approve_ops = await count_ops(service.process_join_request(approve.id, "approve"))
+        _, reject_ops = await count_ops(service.process_join_request(reject.id, "reject"))
+
+        with pytest.raises(ValueError):
+            await service.process_join_request(approve.id, "approve")
+
+        members = (await service.get_family_by_id(family.family_id)).members
+        return joined, members, (join_ops, approve_ops, reject_ops)
+
+    joined, members, round_trips = asyncio.run(run())
+    assert len(joined.members) == 2
+    assert len(members) == 3
+    assert round_trips == (2, 3, 1)
+
+
+def test_member_summaries_single_query_in_member_order():
+    """Test that member expansion is one $in query, ordered like members and cached with the family"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    service = FamilyService(CountingDatabase(database))
+
+    async def run():
+        # Inserted in reverse so natural order differs from member order
+        names = ["Owner", "Second", "Third"]
+        user_ids = [await insert_user(service, name) for name in reversed(names)][::-1]
+        family = await service.create_family(user_ids[0])
+        for user_id in user_ids[1:]:
+            family = await service.join_family(family.family_id, user_id)
+
+        first, first_ops = await count_ops(service.get_member_summaries(family))
+        _, cached_ops = await count_ops(service.get_member_summaries(family))
+
+        late_id = await insert_user(service, "Late")
+        family = await service.join_family(family.family_id, late_id)
+        after_join = await service.get_member_summaries(family)
+        return user_ids, first, (first_ops, cached_ops), after_join
+
+    user_ids, first, ops, after_join = asyncio.run(run())
+    assert [summary["id"] for summary in first] == user_ids
+    assert [summary["name"] for summary in first] == ["Owner", "Second", "Third"]
+    assert "mobile_number" not in first[0]
+    assert ops == (1, 0)
+    assert [summary["name"] for summary in after_join] == ["Owner", "Second", "Third", "Late"]
+
+
+def test_family_expand_members_endpoint(client):
+    """Test expand=members on /family/my-family and /family/{family_id}"""
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"name": "Owner", "mobile_number": "9876543210"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    family_id = client.post("/api/v1/family/create", json={"created_by": "ignored"}, headers=headers).json()["family_id"]
+
+    for path in ("/api/v1/family/my-family", f"/api/v1/family/{family_id}"):
+        body = client.get(path, params={"expand": "members"}, headers=headers).json()
+        assert [member["id"] for member in body["member_details"]] == body["members"]
+        assert body["member_details"][0]["name"] == "Owner"
+
+    assert "member_details" not in client.get("/api/v1/family/my-family", headers=headers).json()
+    assert client.get("/api/v1/family/my-family", params={"expand": "everything"}, headers=headers).status_code == 422
+
+    # Outsiders can look a family up by code but not see who is in it
+    response = client.post("/api/v1/auth/register", json={"name": "Outsider", "mobile_number": "9876543211"})
+    outsider = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get(f"/api/v1/family/{family_id}", headers=outsider).status_code == 200
+    response = client.get(f"/api/v1/family/{family_id}", params={"expand": "members"}, headers=outsider)
+    assert response.status_code == 403
+
+
+def test_join_request_events_are_published():
+    """Test that creating and processing join requests publishes to the family topic"""
+    hub = EventHub()
+    service = FamilyService(AsyncMongoMockClient()["drshaadi_test"], hub)
+
+    async def run():
+        owner_id = await insert_user(service, "Owner")
+        family = await service.create_family(owner_id)
+        subscription = hub.subscribe(family.family_id)
+
+        approve = await service.create_join_request(family.family_id, await insert_user(service, "A"), "A")
+        reject = await service.create_join_request(family.family_id, await insert_user(service, "B"), "B")
+        await service.process_join_request(approve.id, "approve")
+        await service.process_join_request(reject.id, "reject")
+        events = [await subscription.get(0) for _ in range(4)]
+        return approve, reject, events
+
+    approve, reject, events = asyncio.run(run())
+    assert [event["type"] for event in events] == [
+        "join_request.created", "join_request.created", "join_request.approved", "join_request.rejected"
+    ]
+    assert [event["request"]["id"] for event in events] == [approve.id, reject.id, approve.id, reject.id]
+    assert events[2]["request"]["processed_at"] is not None
+
+
+def test_join_request_stream_requires_membership(client):
+    """Test that only family members can open the join request stream"""
+    tokens = []
+    for mobile_number in ("9876543210", "9876543211"):
+        response = client.post("/api/v1/auth/register", json={"name": "User", "mobile_number": mobile_number})
+        tokens.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    family_id = client.post("/api/v1/family/create", json={"created_by": "ignored"}, headers=tokens[0]).json()["family_id"]
+
+    response = client.get(f"/api/v1/family/{family_id}/requests/stream", headers=tokens[1])
+    assert response.status_code == 403
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.core.phone import normalize_mobile_number
+from app.services.import_service import ImportService, iter_lines
+
+ROWS = [
+    '{"name": "Asha", "mobile_number": "+91 98765 43210"}',
+    '{"name": "Ravi", "mobile_number": "09876543211", "profile_type": "family_member"}',
+    '',
+    'not json',
+    '{"name": "Bad Number", "mobile_number": "12345"}',
+    '{"mobile_number": "9876543212"}',
+    '{"name": "Asha Again", "mobile_number": "9876543210"}',
+    '{"name": "Existing", "mobile_number": "919876543213"}',
+]
+
+
+async def as_stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_normalize_mobile_number():
+    """Test that common formats collapse to 10 digits"""
+    for value in ("9876543210", "+91 98765-43210", "919876543210", "09876543210", "(98765) 43210"):
+        assert normalize_mobile_number(value) == "9876543210"
+
+    for value in ("12345", "+1 9876543210", "5876543210", "98765432ab"):
+        with pytest.raises(ValueError):
+            normalize_mobile_number(value)
+
+
+def test_iter_lines_bounds_long_lines():
+    """Test that lines split across chunks rejoin and oversized lines are truncated"""
+    async def run():
+        stream = as_stream(b'{"a": ', b'1}\n' + b"x" * 50, b"x" * 50 + b"\nlast")
+        return [line async for line in iter_lines(stream, max_line_bytes=20)]
+
+    assert asyncio.run(run()) == [b'{"a": 1}', b"x" * 21, b"last"]
+
+
+def test_import_users_reports_rejected_rows():
+    """Test chunked import with duplicates, in-file repeats and invalid rows"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    service = ImportService(database)
+
+    async def run():
+        await ensure_indexes(database)
+        await database.users.insert_one({"name": "Existing", "mobile_number": "9876543213"})
+        results = [
+            result async for result in service.import_users(
+                as_stream(*(f"{row}\n".encode() for row in ROWS)),
+                chunk_size=2
+            )
+        ]
+        stored = await database.users.find({}, {"_id": 0, "name": 1, "mobile_number": 1}).to_list(None)
+        return results, stored
+
+    results, stored = asyncio.run(run())
+    summary = results.pop()["summary"]
+
+    assert summary == {"rows": 7, "created": 2, "duplicate": 2, "invalid": 3, "error": 0}
+    assert {(result["line"], result["status"]) for result in results} == {
+        (4, "invalid"), (5, "invalid"), (6, "invalid"), (7, "duplicate"), (8, "duplicate")
+    }
+    assert sorted(user["mobile_number"] for user in stored) == ["9876543210", "9876543211", "9876543213"]
+
+
+def test_import_endpoint_requires_admin_key(client, monkeypatch):
+    """Test that the import endpoint is admin-only and streams NDJSON results"""
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-secret")
+    body = "\n".join(ROWS[:2] + ["not json"])
+
+    forbidden = client.post("/api/v1/admin/users/import", content=body)
+    assert forbidden.status_code == 403
+
+    response = client.post(
+        "/api/v1/admin/users/import",
+        content=body,
+        headers={"X-Admin-Key": "admin-secret"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert results[0] == {"line": 3, "status": "invalid", "error": results[0]["error"]}
+    assert results[-1]["summary"]["created"] == 2
+
+
+def test_register_and_login_match_imported_number(client, monkeypatch):
+    """Test that a +91-formatted number finds the account an import created"""
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-secret")
+    row = json.dumps({"name": "Imported", "mobile_number": "9876543210"})
+    response = client.post("/api/v1/admin/users/import", content=row, headers={"X-Admin-Key": "admin-secret"})
+    assert response.status_code == 200
+
+    response = client.post("/api/v1/auth/register", json={"name": "Again", "mobile_number": "+91 98765 43210"})
+    assert response.status_code == 400
+
+    response = client.post("/api/v1/auth/login", json={"mobile_number": "+91 98765 43210"})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/v1/auth/me", headers=headers).json()["name"] == "Imported"
+
+    response = client.post("/api/v1/auth/send-otp", json={"mobile_number": "+1 555 0100"})
+    assert response.status_code == 422
@@ -0,0 +1,76 @@
+import asyncio
+from mongomock_motor import AsyncMongoMockClient
+from app.core.indexes import (
+    ensure_indexes, verify_indexes, audit_query_plans, query_shapes, _plan_problems, _plan_stages, INDEX_SPECS
+)
+from app.services.family_service import JOIN_REQUEST_SORT
+
+
+def test_ensure_indexes_matches_spec():
+    """Test that ensure_indexes creates every declared index"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    asyncio.run(ensure_indexes(database))
+
+    assert asyncio.run(verify_indexes(database)) == []
+
+
+def test_verify_indexes_reports_missing():
+    """Test that a missing index is reported"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+
+    problems = asyncio.run(verify_indexes(database))
+    assert len(problems) == sum(len(indexes) for indexes in INDEX_SPECS.values())
+
+
+def test_plan_stages_finds_nested_collscan():
+    """Test that COLLSCAN is found anywhere in a plan tree"""
+    plan = {"stage": "FETCH", "inputStage": {"stage": "OR", "inputStages": [
+        {"stage": "IXSCAN"}, {"stage": "COLLSCAN"}
+    ]}}
+    assert "COLLSCAN" in _plan_stages(plan)
+
+
+def test_query_shapes_match_service_queries():
+    """Test that the audited shapes carry the filters and sorts the services really send"""
+    shapes = {shape.description: shape for shape in query_shapes()}
+
+    search = shapes["SearchService.search (pincode)"]
+    assert search.sort == [("_id", -1)] and search.limit == 21
+    assert "$ne" in search.filter["_id"] and search.filter["profile_data"] == {"$ne": None}
+    assert "$or" in search.filter
+
+    next_page = shapes["FamilyService.get_join_requests (next page)"]
+    assert next_page.sort == JOIN_REQUEST_SORT
+    assert [sorted(branch) for branch in next_page.filter["$or"]] == [["requested_at"], ["_id", "requested_at"]]
+
+
+def test_plan_problems_flags_sorts_and_unselective_scans():
+    """Test that in-memory sorts and scans examining far more keys than they return are reported"""
+    shapes = {shape.description: shape for shape in query_shapes()}
+    search = shapes["SearchService.search (pincode)"]
+    sorted_plan = {"queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "IXSCAN"}}}}
+
+    assert _plan_problems(search, sorted_plan) == ["in-memory SORT"]
+    assert _plan_problems(shapes["SearchService.search (height range)"], sorted_plan) == []
+    assert _plan_problems(search, {
+        "queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}},
+        "executionStats": {"totalKeysExamined": 5000, "nReturned": 21}
+    }) == ["5000 keys examined for 21 documents"]
+
+
+def test_audit_query_plans_explains_sort_and_limit():
+    """Test that each shape is explained with its sort and limit"""
+    commands = []
+
+    class ExplainingDatabase:
+        async def command(self, command):
+            commands.append(command)
+            return {"queryPlanner": {"winningPlan": {"stage": "LIMIT", "inputStage": {"stage": "IXSCAN"}}}}
+
+    assert asyncio.run(audit_query_plans(ExplainingDatabase())) == []
+    assert len(commands) == len(query_shapes())
+    join_requests = next(
+        command["explain"] for command in commands if command["explain"]["find"] == "family_join_requests"
+    )
+    assert join_requests["sort"] == dict(JOIN_REQUEST_SORT) and join_requests["limit"] == 21
+    assert all(command["verbosity"] == "executionStats" for command in commands)
@@ -0,0 +1,144 @@
+"""OTP races
+
+mongomock runs each operation to completion without yielding, so the in-memory
+tests below interleave whole calls but never two writes to the same document;
+they check the retry and filter logic. The *_on_mongod tests repeat the races
+against a real server (MONGODB_URL) and are skipped when none is reachable.
+"""
+
+import asyncio
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.services.auth_service import AuthService
+
+MOBILE_NUMBER = "9876543210"
+
+
+def make_service() -> AuthService:
+    """AuthService over a fresh in-memory database with indexes (operations are serialized)"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    asyncio.run(ensure_indexes(database))
+    return AuthService(database)
+
+
+async def on_mongod(check):
+    """Run check(AuthService) against a scratch database on a real mongod, or skip"""
+    client = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=1000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"needs a reachable mongod at {settings.MONGODB_URL}")
+
+    database = client[f"{settings.DATABASE_NAME}_otp_test_{ObjectId()}"]
+    try:
+        await ensure_indexes(database)
+        return await check(AuthService(database))
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+
+def test_parallel_sends_keep_one_otp():
+    """Test that hundreds of concurrent sends leave a single OTP document"""
+    service = make_service()
+
+    async def run():
+        await asyncio.gather(*(service.send_otp(MOBILE_NUMBER) for _ in range(300)))
+        return await service.otp_collection.count_documents({"mobile_number": MOBILE_NUMBER})
+
+    assert asyncio.run(run()) == 1
+
+
+def test_parallel_correct_verifies_succeed_once():
+    """Test that a code can only be redeemed by one of many concurrent verifies"""
+    service = make_service()
+
+    async def run():
+        await service.send_otp(MOBILE_NUMBER)
+        return await asyncio.gather(*(service.verify_otp(MOBILE_NUMBER, "1234") for _ in range(300)))
+
+    assert sum(asyncio.run(run())) == 1
+
+
+def test_parallel_wrong_verifies_are_counted():
+    """Test that wrong codes increment attempts and lock the OTP"""
+    service = make_service()
+
+    async def run():
+        await service.send_otp(MOBILE_NUMBER)
+        results = await asyncio.gather(*(service.verify_otp(MOBILE_NUMBER, "0000") for _ in range(300)))
+        record = await service.otp_collection.find_one({"mobile_number": MOBILE_NUMBER})
+        locked = await service.verify_otp(MOBILE_NUMBER, "1234")
+        return results, record, locked
+
+    results, record, locked = asyncio.run(run())
+    assert not any(results)
+    assert record["attempts"] == settings.MAX_OTP_ATTEMPTS
+    assert locked is False
+
+
+def test_parallel_mixed_sends_and_verifies():
+    """Test interleaved sends and verifies keep one document and bounded attempts"""
+    service = make_service()
+
+    async def run():
+        calls = []
+        for i in range(300):
+            if i % 3 == 0:
+                calls.append(service.send_otp(MOBILE_NUMBER))
+            else:
+                calls.append(service.verify_otp(MOBILE_NUMBER, "1234" if i % 3 == 1 else "9999"))
+        await asyncio.gather(*calls)
+        return await service.otp_collection.find({"mobile_number": MOBILE_NUMBER}).to_list(None)
+
+    records = asyncio.run(run())
+    assert len(records) == 1
+    assert records[0]["attempts"] <= settings.MAX_OTP_ATTEMPTS
+
+
+def test_verify_rejects_expired_otp():
+    """Test that an expired OTP cannot be verified"""
+    service = make_service()
+
+    async def run():
+        await service.send_otp(MOBILE_NUMBER)
+        await service.otp_collection.update_one(
+            {"mobile_number": MOBILE_NUMBER},
+            {"$set": {"expires_at": datetime(2000, 1, 1)}}
+        )
+        return await service.verify_otp(MOBILE_NUMBER, "1234")
+
+    assert asyncio.run(run()) is False
+
+
+def test_parallel_sends_keep_one_otp_on_mongod():
+    """Test that concurrent upserts racing on the unique index leave a single OTP document"""
+    async def check(service):
+        await asyncio.gather(*(service.send_otp(MOBILE_NUMBER) for _ in range(300)))
+        return await service.otp_collection.count_documents({"mobile_number": MOBILE_NUMBER})
+
+    assert asyncio.run(on_mongod(check)) == 1
+
+
+def test_parallel_verifies_on_mongod():
+    """Test that concurrent verifies redeem a code once and count every wrong attempt"""
+    async def check(service):
+        await service.send_otp(MOBILE_NUMBER)
+        correct = await asyncio.gather(*(service.verify_otp(MOBILE_NUMBER, "1234") for _ in range(300)))
+
+        await service.send_otp(MOBILE_NUMBER)
+        wrong = await asyncio.gather(*(service.verify_otp(MOBILE_NUMBER, "0000") for _ in range(300)))
+        record = await service.otp_collection.find_one({"mobile_number": MOBILE_NUMBER})
+        return correct, wrong, record
+
+    correct, wrong, record = asyncio.run(on_mongod(check))
+    assert sum(correct) == 1
+    assert not any(wrong)
+    assert record["attempts"] == settings.MAX_OTP_ATTEMPTS
@@ -0,0 +1,232 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+from app.core.height import parse_height_cm
+from app.schemas.profile import ProfileData, ProfilePatch
+from app.services.pincode_index import PincodeIndex, build_pincode_table
+from app.services.profile_service import ProfileService, ProfileVersionMismatch, diff_profile_patch
+
+PROFILE_DATA = {
+    "address": {
+        "location": "Bengaluru",
+        "pincode": "560001",
+        "grew_up_in": "Mysuru",
+        "residency_status": "citizen"
+    },
+    "marital": {"marital_status": "never_married", "height": "5'6\"", "diet": "veg"}
+}
+
+
+def make_service() -> ProfileService:
+    """ProfileService over a fresh in-memory database"""
+    return ProfileService(AsyncMongoMockClient()["drshaadi_test"])
+
+
+def test_update_profile_stores_completion():
+    """Test that the completion score is written with the profile"""
+    service = make_service()
+
+    async def run():
+        result = await service.users_collection.insert_one({"name": "Test User"})
+        user_id = str(result.inserted_id)
+        completion = await service.update_profile(user_id, ProfileData(**PROFILE_DATA))
+        stored = await service.users_collection.find_one({"_id": result.inserted_id})
+        return completion, stored, await service.get_profile_with_completion(user_id)
+
+    completion, stored, (profile_data, read_completion, version) = asyncio.run(run())
+    assert completion == 77
+    assert stored["profile_completion"] == completion
+    assert stored["height_cm"] == 168
+    assert stored["geo_point"] == {"type": "Point", "coordinates": [77.5946, 12.9716]}
+    assert read_completion == completion
+    assert version == stored["profile_version"] == 1
+    assert profile_data["address"]["pincode"] == "560001"
+
+
+def test_backfill_profile_completion():
+    """Test that the backfill scores every legacy user across batches"""
+    service = make_service()
+
+    async def run():
+        await service.users_collection.insert_many(
+            [{"name": f"User {i}", "profile_data": PROFILE_DATA} for i in range(7)]
+            + [{"name": "Empty"}]
+        )
+        updated = await service.backfill_profile_completion(batch_size=3)
+        scores = await service.users_collection.distinct("profile_completion")
+        return updated, sorted(scores)
+
+    updated, scores = asyncio.run(run())
+    assert updated == 8
+    assert scores == [0, 77]
+
+
+@pytest.mark.parametrize("value", [
+    "5'6\"", "5' 6\"", "5'6", "5’6”", "5 ft 6 in", "5ft 6in", "5 feet 6 inches",
+    "5.6", "5-6", "5.6 ft", "66 in", "168 cm", "168cm", "168", "1.68 m",
+])
+def test_parse_height_cm_common_formats(value):
+    """Test that common height spellings normalize to the same centimetres"""
+    assert parse_height_cm(value) == 168
+
+
+@pytest.mark.parametrize("value", [None, "", "tall", "5", "5.12", "12 ft", "1.68", "400 cm"])
+def test_parse_height_cm_rejects_unrecognised(value):
+    """Test that unparseable or implausible heights are stored as None"""
+    assert parse_height_cm(value) is None
+
+
+def test_backfill_height_cm():
+    """Test that the height backfill covers legacy users, including unparseable heights"""
+    service = make_service()
+    unparsed = {**PROFILE_DATA, "marital": {**PROFILE_DATA["marital"], "height": "average"}}
+
+    async def run():
+        await service.users_collection.insert_many(
+            [{"name": f"User {i}", "profile_data": PROFILE_DATA, "profile_completion": 77} for i in range(4)]
+            + [{"name": "Unparsed", "profile_data": unparsed}, {"name": "Empty"}]
+        )
+        updated = await service.backfill_height_cm(batch_size=4)
+        heights = await service.users_collection.find({}, {"_id": 0, "height_cm": 1}).to_list(None)
+        return updated, [user["height_cm"] for user in heights]
+
+    updated, heights = asyncio.run(run())
+    assert updated == 6
+    assert heights == [168, 168, 168, 168, None, None]
+
+
+def test_diff_profile_patch_dotted_paths():
+    """Test that a sparse patch becomes dotted $set/$unset for changed fields only"""
+    stored = {**PROFILE_DATA, "caste": {"caste": "Iyer", "subcaste": "Vadama", "is_not_particular_about_caste": False}}
+    changes = ProfilePatch(**{
+        "marital": {"diet": "vegan", "height": "5'6\""},
+        "caste": {"subcaste": None}
+    }).model_dump(exclude_unset=True)
+
+    merged, set_ops, unset_ops = diff_profile_patch(stored, changes)
+    assert set_ops == {"profile_data.marital.diet": "vegan"}
+    assert unset_ops == {"profile_data.caste.subcaste": ""}
+    assert merged["marital"]["diet"] == "vegan"
+    assert merged["address"] == PROFILE_DATA["address"]
+
+    # A section that is not stored yet is written whole
+    _, set_ops, _ = diff_profile_patch({"address": None}, {"caste": {"caste": "Iyer", "subcaste": None}})
+    assert set_ops == {"profile_data.caste": {"caste": "Iyer"}}
+    _, set_ops, _ = diff_profile_patch(None, {"caste": {"caste": "Iyer"}})
+    assert set_ops == {"profile_data": {"caste": {"caste": "Iyer"}}}
+
+
+def test_patch_profile_updates_derived_fields_and_version():
+    """Test that patches recompute the derived fields and honour the expected version"""
+    service = make_service()
+
+    async def run():
+        result = await service.users_collection.insert_one({"name": "Test User", "profile_data": None})
+        user_id = str(result.inserted_id)
+
+        with pytest.raises(ValueError):
+            await service.patch_profile(user_id, ProfilePatch(address={"location": "Chennai"}))
+
+        created = await service.patch_profile(user_id, ProfilePatch(**PROFILE_DATA))
+        patched = await service.patch_profile(
+            user_id, ProfilePatch(marital={"height": "180 cm"}, address={"pincode": "600001"}), expected_version=1
+        )
+        unchanged = await service.patch_profile(user_id, ProfilePatch(marital={"diet": "veg"}))
+
+        # A second editor still holding version 1 is refused
+        with pytest.raises(ProfileVersionMismatch) as stale:
+            await service.patch_profile(user_id, ProfilePatch(marital={"diet": "vegan"}), expected_version=1)
+
+        stored = await service.users_collection.find_one({"_id": result.inserted_id})
+        return created, patched, unchanged, stale.value, stored
+
+    created, patched, unchanged, stale, stored = asyncio.run(run())
+    assert created[1:] == (77, 1)
+    assert patched[1:] == (77, 2)
+    assert unchanged[1:] == (77, 2)
+    assert stale.current_version == 2
+    assert stored["profile_data"]["marital"] == {"marital_status": "never_married", "height": "180 cm", "diet": "veg"}
+    assert stored["profile_data"]["address"]["location"] == "Bengaluru"
+    assert stored["height_cm"] == 180
+    assert stored["geo_point"] == {"type": "Point", "coordinates": [80.2785, 13.0878]}
+
+
+def test_patch_profile_endpoint_if_match(client):
+    """Test PATCH /profile/ ETag and If-Match handling"""
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"name": "Test User", "mobile_number": "9876543210"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    user_id = client.get("/api/v1/auth/me", headers=headers).json()["_id"]
+    client.post("/api/v1/profile/create", json={"user_id": user_id, "profile_data": PROFILE_DATA}, headers=headers)
+
+    etag = client.get("/api/v1/profile/", headers=headers).headers["ETag"]
+    response = client.patch(
+        "/api/v1/profile/", json={"marital": {"diet": "vegan"}}, headers={**headers, "If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["profile_data"]["marital"]["diet"] == "vegan"
+    assert response.headers["ETag"] != etag
+
+    response = client.patch(
+        "/api/v1/profile/", json={"marital": {"diet": "veg"}}, headers={**headers, "If-Match": etag}
+    )
+    assert response.status_code == 412
+    assert client.patch(
+        "/api/v1/profile/", json={"marital": {"diet": None}}, headers=headers
+    ).status_code == 400
+
+
+def test_backfill_geo_point_retries_unknown_pincodes():
+    """Test that backfill-geo fills in users whose pincode the previous table did not know"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    rural = {**PROFILE_DATA, "address": {**PROFILE_DATA["address"], "pincode": "571401"}}
+    sample = PincodeIndex(build_pincode_table([{"pincode": "560001", "latitude": 12.9716, "longitude": 77.5946}]))
+    full = PincodeIndex(build_pincode_table([
+        {"pincode": "560001", "latitude": 12.9716, "longitude": 77.5946},
+        {"pincode": "571401", "latitude": 12.5218, "longitude": 76.8951}
+    ]))
+
+    async def run():
+        result = await database.users.insert_one({"name": "Rural"})
+        await ProfileService(database, sample).update_profile(str(result.inserted_id), ProfileData(**rural))
+        before = (await database.users.find_one({"_id": result.inserted_id}))["geo_point"]
+        # Other backfills write geo_point too, which must not hide the user from backfill-geo
+        await ProfileService(database, sample).backfill_profile_completion()
+        updated = await ProfileService(database, full).backfill_geo_point()
+        after = (await database.users.find_one({"_id": result.inserted_id}))["geo_point"]
+        return before, updated, after
+
+    before, updated, after = asyncio.run(run())
+    assert before is None
+    assert updated == 1
+    assert after == {"type": "Point", "coordinates": [76.8951, 12.5218]}
+
+
+def test_get_profile_fills_missing_fields_and_drops_unknown_keys(client):
+    """Test that GET /profile/ always returns the ProfileData shape, whatever the stored document holds"""
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"name": "Test User", "mobile_number": "9876543210"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    user_id = client.get("/api/v1/auth/me", headers=headers).json()["_id"]
+    asyncio.run(client.app.state.services.database.users.update_one(
+        {"_id": ObjectId(user_id)},
+        {"$set": {"profile_data": {
+            "address": {"location": "Pune", "internal_note": "x"},
+            "caste": {"caste": "Iyer"},
+            "legacy_section": {"a": 1}
+        }}}
+    ))
+
+    response = client.get("/api/v1/profile/", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["profile_data"] == {
+        "address": {"location": "Pune", "pincode": None, "grew_up_in": None, "residency_status": None},
+        "caste": {"caste": "Iyer", "subcaste": None, "is_not_particular_about_caste": False},
+        "marital": None
+    }
@@ -0,0 +1,112 @@
+import asyncio
+from mongomock_motor import AsyncMongoMockClient
+from app.core.config import settings
+from app.core.rate_limit import (
+    MemoryRateLimitBackend, MongoRateLimitBackend, RateLimit, parse_rate_limit
+)
+
+
+def test_parse_rate_limit():
+    """Test the "<count>/<period>" format"""
+    assert parse_rate_limit("3/minute") == RateLimit(3, 60)
+    assert parse_rate_limit("100/hours") == RateLimit(100, 3600)
+    assert parse_rate_limit("") is None
+    assert parse_rate_limit("0/minute") is None
+
+
+def test_memory_backend_allows_burst_then_rejects():
+    """Test that the limit is a burst of `limit` followed by a Retry-After"""
+    backend = MemoryRateLimitBackend()
+    rate = RateLimit(3, 60)
+
+    async def run():
+        return [await backend.hit("key", rate) for _ in range(4)]
+
+    results = asyncio.run(run())
+    assert results[:3] == [0, 0, 0]
+    assert 19 < results[3] <= 20
+
+
+def test_mongo_backend_is_shared():
+    """Test that two limiter instances over one database share the budget"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    first, second = MongoRateLimitBackend(database), MongoRateLimitBackend(database)
+    rate = RateLimit(2, 60)
+
+    async def run():
+        return [
+            await first.hit("key", rate),
+            await second.hit("key", rate),
+            await first.hit("key", rate),
+            await second.hit("other", rate)
+        ]
+
+    results = asyncio.run(run())
+    assert results[:2] == [0, 0]
+    assert 29 < results[2] <= 30
+    assert results[3] == 0
+
+
+def test_send_otp_is_rate_limited_per_number(client):
+    """Test that excess sends get 429 with Retry-After and never reach MongoDB"""
+    limit = parse_rate_limit(settings.SEND_OTP_RATE_LIMIT_PER_NUMBER).limit
+    services = client.app.state.services
+    sends = []
+
+    original_send_otp = services.auth_service.send_otp
+
+    async def counting_send_otp(mobile_number):
+        sends.append(mobile_number)
+        return await original_send_otp(mobile_number)
+
+    services.auth_service.send_otp = counting_send_otp
+
+    responses = [
+        client.post("/api/v1/auth/send-otp", json={"mobile_number": "9876543210"})
+        for _ in range(limit + 1)
+    ]
+
+    assert [response.status_code for response in responses] == [200] * limit + [429]
+    assert int(responses[-1].headers["Retry-After"]) > 0
+    assert len(sends) == limit
+
+    other = client.post("/api/v1/auth/send-otp", json={"mobile_number": "9876543211"})
+    assert other.status_code == 200
+
+
+def test_per_ip_limit_uses_forwarded_client_behind_trusted_proxy(monkeypatch):
+    """Test that callers behind a trusted proxy get their own per-IP budget, and untrusted peers cannot pick one"""
+    import uvicorn
+    from fastapi.testclient import TestClient
+    from app.core import database
+    from app.core.server import gunicorn_options
+    from app.main import app
+
+    limit = parse_rate_limit(settings.SEND_OTP_RATE_LIMIT_PER_IP).limit
+    monkeypatch.setattr(database, "create_mongo_client", lambda: AsyncMongoMockClient())
+    monkeypatch.setattr(settings, "FORWARDED_ALLOW_IPS", "testclient,10.0.0.1")
+    assert gunicorn_options()["forwarded_allow_ips"] == "testclient,10.0.0.1"
+
+    def sends(client, first_number, forwarded_for):
+        return [
+            client.post(
+                "/api/v1/auth/send-otp",
+                json={"mobile_number": str(first_number + n)},
+                headers={"X-Forwarded-For": forwarded_for}
+            ).status_code
+            for n in range(limit + 1)
+        ]
+
+    # The middleware uvicorn wraps the app in, configured as the server does
+    config = uvicorn.Config(app, proxy_headers=True, forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS)
+    config.load()
+    with TestClient(config.loaded_app) as client:
+        assert sends(client, 9000000000, "203.0.113.7, 10.0.0.1") == [200] * limit + [429]
+        assert sends(client, 9100000000, "198.51.100.2, 10.0.0.1")[0] == 200
+
+    # Only the hop in front of the trusted proxies counts: a spoofed entry further left does not
+    config = uvicorn.Config(app, proxy_headers=True, forwarded_allow_ips="testclient")
+    config.load()
+    with TestClient(config.loaded_app) as client:
+        assert sends(client, 9200000000, "203.0.113.7, 10.0.0.1") == [200] * limit + [429]
+        assert sends(client, 9300000000, "198.51.100.2, 10.0.0.1")[0] == 429
@@ -0,0 +1,211 @@
+import asyncio
+import math
+import numpy as np
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+from app.core.height import parse_height_cm
+from app.core.config import settings
+from app.schemas.search import SearchFilters
+from app.services.pincode_index import PincodeIndex, TABLE_DTYPE, get_pincode_index, haversine_km
+from app.services.search_service import SearchService
+
+
+def profile(
+    location: str,
+    caste: str,
+    not_particular: bool = False,
+    diet: str = "veg",
+    height: str = "5'6\"",
+    pincode: str = "560001"
+) -> dict:
+    return {
+        "address": {"location": location, "pincode": pincode, "grew_up_in": location, "residency_status": "citizen"},
+        "caste": {"caste": caste, "is_not_particular_about_caste": not_particular},
+        "marital": {"marital_status": "never_married", "height": height, "diet": diet}
+    }
+
+
+def make_service(searcher_profile: dict = None):
+    """SearchService over a searcher (open to any caste by default) and a handful of candidates"""
+    database = AsyncMongoMockClient()["drshaadi_test"]
+    searcher_id = ObjectId()
+    if searcher_profile is None:
+        searcher_profile = profile("Bengaluru", "Iyer", not_particular=True)
+    candidates = [
+        ("Same caste", profile("Bengaluru", "Iyer")),
+        ("Open to any caste", profile("Bengaluru", "Reddy", not_particular=True)),
+        ("Other caste", profile("Bengaluru", "Reddy")),
+        ("Other city", profile("Mysuru", "Iyer", pincode="570001")),
+        ("Non-veg", profile("Bengaluru", "Iyer", diet="non_veg")),
+        ("Tall", profile("Bengaluru", "Iyer", height="6 ft 1 in")),
+    ]
+    asyncio.run(database.users.insert_many(
+        [{"_id": searcher_id, "name": "Searcher", "is_active": True, "profile_data": searcher_profile}]
+        + [
+            {"name": name, "is_active": True, "profile_data": data, "height_cm": parse_height_cm(data["marital"]["height"])}
+            for name, data in candidates
+        ]
+        + [{"name": "No profile", "is_active": True}]
+    ))
+    return SearchService(database), str(searcher_id)
+
+
+def search(service, user_id, **filters):
+    return asyncio.run(service.search(SearchFilters(**filters), user_id))
+
+
+def test_search_filters_and_respects_caste_preference():
+    """Test that candidates particular about another caste are excluded"""
+    service, searcher_id = make_service()
+    results, next_cursor = search(service, searcher_id, location="Bengaluru", diet="veg")
+
+    assert sorted(result["name"] for result in results) == ["Open to any caste", "Same caste", "Tall"]
+    assert next_cursor is None
+    assert "mobile_number" not in results[0]
+
+
+def test_search_caste_filter_keeps_open_candidates_of_that_caste():
+    """Test that an explicit caste filter still applies the mutual caste rule"""
+    service, searcher_id = make_service()
+    results, _ = search(service, searcher_id, caste="Reddy")
+
+    assert [result["name"] for result in results] == ["Open to any caste"]
+
+
+def test_search_particular_searcher_only_sees_own_caste():
+    """Test that a searcher particular about caste does not see open candidates of other castes"""
+    service, searcher_id = make_service(profile("Bengaluru", "Iyer"))
+    results, _ = search(service, searcher_id, location="Bengaluru", diet="veg")
+
+    assert sorted(result["name"] for result in results) == ["Same caste", "Tall"]
+    assert search(service, searcher_id, caste="Reddy")[0] == []
+
+
+def test_search_without_searcher_caste_only_matches_open_candidates():
+    """Test that a searcher with no caste matches open candidates, not ones whose caste is also missing"""
+    service, searcher_id = make_service({"address": {"location": "Bengaluru", "pincode": "560001"}})
+    asyncio.run(service.users_collection.insert_many([
+        {"name": "Missing caste", "is_active": True, "profile_data": {"address": {"location": "Bengaluru"}}},
+        {"name": "Null caste", "is_active": True, "profile_data": {
+            "address": {"location": "Bengaluru"}, "caste": {"caste": None, "is_not_particular_about_caste": False}
+        }}
+    ]))
+    results, _ = search(service, searcher_id, location="Bengaluru")
+
+    assert [result["name"] for result in results] == ["Open to any caste"]
+
+
+def test_search_height_range():
+    """Test min/max height filters on the normalized height_cm"""
+    service, searcher_id = make_service()
+
+    tall, _ = search(service, searcher_id, min_height_cm=180)
+    assert [result["name"] for result in tall] == ["Tall"]
+
+    short, _ = search(service, searcher_id, location="Bengaluru", max_height_cm=170)
+    assert sorted(result["name"] for result in short) == ["Non-veg", "Open to any caste", "Same caste"]
+
+
+def test_pincode_index_within_matches_brute_force():
+    """Test grid radius lookups against distances to every pincode"""
+    rng = np.random.default_rng(3)
+    table = np.zeros(2000, dtype=TABLE_DTYPE)
+    table["pincode"] = np.sort(rng.choice(np.arange(110000, 860000), size=2000, replace=False))
+    table["lat"] = rng.uniform(8, 35, size=2000)
+    table["lon"] = rng.uniform(68, 97, size=2000)
+    index = PincodeIndex(table)
+
+    for lat, lon, radius_km in [(12.97, 77.59, 50), (28.6, 77.2, 300), (20.0, 80.0, 0.5), (34.9, 96.9, 120)]:
+        distances = haversine_km(lat, lon, table["lat"], table["lon"])
+        expected = {f"{pincode:06d}" for pincode in table["pincode"][distances <= radius_km]}
+        found = index.within(lat, lon, radius_km)
+        assert set(found) == expected
+        assert len(found) == len(expected)
+
+    assert index.lookup(f"{table['pincode'][5]:06d}") == (float(table["lat"][5]), float(table["lon"][5]))
+    assert index.lookup("000000") is None
+    assert math.isclose(haversine_km(12.9716, 77.5946, np.array([12.3052]), np.array([76.6552]))[0], 125, abs_tol=5)
+
+
+def test_pincode_index_refuses_sample_table_outside_debug(monkeypatch, tmp_path):
+    """Test startup fails closed on the bundled sample unless it is allowed or a table is configured"""
+    monkeypatch.setattr(settings, "DEBUG", False)
+    monkeypatch.setattr(settings, "PINCODE_TABLE_PATH", None)
+    monkeypatch.setattr(settings, "PINCODE_ALLOW_SAMPLE_TABLE", False)
+    get_pincode_index.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="PINCODE_TABLE_PATH"):
+            get_pincode_index()
+
+        table = np.zeros(1, dtype=TABLE_DTYPE)
+        table[0] = (560001, 12.97, 77.59)
+        np.save(tmp_path / "pincodes.npy", table)
+        monkeypatch.setattr(settings, "PINCODE_TABLE_PATH", str(tmp_path / "pincodes.npy"))
+        assert len(get_pincode_index()) == 1
+    finally:
+        get_pincode_index.cache_clear()
+
+
+def test_search_near_me_by_pincode():
+    """Test radius searches around the searcher's pincode and an explicit near_pincode"""
+    service, searcher_id = make_service()
+
+    near_me, _ = search(service, searcher_id, radius_km=20)
+    assert "Other city" not in {result["name"] for result in near_me}
+    assert len(near_me) == 4
+
+    near_mysuru, _ = search(service, searcher_id, near_pincode="570001", radius_km=10)
+    assert [result["name"] for result in near_mysuru] == ["Other city"]
+
+    with pytest.raises(ValueError):
+        search(service, searcher_id, near_pincode="999999", radius_km=10)
+
+
+def test_search_large_radius_uses_geo_point(monkeypatch):
+    """Test that radii covering many pincodes query the 2dsphere geo_point instead of $in"""
+    monkeypatch.setattr(settings, "SEARCH_MAX_PINCODES_IN", 2)
+    service, searcher_id = make_service()
+    filters = SearchFilters(radius_km=200)
+    proximity = service.resolve_proximity(filters, "560001")
+    query = service.build_query(filters, searcher_id, "Iyer", proximity)
+
+    assert "570001" in proximity.pincodes
+    assert "$centerSphere" in query["geo_point"]["$geoWithin"]
+    assert "profile_data.address.pincode" not in query
+
+
+def test_search_keyset_pagination():
+    """Test that cursors walk every match exactly once, newest first"""
+    service, searcher_id = make_service()
+    seen = []
+    cursor = None
+
+    while True:
+        results, cursor = search(service, searcher_id, limit=1, cursor=cursor)
+        seen.extend(result["id"] for result in results)
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_search_endpoint(client):
+    """Test the authenticated /search endpoint and cursor validation"""
+    token = client.post(
+        "/api/v1/auth/register",
+        json={"name": "Searcher", "mobile_number": "9876543210"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/v1/search/", params={"location": "Bengaluru"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"results": [], "next_cursor": None}
+
+    response = client.get("/api/v1/search/", params={"cursor": "nope"}, headers=headers)
+    assert response.status_code == 400
+
+    # No profile pincode to search around
+    response = client.get("/api/v1/search/", params={"radius_km": 10}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from datetime import timedelta
+from app.core import security
+from app.core.cache import TTLCache
+from app.core.loop_monitor import LoopLagMonitor
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test LRU eviction beyond maxsize"""
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 2
+
+
+def test_ttl_cache_expires_entries():
+    """Test that entries with a lapsed TTL are not returned"""
+    cache = TTLCache(maxsize=10)
+    cache.set("expired", 1, ttl=-1)
+    cache.set("live", 2, ttl=60)
+
+    assert cache.get("expired") is None
+    assert cache.get("live") == 2
+
+
+def test_verify_token_cached_reuses_claims(monkeypatch):
+    """Test that a verified token is decoded only once"""
+    security.token_cache.clear()
+    token = security.create_access_token({"user_id": "abc"})
+    calls = []
+    original = security.verify_token
+    monkeypatch.setattr(security, "verify_token", lambda t: calls.append(t) or original(t))
+
+    assert security.verify_token_cached(token)["user_id"] == "abc"
+    assert security.verify_token_cached(token)["user_id"] == "abc"
+    assert len(calls) == 1
+
+
+def test_verify_token_cached_skips_expired_tokens():
+    """Test that expired tokens are rejected and never cached"""
+    security.token_cache.clear()
+    token = security.create_access_token({"user_id": "abc"}, timedelta(seconds=-1))
+
+    assert security.verify_token_cached(token) is None
+    assert len(security.token_cache) == 0
+
+
+def test_pyjwt_backend_round_trip(monkeypatch):
+    """Test the optional PyJWT backend"""
+    monkeypatch.setattr(security.settings, "JWT_BACKEND", "pyjwt")
+    token = security.create_access_token({"user_id": "abc"})
+
+    assert security.verify_token(token)["user_id"] == "abc"
+    assert security.verify_token(token + "x") is None
+
+
+def test_async_crypto_variants_round_trip():
+    """Test the executor-backed password and token helpers"""
+    async def run():
+        hashed = await security.get_password_hash_async("secret")
+        token = await security.create_access_token_async({"user_id": "abc"})
+        return (
+            await security.verify_password_async("secret", hashed),
+            await security.verify_password_async("wrong", hashed),
+            await security.verify_token_async(token)
+        )
+
+    valid, invalid, payload = asyncio.run(run())
+    assert valid and not invalid
+    assert payload["user_id"] == "abc"
+
+
+def test_loop_lag_monitor_detects_blocking():
+    """Test that a blocking call shows up as event loop lag"""
+    monitor = LoopLagMonitor(interval=0.01, warn_threshold=1)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+    asyncio.run(run())
+    assert monitor.max_lag >= 0.05
@@ -0,0 +1,155 @@
+import asyncio
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from app.services.auth_service import AuthService
+from app.services.sms_service import (
+    FakeSMSProvider, SMSDispatcher, SMSProvider, SMSUnavailableError, TwilioSMSProvider
+)
+
+
+class FlakyProvider(SMSProvider):
+    """Provider failing the first `failures` sends"""
+
+    name = "flaky"
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    async def send(self, to: str, body: str) -> None:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("provider unavailable")
+
+
+def test_send_otp_does_not_wait_for_delivery():
+    """Test that send_otp returns before a slow provider has delivered"""
+    provider = FakeSMSProvider(latency_ms=200)
+    dispatcher = SMSDispatcher(provider, workers=2)
+    service = AuthService(AsyncMongoMockClient()["drshaadi_test"], dispatcher)
+
+    async def run():
+        await dispatcher.start()
+        await service.send_otp("9876543210")
+        delivered_before_return = len(provider.sent)
+        await dispatcher.stop()
+        return delivered_before_return, list(provider.sent)
+
+    delivered_before_return, sent = asyncio.run(run())
+    assert delivered_before_return == 0
+    assert [message.to for message in sent] == ["9876543210"]
+    assert "1234" in sent[0].body
+
+
+def test_failed_sends_are_retried():
+    """Test that transient provider failures are retried with backoff"""
+    provider = FlakyProvider(failures=2)
+    dispatcher = SMSDispatcher(provider, max_retries=3, retry_base_seconds=0.01)
+
+    async def run():
+        await dispatcher.start()
+        dispatcher.enqueue("9876543210", "hello")
+        await dispatcher.join()
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    assert provider.calls == 3
+    assert dispatcher.sent_count == 1
+    assert not dispatcher.dead_letters
+
+
+def test_exhausted_retries_are_dead_lettered():
+    """Test that a message is dead-lettered once its retries are used up"""
+    provider = FlakyProvider(failures=100)
+    dispatcher = SMSDispatcher(provider, max_retries=2, retry_base_seconds=0.01)
+
+    async def run():
+        await dispatcher.start()
+        dispatcher.enqueue("9876543210", "hello")
+        await dispatcher.join()
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    assert provider.calls == 3
+    assert len(dispatcher.dead_letters) == 1
+    assert dispatcher.dead_letters[0].message.attempts == 3
+
+
+def test_provider_concurrency_is_bounded():
+    """Test that no more than `concurrency` provider calls run at once"""
+    in_flight = 0
+    peak = 0
+
+    class CountingProvider(SMSProvider):
+        async def send(self, to: str, body: str) -> None:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    dispatcher = SMSDispatcher(CountingProvider(), workers=16, concurrency=3)
+
+    async def run():
+        await dispatcher.start()
+        for i in range(30):
+            dispatcher.enqueue(f"98765432{i:02d}", "hello")
+        await dispatcher.stop()
+
+    asyncio.run(run())
+    assert dispatcher.sent_count == 30
+    assert peak == 3
+
+
+def test_send_otp_fails_when_sms_cannot_be_queued():
+    """Test that a full or stopped dispatcher is reported instead of claiming the OTP was sent"""
+    dispatcher = SMSDispatcher(FakeSMSProvider(latency_ms=200), workers=1, queue_size=1)
+    service = AuthService(AsyncMongoMockClient()["drshaadi_test"], dispatcher)
+
+    async def run():
+        with pytest.raises(SMSUnavailableError):
+            await service.send_otp("9876543210")
+        await dispatcher.start()
+        await service.send_otp("9876543210")
+        await asyncio.sleep(0.01)
+        # One message is with the worker and the next fills the queue
+        await service.send_otp("9876543211")
+        with pytest.raises(SMSUnavailableError):
+            await service.send_otp("9876543212")
+        await dispatcher.stop()
+
+    asyncio.run(run())
+
+
+def test_twilio_provider_sends_to_e164_number():
+    """Test that stored 10-digit numbers reach Twilio in E.164 form"""
+    created = []
+
+    class StubMessages:
+        def create(self, **kwargs):
+            created.append(kwargs)
+
+    # Skip __init__, which builds a real twilio Client
+    provider = TwilioSMSProvider.__new__(TwilioSMSProvider)
+    provider.client = type("StubClient", (), {"messages": StubMessages()})()
+    provider.from_number = "+15005550006"
+
+    asyncio.run(provider.send("9876543210", "Your OTP is 1234"))
+
+    assert created == [{"to": "+919876543210", "from_": "+15005550006", "body": "Your OTP is 1234"}]
+
+
+def test_provider_must_implement_send():
+    """Test that SMSProvider is abstract"""
+    with pytest.raises(TypeError):
+        SMSProvider()
+
+
+def test_send_otp_endpoint_reports_unavailable_sms(client):
+    """Test that send-otp returns 503 when the SMS queue rejects the message"""
+    services = client.app.state.services
+    services.sms_dispatcher.enqueue = lambda to, body: False
+
+    response = client.post("/api/v1/auth/send-otp", json={"mobile_number": "9876543210"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"